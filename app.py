@@ -3,18 +3,89 @@ Thesis Panelist AI - Main Streamlit Application
 """
 
 import streamlit as st
+import logging
+import os
 import time
+import uuid
 from io import BytesIO
 
 # Import utility modules
-from utils.pdf_processor import validate_pdf, extract_text_with_metadata, chunk_text
-from utils.embeddings import load_embedding_model, generate_embeddings, create_vector_store, retrieve_relevant_chunks
-from utils.groq_client import (
-    get_groq_client, generate_critique, parse_critique_for_issues,
-    parse_rewrite_suggestions, parse_section_summaries, test_groq_connection
+from utils.pdf_processor import validate_pdf
+from utils.embeddings import (
+    load_embedding_model, load_embedding_cache, load_index_manager,
+    load_query_embedding_cache, warm_up_embedding_model, ENCODING_STATS
 )
-from utils.annotator import create_annotated_pdf, add_summary_page
-from utils.prompts import build_prompt
+from utils.index_manager import document_hash
+from utils.ingestion import DEFAULT_MAX_RSS_MB, DEFAULT_MAX_SECONDS
+from utils.groq_client import get_groq_client, test_groq_connection
+from utils.rate_limiter import get_rate_limiter
+from utils.response_cache import ResponseCache
+from utils.job_manager import JobManager, DEFAULT_JOB_WORKERS, QUEUED, DONE, FAILED, FINISHED_STATUSES
+from utils.pipeline_jobs import ingest_job, review_job, review_all_job, session_review_job
+
+
+# Upload limit for large-document mode (must not exceed server.maxUploadSize)
+LARGE_MODE_MAX_SIZE_MB = 100
+
+
+@st.cache_resource
+def load_response_cache():
+    """
+    Create the in-memory critique cache shared by all sessions.
+    
+    Returns:
+        ResponseCache instance (memory tier only, so critiques never touch disk)
+    """
+    return ResponseCache()
+
+
+@st.cache_resource
+def start_model_warmup():
+    """
+    Start loading the embedding model in the background, once per server process.
+    
+    Returns:
+        The warm-up thread (load_embedding_model() waits for it if still running)
+    """
+    return warm_up_embedding_model()
+
+
+@st.cache_resource
+def load_job_manager():
+    """
+    Create the background job pool shared by all sessions.
+    
+    Returns:
+        JobManager sized by the JOB_WORKERS environment variable (root-level
+        secrets are exported as environment variables)
+    """
+    raw = os.environ.get("JOB_WORKERS")
+    try:
+        max_workers = int(raw) if raw is not None else DEFAULT_JOB_WORKERS
+    except ValueError:
+        logging.getLogger(__name__).warning(
+            "Ignoring JOB_WORKERS=%r (expected int); using %s", raw, DEFAULT_JOB_WORKERS
+        )
+        max_workers = DEFAULT_JOB_WORKERS
+    return JobManager(max_workers=max_workers)
+
+
+# Progress bar labels per job kind, in stage order
+JOB_STAGE_LABELS = {
+    'process': {
+        'extract': "📄 Extracting text",
+        'embed': "🧠 Generating embeddings",
+        'index': "💾 Building vector store"
+    },
+    'review': {
+        'retrieve': "🔍 Retrieving relevant sections",
+        'generate': "🤖 Generating critique",
+        'annotate': "✏️ Creating annotated PDF"
+    }
+}
+
+# Units for stages whose total is unknown while they run
+JOB_STAGE_UNITS = {'embed': "chunks", 'index': "chunks", 'generate': "characters"}
 
 
 # Page configuration
@@ -68,8 +139,10 @@ def initialize_session_state():
         st.session_state.pdf_data = None
     if 'chunks' not in st.session_state:
         st.session_state.chunks = None
-    if 'collection' not in st.session_state:
-        st.session_state.collection = None
+    if 'session_id' not in st.session_state:
+        st.session_state.session_id = uuid.uuid4().hex
+    if 'doc_hash' not in st.session_state:
+        st.session_state.doc_hash = None
     if 'critique_text' not in st.session_state:
         st.session_state.critique_text = ""
     if 'annotated_pdf' not in st.session_state:
@@ -78,48 +151,71 @@ def initialize_session_state():
         st.session_state.last_request_time = 0
     if 'uploaded_file_name' not in st.session_state:
         st.session_state.uploaded_file_name = None
-
-
-def process_pdf(pdf_bytes, file_name):
-    """Process uploaded PDF and create vector store."""
+    if 'annotation_stats' not in st.session_state:
+        st.session_state.annotation_stats = None
+    # Background job ID per kind ('process', 'review'); jobs outlive reruns
+    if 'jobs' not in st.session_state:
+        st.session_state.jobs = {}
+    # Messages from finished jobs, per kind, as (level, text)
+    if 'job_notices' not in st.session_state:
+        st.session_state.job_notices = {}
+
+
+def process_pdf(pdf_bytes, file_name, large_mode=False):
+    """Validate an uploaded PDF and start processing it in the background."""
     try:
-        # Validate PDF
-        is_valid, error_msg = validate_pdf(pdf_bytes)
+        # Validate PDF (large-document mode is bounded by budgets instead of page counts)
+        if large_mode:
+            is_valid, error_msg = validate_pdf(pdf_bytes, max_size_mb=LARGE_MODE_MAX_SIZE_MB, max_pages=None)
+        else:
+            is_valid, error_msg = validate_pdf(pdf_bytes)
         if not is_valid:
             st.error(f"❌ {error_msg}")
             return False
         
-        # Extract text
-        with st.spinner("📄 Extracting text from PDF..."):
-            pdf_data = extract_text_with_metadata(pdf_bytes)
-            st.session_state.pdf_data = pdf_data
-        
-        st.success(f"✅ Extracted {pdf_data['total_pages']} pages ({pdf_data['total_chars']:,} characters)")
-        
-        # Chunk text
-        with st.spinner("✂️ Chunking text..."):
-            chunks = chunk_text(pdf_data['pages'])
-            st.session_state.chunks = chunks
-        
-        st.success(f"✅ Created {len(chunks)} text chunks")
-        
-        # Generate embeddings
-        with st.spinner("🧠 Generating embeddings..."):
+        # Indexes are namespaced per session and document, so concurrent
+        # sessions never touch each other's collections
+        manager = load_index_manager()
+        manager.evict_idle()
+        session_id = st.session_state.session_id
+        doc_hash = document_hash(pdf_bytes)
+        
+        if st.session_state.doc_hash:
+            manager.release(session_id, st.session_state.doc_hash)
+            st.session_state.doc_hash = None
+        
+        entry = manager.acquire(session_id, doc_hash)
+        if entry:
+            st.session_state.pdf_data = entry['extras']['pdf_data']
+            st.session_state.chunks = entry['extras']['chunks']
+            st.session_state.doc_hash = doc_hash
+            st.session_state.pdf_processed = True
+            st.session_state.uploaded_file_name = file_name
+            st.success("✅ Document already processed - reusing its vector store")
+            return True
+        
+        # Shared resources are resolved here, on the script thread; the job
+        # itself never calls into Streamlit
+        with st.spinner("🧠 Loading embedding model..."):
             model = load_embedding_model()
-            embeddings = generate_embeddings(chunks, model)
-        
-        st.success(f"✅ Generated embeddings")
-        
-        # Create vector store
-        with st.spinner("💾 Creating vector store..."):
-            collection = create_vector_store(chunks, embeddings)
-            st.session_state.collection = collection
-        
-        st.success("✅ Vector store ready!")
-        
-        st.session_state.pdf_processed = True
-        st.session_state.uploaded_file_name = file_name
-        
+            load_query_embedding_cache()  # Precompute review-mode query embeddings
+            cache = load_embedding_cache()
+        
+        # Extract, chunk, embed and index as one stream on the job pool, so
+        # the page stays responsive while large documents are processed
+        submit_job(
+            'process',
+            ingest_job,
+            pdf_bytes,
+            model,
+            cache,
+            manager,
+            session_id,
+            doc_hash,
+            max_rss_mb=DEFAULT_MAX_RSS_MB if large_mode else None,
+            max_seconds=DEFAULT_MAX_SECONDS if large_mode else None
+        )
+        st.session_state.processing_file_name = file_name
         return True
         
     except Exception as e:
@@ -127,128 +223,261 @@ def process_pdf(pdf_bytes, file_name):
         return False
 
 
-def generate_review(groq_api_key, mode, custom_query=None):
-    """Generate critique using RAG and Groq."""
+def submit_job(kind, func, *args, **kwargs):
+    """Queue a job for this session, replacing any earlier job of the same kind."""
+    cancel_job(kind)
+    st.session_state.jobs[kind] = load_job_manager().submit(
+        st.session_state.session_id, kind, func, *args, **kwargs
+    )
+    st.session_state.job_notices[kind] = []
+
+
+def cancel_job(kind):
+    """Cancel this session's job of a kind (if any) and drop it without applying its result."""
+    job_id = st.session_state.jobs.pop(kind, None)
+    if job_id:
+        job_manager = load_job_manager()
+        job_manager.cancel(job_id)
+        job_manager.forget(job_id)
+
+
+def job_active(kind):
+    """Whether this session has a queued or running job of the given kind."""
+    return kind in st.session_state.jobs
+
+
+def collect_finished_jobs():
+    """Apply the results of this session's finished jobs to session state (once each)."""
+    job_manager = load_job_manager()
+    for kind, job_id in list(st.session_state.jobs.items()):
+        job = job_manager.get(job_id)
+        if job is None:
+            # Pruned before this session came back for it
+            del st.session_state.jobs[kind]
+            st.session_state.job_notices[kind] = [('warning', "⚠️ A background job expired before its result was collected")]
+            continue
+        if job['status'] not in FINISHED_STATUSES:
+            continue
+        
+        if job['status'] == DONE:
+            notices = apply_process_result(job['result']) if kind == 'process' else apply_review_result(job['result'])
+        elif job['status'] == FAILED:
+            notices = job_failure_notices(kind, job)
+        else:
+            notices = [('info', "🛑 Cancelled")]
+        
+        st.session_state.job_notices[kind] = notices
+        del st.session_state.jobs[kind]
+        job_manager.forget(job_id)
+
+
+def apply_process_result(result):
+    """Store a finished ingestion in session state and return its notices."""
+    pdf_data = result['pdf_data']
+    chunks = result['chunks']
+    st.session_state.pdf_data = pdf_data
+    st.session_state.chunks = chunks
+    st.session_state.doc_hash = result['doc_hash']
+    st.session_state.pdf_processed = True
+    st.session_state.uploaded_file_name = st.session_state.get('processing_file_name')
+    
+    return [
+        ('success', f"✅ Extracted {pdf_data['total_pages']} pages ({pdf_data['total_chars']:,} characters)"),
+        ('success', f"✅ Created {len(chunks)} text chunks"),
+        ('success', f"✅ Generated embeddings ({result['cache_hits']} cached, {result['cache_misses']} newly encoded)"),
+        ('success', "✅ Vector store ready!")
+    ]
+
+
+def apply_review_result(result):
+    """Store a finished critique and annotated PDF in session state and return its notices."""
+    st.session_state.critique_text = result['critique']
+    st.session_state.critique_generated = True
+    st.session_state.last_request_time = time.time()
+    st.session_state.annotated_pdf = result['annotated_pdf']
+    
+    parsed = result['parsed']
+    st.session_state.annotation_stats = {
+        'issues': len(parsed['issues']),
+        'rewrites': len(parsed['rewrites']),
+        'sections': len(parsed['section_summaries']),
+        'critical': sum(1 for i in parsed['issues'] if i.get('severity') == 'critical')
+    }
+    
+    notices = []
+    if 'attempted' in result:
+        for mode, error in result['errors'].items():
+            notices.append(('error', f"❌ {mode}: Error generating critique: {error}"))
+        notices.append(('success', f"✅ {result['succeeded']} of {result['attempted']} reviews generated successfully!"))
+    else:
+        notices.append(('success', f"✅ Retrieved {result['retrieved']} relevant sections"))
+        if result['cache_hit']:
+            notices.append(('success', "✅ Review generated successfully! (♻️ reused an identical earlier request)"))
+        else:
+            notices.append(('success', "✅ Review generated successfully!"))
+    
+    if result['annotated_pdf']:
+        notices.append(('success', "✅ Professional annotated PDF ready with color-coded highlights, margin comments, and rewrite suggestions!"))
+    if result['warning']:
+        notices.append(('warning', f"⚠️ {result['warning']}"))
+    return notices
+
+
+def job_failure_notices(kind, job):
+    """Notices for a failed job."""
+    if kind == 'process':
+        if job['error_type'] in ('IngestionBudgetExceeded', 'IndexBudgetExceeded'):
+            return [('error', f"❌ {job['error']}")]
+        return [('error', f"❌ Error processing PDF: {job['error']}")]
+    return [
+        ('error', f"❌ {job['error']}"),
+        ('info', "💡 Tip: Check your API key or try again in a moment")
+    ]
+
+
+def show_job_notices(kind):
+    """Show the messages left by this session's last job of a kind."""
+    for level, text in st.session_state.job_notices.get(kind, []):
+        getattr(st, level)(text)
+
+
+@st.fragment(run_every=1)
+def show_job_status(kind):
+    """Poll a background job: progress per stage, partial output and a cancel button."""
+    job_id = st.session_state.jobs.get(kind)
+    if job_id is None:
+        return
+    job = load_job_manager().get(job_id)
+    if job is None or job['status'] in FINISHED_STATUSES:
+        # Rerun the whole script so collect_finished_jobs() applies the result
+        st.rerun()
+    
+    if job['status'] == QUEUED:
+        st.info(f"⏳ Waiting for a free worker ({job['queue_position']} job(s) ahead)")
+    else:
+        if job['message']:
+            st.caption(job['message'])
+        for stage, label in JOB_STAGE_LABELS[kind].items():
+            progress = job['progress'].get(stage)
+            if progress is None:
+                continue
+            done, total = progress['done'], progress['total']
+            fraction = min(1.0, done / total) if total else 0.5
+            suffix = f" ({done}/{total})" if total else f" ({done:,} {JOB_STAGE_UNITS.get(stage, 'done')})"
+            st.progress(fraction, text=label + suffix)
+    
+    partial = job['partial']
+    if 'issues' in partial:
+        st.caption(f"🔍 {partial['issues']} issues found so far ({partial.get('critical', 0)} critical)")
+    if partial.get('critique'):
+        st.markdown(partial['critique'])
+    if partial.get('modes'):
+        modes = partial['modes']
+        for mode, tab in zip(modes, st.tabs(list(modes))):
+            with tab:
+                st.markdown(modes[mode])
+    
+    if st.button("🛑 Cancel", key=f"cancel_{job_id}"):
+        load_job_manager().cancel(job_id)
+        st.info("🛑 Cancelling...")
+
+
+def get_session_index():
+    """Return this session's vector index, or None (with an error) if it was evicted."""
+    entry = load_index_manager().get(st.session_state.session_id, st.session_state.doc_hash)
+    if entry is None:
+        st.session_state.pdf_processed = False
+        st.session_state.doc_hash = None
+        st.error("❌ Your processed document expired after inactivity. Please process the PDF again.")
+        return None
+    return entry['index']
+
+
+def show_annotation_stats():
+    """Show counts for the last review's annotations."""
+    stats = st.session_state.annotation_stats
+    if not stats:
+        return
+    
+    stats_cols = st.columns(4)
+    with stats_cols[0]:
+        st.metric("Issues Found", stats['issues'])
+    with stats_cols[1]:
+        st.metric("Rewrites", stats['rewrites'])
+    with stats_cols[2]:
+        st.metric("Section Reviews", stats['sections'])
+    with stats_cols[3]:
+        st.metric("Critical Issues", stats['critical'], delta_color="inverse")
+
+
+def generate_review(groq_api_key, mode, custom_query=None, reuse_cached=True):
+    """Start generating a critique (RAG + Groq + annotation) in the background."""
     try:
-        # Rate limiting check
-        time_since_last = time.time() - st.session_state.last_request_time
-        if time_since_last < 5:
-            st.warning("⏳ Please wait a moment between requests (rate limiting)")
-            time.sleep(5 - time_since_last)
-        
-        # Get embedding model and collection
+        # Get embedding model and check this session's vector index still exists
         model = load_embedding_model()
-        collection = st.session_state.collection
-        
-        # Determine query for retrieval
-        if custom_query and custom_query.strip():
-            retrieval_query = custom_query
-            prompt_mode = "custom"
-        else:
-            # Use mode-specific query
-            mode_queries = {
-                "Full Panelist Review": "research methodology problem statement objectives findings conclusions",
-                "Methodology Check": "research design methodology sampling data collection analysis validity",
-                "Writing Quality": "grammar writing style clarity structure flow citations",
-                "Citation & References": "citations references bibliography in-text citations reference list",
-                "Consistency Check": "terminology tense format spelling acronyms consistency",
-                "Research Alignment": "research questions objectives methodology variables analysis conclusions alignment"
-            }
-            retrieval_query = mode_queries.get(mode, mode_queries["Full Panelist Review"])
-
-            # Map mode names to prompt mode identifiers
-            mode_mapping = {
-                "Full Panelist Review": "full_review",
-                "Methodology Check": "methodology",
-                "Writing Quality": "writing_quality",
-                "Citation & References": "citation_check",
-                "Consistency Check": "consistency_check",
-                "Research Alignment": "alignment_check"
-            }
-            prompt_mode = mode_mapping.get(mode, "full_review")
-        
-        # Retrieve relevant chunks
-        with st.spinner("🔍 Retrieving relevant sections..."):
-            relevant_chunks = retrieve_relevant_chunks(retrieval_query, collection, model, top_k=5)
-        
-        if not relevant_chunks:
-            st.error("❌ Could not retrieve relevant sections. Please try again.")
+        if get_session_index() is None:
             return
         
-        st.success(f"✅ Retrieved {len(relevant_chunks)} relevant sections")
-        
-        # Build prompt
-        prompt = build_prompt(prompt_mode, relevant_chunks, custom_query if custom_query else None)
-        
-        # Generate critique with streaming
-        groq_client = get_groq_client(groq_api_key)
-        
-        st.subheader("📝 Generated Review")
-        critique_placeholder = st.empty()
-        full_critique = ""
-        
-        with st.spinner("🤖 Generating critique..."):
-            try:
-                stream = generate_critique(groq_client, prompt, stream=True)
-                
-                for chunk in stream:
-                    full_critique += chunk
-                    critique_placeholder.markdown(full_critique)
-                
-            except Exception as e:
-                st.error(f"❌ Error generating critique: {str(e)}")
-                st.info("💡 Tip: Check your API key or try again in a moment")
-                return
+        # Requests share a per-key limiter that waits (and retries 429s) as needed
+        limiter = get_rate_limiter(groq_api_key)
+        if limiter.metrics()['queue_depth'] > 0:
+            st.warning("⏳ Other requests are queued for this API key - waiting for a rate limit slot")
+        
+        # The job holds its own reference to the index while it runs
+        submit_job(
+            'review',
+            session_review_job,
+            load_index_manager(),
+            st.session_state.session_id,
+            st.session_state.doc_hash,
+            review_job,
+            get_groq_client(groq_api_key),
+            model,
+            mode,
+            custom_query=custom_query,
+            query_cache=load_query_embedding_cache(),
+            limiter=limiter,
+            response_cache=load_response_cache(),
+            reuse_cached=reuse_cached,
+            pdf_bytes=st.session_state.get('original_pdf_bytes')
+        )
         
-        st.session_state.critique_text = full_critique
-        st.session_state.critique_generated = True
-        st.session_state.last_request_time = time.time()
-        
-        st.success("✅ Review generated successfully!")
+    except Exception as e:
+        st.error(f"❌ Error generating review: {str(e)}")
+
+
+def generate_all_reviews(groq_api_key, reuse_cached=True):
+    """Start running every review mode concurrently in the background."""
+    try:
+        model = load_embedding_model()
+        if get_session_index() is None:
+            return
         
-        # Parse issues, rewrites, and section summaries for advanced annotations
-        with st.spinner("🔍 Analyzing feedback for annotations..."):
-            issues = parse_critique_for_issues(full_critique)
-            rewrites = parse_rewrite_suggestions(full_critique)
-            section_summaries = parse_section_summaries(full_critique)
-
-        # Show annotation statistics
-        stats_cols = st.columns(4)
-        with stats_cols[0]:
-            st.metric("Issues Found", len(issues))
-        with stats_cols[1]:
-            st.metric("Rewrites", len(rewrites))
-        with stats_cols[2]:
-            st.metric("Section Reviews", len(section_summaries))
-        with stats_cols[3]:
-            critical_count = sum(1 for i in issues if i.get('severity') == 'critical')
-            st.metric("Critical Issues", critical_count, delta_color="inverse")
-
-        # Create enhanced annotated PDF
-        if issues or rewrites or section_summaries:
-            with st.spinner("✏️ Creating professional annotated PDF..."):
-                try:
-                    # Get original PDF bytes
-                    original_pdf = st.session_state.get('original_pdf_bytes')
-                    if original_pdf:
-                        annotated_pdf = create_annotated_pdf(
-                            original_pdf,
-                            issues,
-                            section_summaries=section_summaries if section_summaries else None,
-                            rewrites=rewrites if rewrites else None,
-                            include_legend=True
-                        )
-                        st.session_state.annotated_pdf = annotated_pdf
-                        st.success("✅ Professional annotated PDF ready with color-coded highlights, margin comments, and rewrite suggestions!")
-                except Exception as e:
-                    st.warning(f"⚠️ Could not create annotations: {str(e)}")
+        submit_job(
+            'review',
+            session_review_job,
+            load_index_manager(),
+            st.session_state.session_id,
+            st.session_state.doc_hash,
+            review_all_job,
+            get_groq_client(groq_api_key),
+            model,
+            query_cache=load_query_embedding_cache(),
+            limiter=get_rate_limiter(groq_api_key),
+            response_cache=load_response_cache(),
+            reuse_cached=reuse_cached,
+            pdf_bytes=st.session_state.get('original_pdf_bytes')
+        )
         
     except Exception as e:
-        st.error(f"❌ Error generating review: {str(e)}")
+        st.error(f"❌ Error generating reviews: {str(e)}")
 
 
 # Initialize session state
 initialize_session_state()
+# The first page renders while the model loads; it is ready by the time a PDF is processed
+start_model_warmup()
+collect_finished_jobs()
 
 # Sidebar
 with st.sidebar:
@@ -283,7 +512,13 @@ with st.sidebar:
     uploaded_file = st.file_uploader(
         "Choose PDF file",
         type=['pdf'],
-        help="Max 10MB, under 50 pages recommended"
+        help="Max 10MB, under 50 pages recommended (up to 100MB in large document mode)"
+    )
+    
+    large_mode = st.checkbox(
+        "📚 Large document mode",
+        help="For full dissertations (200+ pages). Pages are processed in batches "
+             "within memory and time budgets instead of a page limit."
     )
     
     if uploaded_file:
@@ -293,19 +528,23 @@ with st.sidebar:
             st.session_state.pdf_processed = False
             st.session_state.critique_generated = False
             st.session_state.annotated_pdf = None
+            st.session_state.annotation_stats = None
+            cancel_job('process')
         
         # Store original PDF bytes
         pdf_bytes = uploaded_file.read()
         st.session_state.original_pdf_bytes = pdf_bytes
         
         if not st.session_state.pdf_processed:
-            if st.button("🚀 Process PDF", type="primary"):
-                process_pdf(pdf_bytes, uploaded_file.name)
+            if st.button("🚀 Process PDF", type="primary", disabled=job_active('process')):
+                process_pdf(pdf_bytes, uploaded_file.name, large_mode=large_mode)
+            show_job_status('process')
         else:
             st.success(f"✅ Processed: {uploaded_file.name}")
             if st.button("🔄 Process New File"):
                 st.session_state.pdf_processed = False
                 st.rerun()
+        show_job_notices('process')
     
     st.divider()
     
@@ -406,11 +645,29 @@ with tab1:
                 height=80
             )
             
-            if st.button("🔍 Generate Review", type="primary", disabled=not groq_api_key):
+            reuse_cached = st.checkbox(
+                "♻️ Reuse identical earlier reviews",
+                value=True,
+                help="Identical requests (same sections, mode and model) are answered from cache. "
+                     "Uncheck to sample a fresh review."
+            )
+            
+            review_running = job_active('review')
+            if st.button("🔍 Generate Review", type="primary", disabled=not groq_api_key or review_running):
                 if not groq_api_key:
                     st.error("❌ Please enter your Groq API key in the sidebar")
                 else:
-                    generate_review(groq_api_key, mode, custom_query)
+                    generate_review(groq_api_key, mode, custom_query, reuse_cached=reuse_cached)
+            
+            if st.button(
+                "⚡ Run All Review Modes",
+                disabled=not groq_api_key or review_running,
+                help="Runs all six review modes in parallel and combines them into one review"
+            ):
+                generate_all_reviews(groq_api_key, reuse_cached=reuse_cached)
+            
+            show_job_status('review')
+            show_job_notices('review')
         
         with col2:
             st.subheader("📊 Document Info")
@@ -419,11 +676,41 @@ with tab1:
                 st.metric("Pages", pdf_data['total_pages'])
                 st.metric("Characters", f"{pdf_data['total_chars']:,}")
                 st.metric("Chunks", len(st.session_state.chunks))
+            
+            index_stats = load_index_manager().stats()
+            st.caption(
+                f"🧮 Server index memory: {index_stats['total_bytes'] / (1024 * 1024):.1f}MB "
+                f"across {index_stats['entries']} document(s)"
+            )
+            
+            job_stats = load_job_manager().stats()
+            st.caption(
+                f"⚙️ Background jobs: {job_stats['running']} running, {job_stats['queued']} queued "
+                f"({job_stats['workers']} workers)"
+            )
+            
+            encoding_stats = ENCODING_STATS.snapshot()
+            if encoding_stats['tokens']:
+                service_stats = load_embedding_model().stats()
+                st.caption(
+                    f"🔢 Embedding: {encoding_stats['tokens_per_second']:,.0f} tokens/s, "
+                    f"{encoding_stats['padding_ratio']:.2f}x padding; "
+                    f"{service_stats['mean_requests_per_batch']:.1f} request(s) per micro-batch, "
+                    f"p95 queue wait {service_stats['wait_ms']['p95']:.0f}ms"
+                )
+            
+            response_stats = load_response_cache().stats()
+            if response_stats['hits']:
+                st.caption(
+                    f"♻️ Review cache: {response_stats['hit_rate']:.0%} hit rate, "
+                    f"~{response_stats['saved_tokens']:,} tokens saved"
+                )
         
         # Show critique if generated
         if st.session_state.critique_generated and st.session_state.critique_text:
             st.divider()
             st.subheader("📝 Your Review")
+            show_annotation_stats()
             st.markdown(st.session_state.critique_text)
             
             # Download buttons
@@ -495,7 +782,7 @@ with tab3:
     
     - **LLM**: Groq API (llama-3.3-70b-versatile)
     - **Embeddings**: sentence-transformers (all-MiniLM-L6-v2)
-    - **Vector Store**: ChromaDB (in-memory)
+    - **Vector Store**: In-memory NumPy index (ChromaDB for very large corpora)
     - **PDF Processing**: PyMuPDF
     
     ### Privacy & Security
@@ -507,8 +794,7 @@ with tab3:
     
     ### Limitations (MVP Phase)
     
-    - Max 10MB file size
-    - Recommended under 50 pages for optimal performance
+    - Max 10MB file size and 50 pages (up to 100MB with no page limit in large document mode)
     - Requires your own Groq API key (free tier available)
     - No persistent storage between sessions
     
@@ -0,0 +1,351 @@
+"""
+Headless batch reviewer: critique every thesis PDF in a directory.
+
+Runs the same pipeline as the Streamlit app (ingestion, retrieval, Groq
+critique, annotation) without a browser. Documents are reviewed
+concurrently on a JobManager pool; the review modes of one document run in
+order and share its index. For each document and mode, three files are
+written to <output>/<pdf name>/:
+
+    <mode>.txt            critique text
+    <mode>.issues.json    parsed issues, rewrites and section summaries
+    <mode>.annotated.pdf  annotated PDF (when there is something to annotate)
+
+A manifest.json beside them records the document hash and the finished
+modes. Runs are resumable: after an interruption, rerunning the same
+command skips every mode already recorded for an unchanged PDF. Modes
+recorded with a warning (e.g. the annotated PDF could not be created) are
+retried on the next run; their critique usually comes from the response
+cache.
+
+Usage:
+    python batch_review.py theses/ --modes "Full Panelist Review" "Methodology Check"
+    python batch_review.py theses/ --modes all --workers 4 --output reviews/
+
+The Groq API key is read from --api-key or the GROQ_API_KEY environment
+variable.
+"""
+
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Optional
+
+from utils.document_session import DocumentSession
+from utils.embedding_cache import EmbeddingCache
+from utils.embeddings import QueryEmbeddingCache, get_embedding_service
+from utils.groq_client import get_groq_client
+from utils.index_manager import document_hash
+from utils.ingestion import ingest_pdf, DEFAULT_MAX_RSS_MB, DEFAULT_MAX_SECONDS
+from utils.job_manager import JobManager, JobContext, DONE, FINISHED_STATUSES
+from utils.pdf_processor import validate_pdf
+from utils.pipeline_jobs import review_job
+from utils.prompts import MODE_QUERIES
+from utils.rate_limiter import estimate_tokens, get_rate_limiter
+from utils.response_cache import ResponseCache
+
+
+DEFAULT_OUTPUT_DIR = "reviews"
+DEFAULT_BATCH_WORKERS = 2
+
+# Batch runs are bounded by the ingestion budgets rather than the app's upload limits
+BATCH_MAX_SIZE_MB = None
+
+MANIFEST_NAME = "manifest.json"
+
+
+def mode_slug(mode: str) -> str:
+    """File name stem for a review mode, e.g. 'Full Panelist Review' -> 'full-panelist-review'."""
+    return re.sub(r"[^a-z0-9]+", "-", mode.lower()).strip("-")
+
+
+def write_atomic(path: str, data):
+    """Write text or bytes so an interrupted run never leaves a partial file."""
+    temp_path = path + ".tmp"
+    if isinstance(data, bytes):
+        output_file = open(temp_path, "wb")
+    else:
+        output_file = open(temp_path, "w", encoding="utf-8")
+    with output_file:
+        output_file.write(data)
+    os.replace(temp_path, path)
+
+
+def load_manifest(output_dir: str, doc_hash: str, source: str) -> Dict:
+    """
+    Load a document's manifest, or start a new one.
+
+    A manifest written for different PDF contents is discarded, so an edited
+    thesis is reviewed again.
+    """
+    path = os.path.join(output_dir, MANIFEST_NAME)
+    try:
+        with open(path, encoding="utf-8") as manifest_file:
+            manifest = json.load(manifest_file)
+        if manifest.get('doc_hash') == doc_hash:
+            return manifest
+    except (OSError, ValueError):
+        pass
+    return {'source': source, 'doc_hash': doc_hash, 'modes': {}}
+
+
+def save_manifest(output_dir: str, manifest: Dict):
+    write_atomic(os.path.join(output_dir, MANIFEST_NAME), json.dumps(manifest, indent=2))
+
+
+def completed_modes(manifest: Dict) -> List[str]:
+    """Modes recorded without a warning; warned modes stay pending and are retried."""
+    return [mode for mode, entry in manifest['modes'].items() if not entry.get('warning')]
+
+
+def review_document(
+    context: JobContext,
+    pdf_path: str,
+    output_dir: str,
+    modes: List[str],
+    client,
+    model,
+    cache: EmbeddingCache,
+    query_cache: QueryEmbeddingCache,
+    limiter,
+    response_cache: ResponseCache,
+    extract_workers: Optional[int] = 1,
+    large_mode: bool = True
+) -> Dict:
+    """
+    Review one PDF in every requested mode, skipping modes already on disk.
+
+    Returns:
+        {'pages': int, 'reviewed': [mode], 'skipped': [mode],
+         'errors': {mode: str}, 'warnings': {mode: str}, 'tokens': int,
+         'cache_hits': int}
+    """
+    with open(pdf_path, "rb") as pdf_file:
+        pdf_bytes = pdf_file.read()
+    doc_hash = document_hash(pdf_bytes)
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest = load_manifest(output_dir, doc_hash, os.path.basename(pdf_path))
+    completed = completed_modes(manifest)
+    pending = [mode for mode in modes if mode not in completed]
+    summary = {
+        'pages': manifest.get('pages', 0),
+        'reviewed': [],
+        'skipped': [mode for mode in modes if mode in completed],
+        'errors': {},
+        'warnings': {},
+        'tokens': 0,
+        'cache_hits': 0
+    }
+    if not pending:
+        return summary
+
+    is_valid, error_msg = validate_pdf(pdf_bytes, max_size_mb=BATCH_MAX_SIZE_MB, max_pages=None)
+    if not is_valid:
+        raise ValueError(error_msg)
+
+    document = DocumentSession(pdf_bytes)
+    index = None
+    try:
+        result = ingest_pdf(
+            pdf_bytes,
+            model,
+            cache=cache,
+            workers=extract_workers,
+            max_rss_mb=DEFAULT_MAX_RSS_MB if large_mode else None,
+            max_seconds=DEFAULT_MAX_SECONDS if large_mode else None,
+            progress_callback=context.report,
+            index_name=f"batch_{doc_hash[:16]}",
+            document=document
+        )
+        index = result['index']
+        summary['pages'] = manifest['pages'] = result['pdf_data']['total_pages']
+
+        for mode in pending:
+            try:
+                review = review_job(
+                    context, client, index, model, mode,
+                    query_cache=query_cache,
+                    limiter=limiter,
+                    response_cache=response_cache,
+                    pdf_bytes=pdf_bytes,
+                    document=document
+                )
+            except (ValueError, RuntimeError) as e:
+                summary['errors'][mode] = str(e)
+                continue
+
+            slug = mode_slug(mode)
+            write_atomic(os.path.join(output_dir, f"{slug}.txt"), review['critique'])
+            write_atomic(os.path.join(output_dir, f"{slug}.issues.json"), json.dumps(review['parsed'], indent=2))
+            if review['annotated_pdf']:
+                write_atomic(os.path.join(output_dir, f"{slug}.annotated.pdf"), review['annotated_pdf'])
+
+            tokens = estimate_tokens(review['critique'])
+            # Recorded last, so a mode only counts as done once its files
+            # exist, and only without a warning (see completed_modes)
+            manifest['modes'][mode] = {
+                'issues': len(review['parsed']['issues']),
+                'tokens': tokens,
+                'cache_hit': review['cache_hit'],
+                'annotated': review['annotated_pdf'] is not None,
+                'warning': review['warning'],
+                'finished': time.time()
+            }
+            save_manifest(output_dir, manifest)
+
+            summary['reviewed'].append(mode)
+            if review['warning']:
+                summary['warnings'][mode] = review['warning']
+            summary['tokens'] += tokens
+            summary['cache_hits'] += review['cache_hit']
+    finally:
+        document.close()
+        if index is not None:
+            index.close()
+
+    return summary
+
+
+def find_pdfs(input_dir: str, recursive: bool = False) -> List[str]:
+    """PDF paths under a directory, sorted."""
+    pattern = os.path.join(input_dir, "**", "*.pdf") if recursive else os.path.join(input_dir, "*.pdf")
+    return sorted(glob.glob(pattern, recursive=recursive))
+
+
+def output_dir_for(pdf_path: str, input_dir: str, output_root: str) -> str:
+    """Per-document output directory, mirroring the PDF's path below the input directory."""
+    relative = os.path.relpath(pdf_path, input_dir)
+    return os.path.join(output_root, os.path.splitext(relative)[0])
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("input_dir", help="Directory containing thesis PDFs")
+    parser.add_argument(
+        "--modes", nargs="+", default=["Full Panelist Review"],
+        help=f"Review modes, or 'all'. Available: {', '.join(MODE_QUERIES)}"
+    )
+    parser.add_argument("--output", default=DEFAULT_OUTPUT_DIR, help="Output directory")
+    parser.add_argument("--workers", type=int, default=DEFAULT_BATCH_WORKERS,
+                        help="Documents reviewed concurrently")
+    parser.add_argument("--extract-workers", type=int, default=1,
+                        help="Extraction processes per document (0 picks automatically)")
+    parser.add_argument("--recursive", action="store_true", help="Include PDFs in subdirectories")
+    parser.add_argument("--no-budgets", action="store_true",
+                        help="Do not apply the large-document memory and time budgets")
+    parser.add_argument("--api-key", default=os.environ.get("GROQ_API_KEY"))
+    parser.add_argument("--base-url", help="Groq API base URL (e.g. benchmarks.fake_groq_server)")
+    args = parser.parse_args()
+
+    modes = list(MODE_QUERIES) if args.modes == ["all"] else args.modes
+    unknown = [mode for mode in modes if mode not in MODE_QUERIES]
+    if unknown:
+        parser.error(f"unknown mode(s): {', '.join(unknown)}")
+    if not args.api_key:
+        parser.error("a Groq API key is required (--api-key or GROQ_API_KEY)")
+
+    pdf_paths = find_pdfs(args.input_dir, args.recursive)
+    if not pdf_paths:
+        print(f"❌ No PDF files found in {args.input_dir}")
+        return 1
+
+    print("=" * 50)
+    print("Batch thesis review")
+    print("=" * 50 + "\n")
+    print(f"{len(pdf_paths)} PDF(s), {len(modes)} mode(s), {args.workers} concurrent document(s)\n")
+
+    # Shared across documents, as in the app
+    print("🧠 Loading embedding model...")
+    # Concurrent documents share one micro-batching encode queue
+    model = get_embedding_service()
+    query_cache = QueryEmbeddingCache()
+    query_cache.precompute(MODE_QUERIES.values(), model)
+    cache = EmbeddingCache()
+    response_cache = ResponseCache()
+    client = get_groq_client(args.api_key, base_url=args.base_url)
+    limiter = get_rate_limiter(args.api_key)
+
+    job_manager = JobManager(max_workers=args.workers)
+    jobs = {}
+    for pdf_path in pdf_paths:
+        job_id = job_manager.submit(
+            "batch", "document", review_document,
+            pdf_path,
+            output_dir_for(pdf_path, args.input_dir, args.output),
+            modes,
+            client,
+            model,
+            cache,
+            query_cache,
+            limiter,
+            response_cache,
+            extract_workers=args.extract_workers or None,
+            large_mode=not args.no_budgets
+        )
+        jobs[job_id] = pdf_path
+
+    start = time.perf_counter()
+    totals = {'documents': 0, 'reviewed': 0, 'skipped': 0, 'failed': 0, 'tokens': 0, 'cache_hits': 0}
+    interrupted = False
+    try:
+        while jobs:
+            for job_id in list(jobs):
+                job = job_manager.get(job_id)
+                if job['status'] not in FINISHED_STATUSES:
+                    continue
+                name = os.path.relpath(jobs.pop(job_id), args.input_dir)
+                job_manager.forget(job_id)
+
+                if job['status'] != DONE:
+                    totals['failed'] += 1
+                    print(f"❌ {name}: {job['error'] or job['status']}")
+                    continue
+
+                result = job['result']
+                totals['reviewed'] += len(result['reviewed'])
+                totals['skipped'] += len(result['skipped'])
+                totals['tokens'] += result['tokens']
+                totals['cache_hits'] += result['cache_hits']
+                if result['reviewed']:
+                    totals['documents'] += 1
+                for mode, error in result['errors'].items():
+                    print(f"❌ {name} [{mode}]: {error}")
+                for mode, warning in result['warnings'].items():
+                    print(f"⚠️ {name} [{mode}]: {warning} (retried on the next run)")
+                if not result['reviewed'] and not result['errors']:
+                    print(f"⏭️ {name}: already reviewed")
+                else:
+                    print(f"✅ {name}: {len(result['reviewed'])} mode(s), {result['pages']} pages, "
+                          f"{len(result['skipped'])} resumed")
+            time.sleep(0.2)
+    except KeyboardInterrupt:
+        interrupted = True
+        print("\n🛑 Interrupted - cancelling; finished modes are kept and skipped on the next run")
+        job_manager.shutdown(cancel_pending=True)
+    else:
+        job_manager.shutdown(cancel_pending=False)
+    elapsed = time.perf_counter() - start
+
+    print("\n" + "=" * 50)
+    print(f"Reviewed {totals['reviewed']} mode(s) across {totals['documents']} document(s) in {elapsed:.1f}s "
+          f"({totals['skipped']} resumed, {totals['failed']} document(s) failed)")
+    print(f"Throughput: {totals['documents'] / (elapsed / 60):.2f} docs/min, "
+          f"{totals['tokens'] / elapsed:.1f} generated tokens/s "
+          f"({totals['cache_hits']} answered from cache)")
+    service_stats = model.stats()
+    print(f"Embedding: {service_stats['texts_per_second']:.0f} texts/s in {service_stats['batches']} micro-batch(es), "
+          f"mean {service_stats['mean_batch_size']:.1f} texts, p95 queue wait {service_stats['wait_ms']['p95']:.1f}ms")
+    print(f"Output: {os.path.abspath(args.output)}")
+
+    if interrupted:
+        return 130
+    return 1 if totals['failed'] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1 @@
+# Benchmark scripts for Thesis Panelist AI
@@ -0,0 +1,170 @@
+"""
+Benchmark: annotated-PDF save modes, time, peak memory and bytes written.
+
+Builds a large synthetic thesis (text plus an incompressible figure every
+few pages), annotates it, and saves it with each output mode of
+save_annotated_pdf. Every mode runs in a fresh process so the peak RSS
+reported is that mode's own high-water mark. The previous behaviour (save
+into a BytesIO, then getvalue()) is the baseline.
+
+Usage:
+    python -m benchmarks.bench_annotation_output [--pages 300] [--issues-per-page 4]
+"""
+
+import argparse
+import io
+import json
+import os
+import random
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.bench_annotation_save import annotate_document, build_review
+from benchmarks.bench_text_index import build_synthetic_pdf
+from utils.annotator import DrawingBatch, save_annotated_pdf
+from utils.text_index import TextIndex
+
+
+MODES = ["bytesio", "tobytes", "stream", "file", "incremental"]
+
+MODE_LABELS = {
+    'bytesio': "BytesIO + getvalue",
+    'tobytes': "tobytes()",
+    'stream': "file object",
+    'file': "file path",
+    'incremental': "incremental"
+}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is KB on Linux and bytes on macOS
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def add_figures(pdf_bytes: bytes, every: int, seed: int = 11) -> bytes:
+    """Place a random-noise (incompressible) image on every n-th page."""
+    rng = random.Random(seed)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    for page_num in range(0, doc.page_count, every):
+        pixmap = fitz.Pixmap(fitz.csRGB, 320, 240, rng.randbytes(320 * 240 * 3), False)
+        doc[page_num].insert_image(fitz.Rect(150, 600, 470, 780), pixmap=pixmap)
+    result = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return result
+
+
+def run_mode(mode: str, input_path: str, issues_per_page: int) -> dict:
+    """Annotate and save in one mode (called in a child process)."""
+    with open(input_path, "rb") as input_file:
+        pdf_bytes = input_file.read()
+    output_path = os.path.join(tempfile.mkdtemp(), "annotated.pdf")
+
+    if mode == "incremental":
+        with open(output_path, "wb") as output_file:
+            output_file.write(pdf_bytes)
+        doc = fitz.open(output_path)
+    else:
+        doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+    review = build_review(doc, issues_per_page)
+    annotate_document(doc, review, DrawingBatch(), TextIndex.from_document(doc))
+    rss_before = peak_rss_mb()
+
+    start = time.perf_counter()
+    if mode == "bytesio":
+        buffer = io.BytesIO()
+        doc.save(buffer)
+        result = buffer.getvalue()
+        written = len(result)
+    elif mode == "tobytes":
+        result = save_annotated_pdf(doc)
+        written = len(result)
+    elif mode == "stream":
+        with open(output_path, "wb") as output_file:
+            save_annotated_pdf(doc, output_file)
+        written = os.path.getsize(output_path)
+    elif mode == "file":
+        save_annotated_pdf(doc, output_path)
+        written = os.path.getsize(output_path)
+    else:
+        save_annotated_pdf(doc, incremental=True)
+        written = os.path.getsize(output_path) - len(pdf_bytes)
+    save_time = time.perf_counter() - start
+    if not doc.is_closed:
+        doc.close()
+
+    if mode in ("bytesio", "tobytes"):
+        check = fitz.open(stream=result, filetype="pdf")
+    else:
+        check = fitz.open(output_path)
+    annotations = sum(len(list(page.annots())) for page in check)
+    check.close()
+
+    return {
+        'save_ms': save_time * 1000,
+        'peak_delta_mb': peak_rss_mb() - rss_before,
+        'written_kb': written / 1024,
+        'annotations': annotations
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=300)
+    parser.add_argument("--issues-per-page", type=int, default=4)
+    parser.add_argument("--figure-every", type=int, default=3)
+    parser.add_argument("--child", choices=MODES, help=argparse.SUPPRESS)
+    parser.add_argument("--input", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_mode(args.child, args.input, args.issues_per_page)))
+        return 0
+
+    print("=" * 50)
+    print("Annotated PDF output mode benchmark")
+    print("=" * 50 + "\n")
+
+    pdf_bytes = add_figures(build_synthetic_pdf(args.pages), args.figure_every)
+    input_path = os.path.join(tempfile.mkdtemp(), "thesis.pdf")
+    with open(input_path, "wb") as input_file:
+        input_file.write(pdf_bytes)
+    print(f"{args.pages} pages, {len(pdf_bytes) / (1024 * 1024):.1f}MB input, "
+          f"{args.issues_per_page} issues per page\n")
+
+    results = {}
+    for mode in MODES:
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_annotation_output", "--child", mode,
+             "--input", input_path, "--issues-per-page", str(args.issues_per_page)],
+            capture_output=True, text=True, check=True
+        )
+        results[mode] = json.loads(completed.stdout.strip().splitlines()[-1])
+
+    print(f"{'Mode':<20}{'Save':>10}{'Peak +RSS':>12}{'Written':>12}")
+    for mode in MODES:
+        result = results[mode]
+        print(f"{MODE_LABELS[mode]:<20}{result['save_ms']:>8.1f}ms{result['peak_delta_mb']:>10.1f}MB"
+              f"{result['written_kb']:>10.0f}KB")
+
+    baseline = results['bytesio']
+    incremental = results['incremental']
+    print(f"\nIncremental vs. BytesIO: {baseline['save_ms'] / incremental['save_ms']:.1f}x faster, "
+          f"{baseline['written_kb'] / incremental['written_kb']:.1f}x fewer bytes written")
+
+    annotation_counts = {result['annotations'] for result in results.values()}
+    if len(annotation_counts) != 1:
+        print(f"❌ Modes disagree on annotation count: {annotation_counts}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
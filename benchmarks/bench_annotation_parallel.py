@@ -0,0 +1,122 @@
+"""
+Benchmark: page-parallel annotation at 1, 2, 4 and 8 worker processes.
+
+Annotates a large synthetic thesis with create_annotated_pdf at each worker
+count, reports wall time and speedup over the serial run, and checks every
+parallel result against the serial one (page count, annotation count and
+rendered pages). Speedup is bounded by the CPUs available, which are
+printed first.
+
+Also checks critiques that cite no page ('page_num': None, as the parsers
+emit): rewrites must still be placed by their wording and summaries skipped.
+
+Usage:
+    python -m benchmarks.bench_annotation_parallel [--pages 200] [--issues-per-page 8]
+"""
+
+import argparse
+import os
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.bench_annotation_save import build_review, render_difference
+from benchmarks.bench_text_index import build_synthetic_pdf
+from utils.annotator import create_annotated_pdf
+from utils.text_index import TextIndex
+
+
+WORKER_COUNTS = [1, 2, 4, 8]
+
+
+def summarize(pdf_bytes: bytes):
+    """Return (page count, annotation count) of a PDF."""
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    result = (doc.page_count, sum(len(list(page.annots())) for page in doc))
+    doc.close()
+    return result
+
+
+def _first_page(text_index: TextIndex, rewrite) -> int:
+    match = text_index.find(rewrite['original'], fuzzy=False)
+    return match['page_num'] + 1 if match else 0
+
+
+def check_missing_pages(pdf_bytes: bytes, review, text_index: TextIndex) -> str:
+    """Annotate with every other summary/rewrite page dropped; returns '' or a failure message."""
+    issues, summaries, rewrites = review
+    unpaged_summaries = [dict(summary, page_num=None) if i % 2 else summary for i, summary in enumerate(summaries)]
+    # An unpaged rewrite goes to the first page with its wording; the synthetic
+    # vocabulary repeats, so only drop pages where that is the cited page
+    unpaged_rewrites = [
+        dict(rewrite, page_num=None) if i % 2 and _first_page(text_index, rewrite) == rewrite['page_num'] else rewrite
+        for i, rewrite in enumerate(rewrites)
+    ]
+    if unpaged_rewrites == rewrites:
+        return "no rewrite could be tested without its page"
+    try:
+        annotated = create_annotated_pdf(pdf_bytes, issues, unpaged_summaries, unpaged_rewrites, text_index=text_index)
+    except Exception as e:
+        return f"raised {type(e).__name__}: {e}"
+    if annotated is None:
+        return "no PDF returned"
+
+    # Same as skipping the unpaged summaries and placing every rewrite on its page
+    expected = create_annotated_pdf(pdf_bytes, issues, summaries[::2], rewrites, text_index=text_index)
+    if summarize(annotated) != summarize(expected):
+        return f"{summarize(annotated)} != {summarize(expected)}"
+    return ""
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=200)
+    parser.add_argument("--issues-per-page", type=int, default=8)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Parallel annotation benchmark")
+    print("=" * 50 + "\n")
+
+    pdf_bytes = build_synthetic_pdf(args.pages)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    review = build_review(doc, args.issues_per_page)
+    text_index = TextIndex.from_document(doc)
+    doc.close()
+
+    print(f"{args.pages} pages, {len(review[0])} issues, {os.cpu_count()} CPUs available\n")
+    print(f"{'Workers':>8}{'Time':>11}{'Speedup':>10}  Output")
+
+    baseline_time = None
+    baseline_pdf = None
+    failures = 0
+    for workers in WORKER_COUNTS:
+        start = time.perf_counter()
+        annotated = create_annotated_pdf(pdf_bytes, *review, text_index=text_index, workers=workers)
+        elapsed = time.perf_counter() - start
+
+        if baseline_pdf is None:
+            baseline_time, baseline_pdf = elapsed, annotated
+            status = "serial reference"
+        elif summarize(annotated) != summarize(baseline_pdf):
+            status = f"❌ {summarize(annotated)} != {summarize(baseline_pdf)}"
+            failures += 1
+        elif render_difference(baseline_pdf, annotated, pages=args.pages) > 0:
+            status = "❌ renders differently"
+            failures += 1
+        else:
+            status = "identical"
+        print(f"{workers:>8}{elapsed:>10.2f}s{baseline_time / elapsed:>9.2f}x  {status}")
+
+    problem = check_missing_pages(pdf_bytes, review, text_index)
+    if problem:
+        print(f"\n❌ Critique without page numbers: {problem}")
+        failures += 1
+    else:
+        print("\n✅ Critique without page numbers annotated")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
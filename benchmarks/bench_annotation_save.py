@@ -0,0 +1,190 @@
+"""
+Benchmark: annotated-PDF drawing, save time and size, per-element vs. batched.
+
+Annotates a synthetic thesis with many issues per page, section summaries
+and rewrites twice: once committing a Shape (or text insert) for every box,
+line and text run as the annotator used to, and once through a DrawingBatch
+that commits each page once. Reports annotate and save time, output size
+and content streams per page, and checks both outputs render alike.
+
+Usage:
+    python -m benchmarks.bench_annotation_save [--pages 20] [--issues-per-page 12]
+"""
+
+import argparse
+import io
+import random
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+from benchmarks.bench_text_index import build_synthetic_pdf
+from utils.annotator import (
+    DrawingBatch,
+    add_annotation_legend,
+    add_inline_rewrite,
+    add_issue_annotation,
+    add_section_summary_box,
+    render_margin_layout
+)
+from utils.margin_layout import MarginLayout
+from utils.text_index import TextIndex
+
+
+# Largest tolerated mean per-channel pixel difference between the two renders
+MAX_RENDER_DIFF = 2.0
+
+
+class PerElementDrawing(DrawingBatch):
+    """The previous behaviour: every box, line and text run is committed on its own."""
+
+    def draw_rect(self, page, rect, **style):
+        shape = page.new_shape()
+        shape.draw_rect(rect)
+        shape.finish(**style)
+        shape.commit()
+
+    def draw_line(self, page, start, end, **style):
+        shape = page.new_shape()
+        shape.draw_line(start, end)
+        shape.finish(**style)
+        shape.commit()
+
+    def insert_text(self, page, point, text, **options):
+        page.insert_text(point, text, **options)
+
+
+def build_review(doc: fitz.Document, issues_per_page: int, seed: int = 5):
+    """Return (issues, section_summaries, rewrites) quoting the document text."""
+    rng = random.Random(seed)
+    issues, summaries, rewrites = [], [], []
+    severities = ['critical', 'major', 'minor', 'suggestion']
+    for page_num in range(doc.page_count):
+        words = [word[4] for word in doc[page_num].get_text("words")]
+        for i in range(issues_per_page):
+            start = rng.randrange(len(words) - 10)
+            issues.append({
+                'type': rng.choice(['grammar', 'logic', 'methodology', 'clarity']),
+                'severity': severities[i % len(severities)],
+                'text_snippet': " ".join(words[start:start + 8]),
+                'suggestion': "Clarify this claim and support it with a citation.",
+                'page_hint': page_num + 1
+            })
+        start = rng.randrange(len(words) - 10)
+        rewrites.append({
+            'original': " ".join(words[start:start + 5]),
+            'suggested': "A clearer phrasing of the same point",
+            'page_num': page_num + 1,
+            'explanation': "Shorter and more direct."
+        })
+        if page_num % 5 == 0:
+            summaries.append({
+                'section': 'methodology',
+                'page_num': page_num + 1,
+                'strengths': ["Clear sampling rationale"],
+                'issues': ["Instrument validity is not discussed"],
+                'suggestions': ["Report reliability coefficients"],
+                'score': 7
+            })
+    return issues, summaries, rewrites
+
+
+def annotate_document(doc: fitz.Document, review, batch: DrawingBatch, text_index: TextIndex):
+    """Draw the review onto doc like create_annotated_pdf does."""
+    issues, summaries, rewrites = review
+    layout = MarginLayout()
+    add_annotation_legend(doc[0], batch, layout)
+    highlighted_texts = set()
+    comment_counter = 1
+    for issue in issues:
+        comment_counter = add_issue_annotation(
+            doc, issue, highlighted_texts, comment_counter, text_index, batch, layout
+        ) or comment_counter
+    for summary in summaries:
+        add_section_summary_box(doc, summary, batch, layout)
+    for rewrite in rewrites:
+        add_inline_rewrite(doc, rewrite, text_index, batch, layout)
+    render_margin_layout(doc, layout, batch)
+    batch.commit()
+
+
+def annotate(pdf_bytes: bytes, review, batch: DrawingBatch):
+    """Annotate like create_annotated_pdf; return (annotate_s, save_s, output bytes)."""
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    text_index = TextIndex.from_document(doc)
+
+    start = time.perf_counter()
+    annotate_document(doc, review, batch, text_index)
+    annotate_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    buffer = io.BytesIO()
+    doc.save(buffer)
+    save_time = time.perf_counter() - start
+    doc.close()
+    return annotate_time, save_time, buffer.getvalue()
+
+
+def content_streams(pdf_bytes: bytes) -> float:
+    """Average number of content streams per page."""
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    count = sum(len(page.get_contents()) for page in doc) / doc.page_count
+    doc.close()
+    return count
+
+
+def render_difference(first: bytes, second: bytes, pages: int = 3) -> float:
+    """Mean absolute per-channel difference over the first pages' renders."""
+    doc_a = fitz.open(stream=first, filetype="pdf")
+    doc_b = fitz.open(stream=second, filetype="pdf")
+    total, count = 0, 0
+    for page_num in range(min(pages, doc_a.page_count)):
+        samples_a = doc_a[page_num].get_pixmap(dpi=50).samples
+        samples_b = doc_b[page_num].get_pixmap(dpi=50).samples
+        total += sum(abs(a - b) for a, b in zip(samples_a, samples_b))
+        count += len(samples_a)
+    doc_a.close()
+    doc_b.close()
+    return total / count
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=20)
+    parser.add_argument("--issues-per-page", type=int, default=12)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Annotated PDF drawing benchmark")
+    print("=" * 50 + "\n")
+
+    pdf_bytes = build_synthetic_pdf(args.pages)
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    review = build_review(doc, args.issues_per_page)
+    doc.close()
+
+    legacy_annotate, legacy_save, legacy_pdf = annotate(pdf_bytes, review, PerElementDrawing())
+    batched_annotate, batched_save, batched_pdf = annotate(pdf_bytes, review, DrawingBatch())
+
+    print(f"{args.pages} pages, {len(review[0])} issues, {len(review[1])} summaries, {len(review[2])} rewrites\n")
+    print(f"{'':<22}{'per element':>14}{'batched':>12}")
+    print(f"{'Annotate':<22}{legacy_annotate * 1000:>12.1f}ms{batched_annotate * 1000:>10.1f}ms")
+    print(f"{'Save':<22}{legacy_save * 1000:>12.1f}ms{batched_save * 1000:>10.1f}ms")
+    print(f"{'Output size':<22}{len(legacy_pdf) / 1024:>12.0f}KB{len(batched_pdf) / 1024:>10.0f}KB")
+    print(f"{'Content streams/page':<22}{content_streams(legacy_pdf):>14.1f}{content_streams(batched_pdf):>12.1f}")
+
+    legacy_total = legacy_annotate + legacy_save
+    batched_total = batched_annotate + batched_save
+    print(f"\nSpeedup (annotate + save): {legacy_total / batched_total:.2f}x")
+
+    difference = render_difference(legacy_pdf, batched_pdf)
+    print(f"Render difference:         {difference:.3f} (mean per channel, 0-255)")
+    if difference > MAX_RENDER_DIFF:
+        print("❌ Batched output renders differently")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
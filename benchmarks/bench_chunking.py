@@ -0,0 +1,204 @@
+"""
+Benchmark: span-based chunk_text vs. the previous string-concatenation chunker.
+
+Before timing, randomized property checks confirm that every chunk's
+start_char/end_char slice the page text back to exactly the chunk text,
+that chunks only exceed chunk_size when an overlap tail is followed by a
+single over-long sentence, and that every sentence is covered.
+
+Usage:
+    python -m benchmarks.bench_chunking [--pages 400] [--trials 300] [--tokens]
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+from typing import Dict, List
+
+from utils.pdf_processor import chunk_text, _sentence_spans
+
+
+def legacy_chunk_text(pages_data: List[Dict], chunk_size: int = 500, overlap: int = 100) -> List[Dict]:
+    """The previous chunk_text implementation, kept for comparison."""
+    chunks = []
+    chunk_id = 0
+
+    for page_data in pages_data:
+        page_num = page_data['page_num']
+        page_text = page_data['text']
+
+        if not page_text.strip():
+            continue
+
+        sentences = re.split(r'(?<=[.!?])\s+', page_text)
+
+        current_chunk = ""
+        start_char = 0
+
+        for sentence in sentences:
+            if len(current_chunk) + len(sentence) > chunk_size and current_chunk:
+                chunks.append({
+                    'text': current_chunk.strip(),
+                    'chunk_id': chunk_id,
+                    'page_num': page_num,
+                    'start_char': start_char,
+                    'end_char': start_char + len(current_chunk)
+                })
+
+                chunk_id += 1
+
+                if len(current_chunk) > overlap:
+                    overlap_text = current_chunk[-overlap:]
+                    current_chunk = overlap_text + " " + sentence
+                    start_char = start_char + len(current_chunk) - len(overlap_text) - len(sentence) - 1
+                else:
+                    current_chunk = sentence
+                    start_char = start_char + len(current_chunk) - len(sentence)
+            else:
+                current_chunk += " " + sentence if current_chunk else sentence
+
+        if current_chunk.strip():
+            chunks.append({
+                'text': current_chunk.strip(),
+                'chunk_id': chunk_id,
+                'page_num': page_num,
+                'start_char': start_char,
+                'end_char': start_char + len(current_chunk)
+            })
+            chunk_id += 1
+
+    return chunks
+
+
+def random_page_text(rng: random.Random) -> str:
+    """Generate messy page text: odd whitespace, long sentences, no punctuation."""
+    pieces = []
+    for _ in range(rng.randint(0, 40)):
+        word_count = rng.choice([1, 3, 8, 20, 120])
+        words = [
+            "".join(rng.choices(string.ascii_letters + "-'", k=rng.randint(1, 12)))
+            for _ in range(word_count)
+        ]
+        separator = rng.choice([" ", " ", "\n", "  "])
+        pieces.append(separator.join(words) + rng.choice([".", "!", "?", "", ".)"]))
+    return "".join(piece + rng.choice([" ", "\n", "  ", "\n\n", ""]) for piece in pieces).strip()
+
+
+def check_properties(trials: int, tokenizer=None) -> int:
+    """Run randomized property checks; return the number of failures."""
+    rng = random.Random(1234)
+    failures = 0
+
+    for trial in range(trials):
+        pages = [{'page_num': i + 1, 'text': random_page_text(rng)} for i in range(3)]
+        chunk_size = rng.choice([40, 120, 500, 1000])
+        overlap = rng.choice([0, 10, 100, chunk_size // 2])
+        if tokenizer is not None:
+            chunk_size, overlap = max(8, chunk_size // 4), overlap // 4
+
+        chunks = chunk_text(pages, chunk_size=chunk_size, overlap=overlap, tokenizer=tokenizer)
+        texts = {page['page_num']: page['text'] for page in pages}
+
+        for expected_id, chunk in enumerate(chunks):
+            page_text = texts[chunk['page_num']]
+            if chunk['chunk_id'] != expected_id:
+                failures += 1
+                print(f"  trial {trial}: non-sequential chunk_id {chunk['chunk_id']}")
+            if page_text[chunk['start_char']:chunk['end_char']] != chunk['text']:
+                failures += 1
+                print(f"  trial {trial}: offsets do not slice to chunk text")
+            if not chunk['text'] or chunk['text'] != chunk['text'].strip():
+                failures += 1
+                print(f"  trial {trial}: empty or unstripped chunk")
+            if tokenizer is None and len(chunk['text']) > chunk_size:
+                # Only allowed for an overlap tail plus one over-long sentence
+                last_sentence_start = _sentence_spans(chunk['text'])[-1][0]
+                if len(chunk['text'][:last_sentence_start].rstrip()) > overlap:
+                    failures += 1
+                    print(f"  trial {trial}: chunk exceeds chunk_size with more than one sentence")
+
+        for page in pages:
+            covered = [False] * len(page['text'])
+            for chunk in chunks:
+                if chunk['page_num'] == page['page_num']:
+                    for i in range(chunk['start_char'], chunk['end_char']):
+                        covered[i] = True
+            for start, end in _sentence_spans(page['text']):
+                if not all(covered[start:end]):
+                    failures += 1
+                    print(f"  trial {trial}: sentence at {start} not covered")
+                    break
+
+    return failures
+
+
+def build_pages(page_count: int) -> List[Dict]:
+    rng = random.Random(42)
+    words = "the study examines methodology sampling results analysis data validity framework".split()
+    pages = []
+    for page_num in range(page_count):
+        sentences = [
+            " ".join(rng.choices(words, k=rng.randint(6, 30))).capitalize() + "."
+            for _ in range(rng.randint(15, 40))
+        ]
+        pages.append({'page_num': page_num + 1, 'text': " ".join(sentences)})
+    return pages
+
+
+def time_call(func, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--trials", type=int, default=300)
+    parser.add_argument("--tokens", action="store_true", help="Also check token-based sizing")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Chunking benchmark")
+    print("=" * 50 + "\n")
+
+    failures = check_properties(args.trials)
+    print(f"Property checks (characters): {'✅ passed' if not failures else f'❌ {failures} failures'}")
+
+    tokenizer = None
+    if args.tokens:
+        from sentence_transformers import SentenceTransformer
+        from utils.embeddings import EMBEDDING_MODEL_NAME
+        tokenizer = SentenceTransformer(EMBEDDING_MODEL_NAME).tokenizer
+        token_failures = check_properties(args.trials // 3, tokenizer=tokenizer)
+        print(f"Property checks (tokens):     {'✅ passed' if not token_failures else f'❌ {token_failures} failures'}")
+        failures += token_failures
+
+    pages = build_pages(args.pages)
+    total_chars = sum(len(page['text']) for page in pages)
+
+    legacy_time = time_call(lambda: legacy_chunk_text(pages))
+    new_time = time_call(lambda: chunk_text(pages))
+    legacy_count = len(legacy_chunk_text(pages))
+    new_count = len(chunk_text(pages))
+
+    print(f"\n{args.pages} pages, {total_chars:,} characters")
+    print(f"Legacy chunker:  {legacy_time * 1000:8.1f}ms  ({legacy_count} chunks)")
+    print(f"Span chunker:    {new_time * 1000:8.1f}ms  ({new_count} chunks)")
+    print(f"Speedup:         {legacy_time / new_time:8.2f}x")
+
+    if tokenizer is not None:
+        token_time = time_call(lambda: chunk_text(pages, chunk_size=128, overlap=24, tokenizer=tokenizer), repeats=2)
+        print(f"Token chunker:   {token_time * 1000:8.1f}ms  (128-token chunks)")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,380 @@
+"""
+Benchmark: compiled critique parser vs. the previous line-by-line parsers.
+
+Golden checks first: on randomized critiques (mixed case, overlapping
+keywords, non-ASCII case folding, repeated rewrite originals, nested
+headings) the new parsers, and the incremental parser fed the critique in
+random chunks, must return output identical to the legacy ones.
+Then all three parsers are timed on ~50KB critiques.
+
+Usage:
+    python -m benchmarks.bench_critique_parser [--kb 50] [--trials 400]
+"""
+
+import argparse
+import random
+import re
+import sys
+import time
+from typing import Dict, List
+
+from utils.critique_parser import parse_critique, IncrementalCritiqueParser
+
+
+def legacy_parse_critique_for_issues(critique_text: str) -> List[Dict]:
+    """The previous parse_critique_for_issues, kept as the golden reference."""
+    issues = []
+
+    # Look for quoted text (likely citations from the critique)
+    quote_pattern = r'"([^"]{20,200})"'
+    quotes = re.findall(quote_pattern, critique_text)
+
+    # Look for page references
+    page_pattern = r'(?:page|pg\.?|p\.)\s*(\d+)'
+
+    # Categorize issues based on section headers
+    current_type = 'general'
+    current_severity = 'major'  # Default to major
+
+    lines = critique_text.split('\n')
+
+    for i, line in enumerate(lines):
+        line_lower = line.lower()
+
+        # Detect severity level (enhanced)
+        if any(word in line_lower for word in ['critical', 'major issue', 'serious', 'fatal', 'fundamental']):
+            current_severity = 'critical'
+        elif any(word in line_lower for word in ['major', 'significant', 'important']):
+            current_severity = 'major'
+        elif any(word in line_lower for word in ['minor', 'small', 'typo', 'grammar']):
+            current_severity = 'minor'
+        elif any(word in line_lower for word in ['suggest', 'could', 'might', 'consider', 'recommendation']):
+            current_severity = 'suggestion'
+        elif any(word in line_lower for word in ['strength', 'well-written', 'excellent', 'good', 'clear']):
+            current_severity = 'strength'
+            current_type = 'strength'
+
+        # Detect issue type
+        if 'methodology' in line_lower or 'research design' in line_lower:
+            current_type = 'methodology'
+            if current_severity not in ['critical', 'strength']:
+                current_severity = 'major'  # Methodology issues are typically major
+        elif 'grammar' in line_lower or 'spelling' in line_lower or 'typo' in line_lower:
+            current_type = 'grammar'
+            if current_severity not in ['critical', 'major']:
+                current_severity = 'minor'
+        elif 'writing' in line_lower or 'clarity' in line_lower or 'style' in line_lower:
+            current_type = 'clarity'
+        elif 'logic' in line_lower or 'argument' in line_lower or 'reasoning' in line_lower:
+            current_type = 'logic'
+            if current_severity == 'minor':
+                current_severity = 'major'  # Logic issues are at least major
+
+        # Extract quoted text and suggestions
+        if '"' in line and i + 1 < len(lines):
+            snippet_match = re.search(quote_pattern, line)
+            if snippet_match:
+                text_snippet = snippet_match.group(1)
+
+                # Look for suggestion in next few lines
+                suggestion = ""
+                for j in range(i + 1, min(i + 4, len(lines))):
+                    if lines[j].strip() and not lines[j].startswith('#'):
+                        suggestion += lines[j].strip() + " "
+
+                # Extract page number if present
+                page_hint = None
+                page_match = re.search(page_pattern, line, re.IGNORECASE)
+                if page_match:
+                    page_hint = int(page_match.group(1))
+
+                issues.append({
+                    'type': current_type,
+                    'severity': current_severity,
+                    'text_snippet': text_snippet[:150],  # Limit length
+                    'suggestion': suggestion[:200].strip() if suggestion.strip() else 'Review and improve this section',
+                    'page_hint': page_hint
+                })
+
+    # If no issues found through parsing, create general issues from quotes
+    if not issues and quotes:
+        for quote in quotes[:5]:  # Limit to 5
+            issues.append({
+                'type': 'general',
+                'severity': 'major',
+                'text_snippet': quote[:150],
+                'suggestion': 'Review and revise this section',
+                'page_hint': None
+            })
+
+    return issues
+
+
+def legacy_parse_rewrite_suggestions(critique_text: str) -> List[Dict]:
+    """The previous parse_rewrite_suggestions, kept as the golden reference."""
+    rewrites = []
+
+    # Pattern for "X → Y" or "X should be Y" suggestions
+    arrow_pattern = r'"([^"]+)"\s*(?:→|->|should be|could be|replace with)\s*"([^"]+)"'
+    matches = re.findall(arrow_pattern, critique_text, re.IGNORECASE)
+
+    # Look for page references
+    page_pattern = r'(?:page|pg\.?|p\.)\s*(\d+)'
+
+    for original, suggested in matches:
+        # Find page number (search nearby text)
+        page_num = None
+        # Simple approach: look for page number in the same paragraph
+        context_start = max(0, critique_text.find(original) - 100)
+        context_end = min(len(critique_text), critique_text.find(original) + 100)
+        context = critique_text[context_start:context_end]
+
+        page_match = re.search(page_pattern, context, re.IGNORECASE)
+        if page_match:
+            page_num = int(page_match.group(1))
+
+        rewrites.append({
+            'original': original[:100],
+            'suggested': suggested[:100],
+            'explanation': 'Improves clarity and correctness',
+            'page_num': page_num
+        })
+
+    return rewrites[:10]  # Limit to 10 rewrites
+
+
+def legacy_parse_section_summaries(critique_text: str) -> List[Dict]:
+    """The previous parse_section_summaries, kept as the golden reference."""
+    summaries = []
+
+    # Define section keywords
+    sections = [
+        'abstract', 'introduction', 'literature review',
+        'methodology', 'results', 'discussion', 'conclusion'
+    ]
+
+    # Try to find section-specific content
+    for section in sections:
+        section_pattern = rf'##\s*{section}[^#]*'
+        section_match = re.search(section_pattern, critique_text, re.IGNORECASE)
+
+        if section_match:
+            section_content = section_match.group(0)
+
+            # Extract strengths
+            strengths = []
+            strength_patterns = [
+                r'strength[s]?:?\s*[-•]\s*([^\n]+)',
+                r'good:?\s*[-•]\s*([^\n]+)',
+                r'well[- ](?:written|done):?\s*[-•]\s*([^\n]+)'
+            ]
+            for pattern in strength_patterns:
+                strengths.extend(re.findall(pattern, section_content, re.IGNORECASE))
+
+            # Extract issues
+            issues = []
+            issue_patterns = [
+                r'issue[s]?:?\s*[-•]\s*([^\n]+)',
+                r'problem[s]?:?\s*[-•]\s*([^\n]+)',
+                r'concern[s]?:?\s*[-•]\s*([^\n]+)',
+                r'weakness[es]*:?\s*[-•]\s*([^\n]+)'
+            ]
+            for pattern in issue_patterns:
+                issues.extend(re.findall(pattern, section_content, re.IGNORECASE))
+
+            # Extract suggestions
+            suggestions = []
+            suggestion_patterns = [
+                r'suggest[ion]*[s]?:?\s*[-•]\s*([^\n]+)',
+                r'recommend[ation]*[s]?:?\s*[-•]\s*([^\n]+)',
+                r'should:?\s*[-•]\s*([^\n]+)'
+            ]
+            for pattern in suggestion_patterns:
+                suggestions.extend(re.findall(pattern, section_content, re.IGNORECASE))
+
+            # Extract score if present (e.g., "Score: 7/10")
+            score = 7  # Default
+            score_match = re.search(r'score:?\s*(\d+)(?:/10)?', section_content, re.IGNORECASE)
+            if score_match:
+                score = int(score_match.group(1))
+
+            # Try to find page number
+            page_num = None
+            page_match = re.search(r'(?:page|pg\.?|p\.)\s*(\d+)', section_content, re.IGNORECASE)
+            if page_match:
+                page_num = int(page_match.group(1))
+
+            if strengths or issues or suggestions:
+                summaries.append({
+                    'section': section.title(),
+                    'page_num': page_num,
+                    'strengths': strengths[:3],
+                    'issues': issues[:3],
+                    'suggestions': suggestions[:3],
+                    'score': min(10, max(1, score))
+                })
+
+    return summaries
+
+
+FRAGMENTS = [
+    "## Major Issues", "## MAJOR Issues", "### Minor Issues", "## Strengths", "## Suggestions",
+    "## Methodology", "##methodology review", "## Literature Review", "## Results", "## Discussion",
+    "## Conclusion", "## Abstract", "## Introduction", "# Full Review", "###Results",
+    "Critical flaw in the research design.", "This is a fundamental problem.", "Serious concern.",
+    "Significant gap in the argument.", "Important: the reasoning is circular.",
+    "Small typo here.", "Grammar and spelling need work.", "Writing style lacks clarity.",
+    "You could consider a larger sample.", "Recommendation: add a pilot study.", "It might help.",
+    "Well-written and clear.", "Excellent literature coverage.", "Good use of logic.",
+    "Strengths: - Clear objectives", "Issues: - Vague hypothesis", "Problem - weak sampling",
+    "Concerns: - missing ethics approval", "Weaknesses - no limitations section",
+    "Suggestion: - add a figure", "Recommendations - reorganize chapter 2", "Should - cite more",
+    "Good: - structure", "Well done - abstract", "Score: 6/10", "score 9", "Score: 12/10",
+    "See page 4.", "(Page 12)", "pg. 7", "p.3", "P. 15", "PAGE 2",
+    "majoreasoning", "stylexcellent", "methodological", "typography", "suggestions",
+    "İSTANBUL MAJOR", "reſults", "ΜΑΘΗΜΑΤΙΚΑΣ serious", "ſmall", "KELVIN \u212a",
+    "-", "•", "- ", "", "   ",
+]
+
+QUOTES = [
+    "The study aims to investigate factors affecting student performance",
+    "Data was collected from respondents using a survey instrument",
+    "short quote",
+    "This research will prove that social media causes anxiety in all teenagers",
+    "The results shows significant correlation between the two variables",
+]
+
+
+def random_critique(rng: random.Random, target_chars: int) -> str:
+    """Build a messy critique mixing headings, keywords, quotes and rewrites."""
+    parts = []
+    size = 0
+    while size < target_chars:
+        roll = rng.random()
+        if roll < 0.55:
+            piece = rng.choice(FRAGMENTS)
+        elif roll < 0.75:
+            piece = f'- "{rng.choice(QUOTES)}" ' + rng.choice(["(Page 3)", "p. 8", "", "see pg 11"])
+        elif roll < 0.85:
+            original, suggested = rng.sample(QUOTES, 2)
+            arrow = rng.choice(["→", "->", "should be", "Could Be", "replace with", " -> "])
+            piece = f'"{original}" {arrow} "{suggested}"'
+        elif roll < 0.9:
+            # Quotes spanning lines only matter to the fallback quote scan
+            piece = '"' + rng.choice(QUOTES) + '\n' + rng.choice(QUOTES) + '"'
+        else:
+            piece = " ".join(rng.choice(FRAGMENTS) for _ in range(rng.randint(2, 6)))
+        if rng.random() < 0.2:
+            piece = piece.upper() if rng.random() < 0.5 else piece.lower()
+        separator = rng.choice(["\n", "\n", "\n\n", " ", "  "])
+        parts.append(piece + separator)
+        size += len(piece) + len(separator)
+    return "".join(parts)
+
+
+PROSE_WORDS = (
+    "the study sample data analysis chapter results hypothesis variables participants "
+    "survey instrument reliability validity theory framework findings"
+).split()
+PROSE_KEYWORDS = ["major", "clear", "could", "consider", "methodology", "argument", "typo", "significant", "good", "style"]
+
+
+def prose_critique(rng: random.Random, target_chars: int) -> str:
+    """Build a critique shaped like real model output: prose lines, sparse keywords."""
+    lines = []
+    size = 0
+    while size < target_chars:
+        roll = rng.random()
+        if roll < 0.05:
+            line = "## " + rng.choice(["Major Issues", "Minor Issues", "Methodology", "Results", "Strengths"])
+        elif roll < 0.3:
+            line = f'- "{" ".join(rng.choices(PROSE_WORDS, k=8))}" (Page {rng.randint(1, 40)})'
+        else:
+            words = rng.choices(PROSE_WORDS, k=rng.randint(12, 30))
+            if rng.random() < 0.5:
+                words.insert(rng.randrange(len(words)), rng.choice(PROSE_KEYWORDS))
+            line = "  " + " ".join(words).capitalize() + "."
+        lines.append(line)
+        size += len(line) + 1
+    return "\n".join(lines)
+
+
+def legacy_parse(critique_text: str) -> Dict[str, List[Dict]]:
+    return {
+        'issues': legacy_parse_critique_for_issues(critique_text),
+        'rewrites': legacy_parse_rewrite_suggestions(critique_text),
+        'section_summaries': legacy_parse_section_summaries(critique_text)
+    }
+
+
+def check_golden(trials: int) -> int:
+    """Compare new and legacy output on randomized critiques; return failures."""
+    rng = random.Random(2024)
+    failures = 0
+    for trial in range(trials):
+        text = random_critique(rng, rng.choice([0, 50, 400, 3000, 12000]))
+        expected = legacy_parse(text)
+        actual = parse_critique(text)
+        for key in expected:
+            if expected[key] != actual[key]:
+                failures += 1
+                print(f"  trial {trial}: {key} differs")
+
+        # The streaming parser must agree for any chunking of the stream
+        streaming = IncrementalCritiqueParser()
+        position = 0
+        while position < len(text):
+            size = rng.choice([1, 4, 16, 64, 512])
+            streaming.feed(text[position:position + size])
+            position += size
+        if streaming.close() != expected:
+            failures += 1
+            print(f"  trial {trial}: incremental parser differs")
+    return failures
+
+
+def time_call(func, repeats: int = 5) -> float:
+    best = float("inf")
+    for _ in range(repeats):
+        start = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - start)
+    return best
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--kb", type=int, default=50)
+    parser.add_argument("--trials", type=int, default=400)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Critique parser benchmark")
+    print("=" * 50 + "\n")
+
+    failures = check_golden(args.trials)
+    print(f"Golden checks ({args.trials} critiques): {'✅ identical' if not failures else f'❌ {failures} differences'}")
+
+    corpora = {
+        'prose': [prose_critique(random.Random(seed), args.kb * 1024) for seed in range(5)],
+        'keyword-dense': [random_critique(random.Random(seed), args.kb * 1024) for seed in range(5)],
+    }
+
+    for name, texts in corpora.items():
+        if any(legacy_parse(text) != parse_critique(text) for text in texts):
+            failures += 1
+            print(f"❌ {name} benchmark critiques differ from the legacy output")
+
+        legacy_time = time_call(lambda: [legacy_parse(text) for text in texts])
+        new_time = time_call(lambda: [parse_critique(text) for text in texts])
+
+        print(f"\n{len(texts)} {name} critiques of ~{args.kb}KB")
+        print(f"Legacy parsers:   {legacy_time / len(texts) * 1000:8.2f}ms per critique")
+        print(f"Compiled parser:  {new_time / len(texts) * 1000:8.2f}ms per critique")
+        print(f"Speedup:          {legacy_time / new_time:8.2f}x")
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
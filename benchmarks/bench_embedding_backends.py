@@ -0,0 +1,178 @@
+"""
+Benchmark: CPU embedding backends vs. the full-precision PyTorch model.
+
+Chunks a synthetic thesis, then encodes the chunks and a set of retrieval
+queries with every backend in utils.embedding_backends. Each backend runs in
+a fresh process, so the memory it reports belongs to it alone. Reports:
+
+- encode throughput (chunks/s) and speedup over 'torch'
+- resident memory after loading the model, and peak while encoding
+- retrieval agreement: mean top-5 overlap with the 'torch' results over
+  all queries, plus mean cosine similarity of chunk vectors
+
+Fails (exit 1) if a backend's top-5 overlap drops below --min-overlap.
+Backends whose optional packages are missing are reported and skipped.
+
+Usage:
+    python -m benchmarks.bench_embedding_backends [--pages 60] [--backends torch onnx-int8]
+"""
+
+import argparse
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+
+import numpy as np
+
+from benchmarks.bench_annotation_output import peak_rss_mb
+from benchmarks.bench_large_ingestion import build_synthetic_pdf
+from utils.embedding_backends import EMBEDDING_BACKENDS, load_model
+from utils.embeddings import EMBEDDING_MODEL_NAME
+from utils.ingestion import current_rss_mb
+from utils.pdf_processor import chunk_text, extract_text_with_metadata
+from utils.prompts import MODE_QUERIES
+
+
+TOP_K = 5
+
+DEFAULT_MIN_OVERLAP = 0.8
+
+
+def build_corpus(pages: int, query_count: int, seed: int = 13):
+    """Chunk texts of a synthetic thesis, and queries (review-mode queries plus sampled phrases)."""
+    pdf_data = extract_text_with_metadata(build_synthetic_pdf(pages))
+    texts = [chunk['text'] for chunk in chunk_text(pdf_data['pages'])]
+
+    rng = random.Random(seed)
+    queries = list(MODE_QUERIES.values())
+    while len(queries) < query_count:
+        words = rng.choice(texts).split()
+        start = rng.randrange(max(1, len(words) - 10))
+        queries.append(" ".join(words[start:start + 10]))
+    return texts, queries
+
+
+def run_backend(backend: str, corpus_path: str, output_path: str, batch_size: int) -> dict:
+    """Load one backend and encode the corpus (called in a child process)."""
+    with open(corpus_path, encoding="utf-8") as corpus_file:
+        corpus = json.load(corpus_file)
+
+    rss_start = current_rss_mb()
+    start = time.perf_counter()
+    model = load_model(EMBEDDING_MODEL_NAME, backend)
+    load_seconds = time.perf_counter() - start
+    rss_loaded = current_rss_mb()
+
+    model.encode(corpus['texts'][:batch_size], batch_size=batch_size)  # Warm-up
+
+    start = time.perf_counter()
+    chunk_vectors = np.asarray(model.encode(corpus['texts'], batch_size=batch_size), dtype=np.float32)
+    encode_seconds = time.perf_counter() - start
+    query_vectors = np.asarray(model.encode(corpus['queries']), dtype=np.float32)
+
+    np.savez(output_path, chunks=chunk_vectors, queries=query_vectors)
+    return {
+        'load_seconds': load_seconds,
+        'encode_seconds': encode_seconds,
+        'model_mb': rss_loaded - rss_start,
+        'peak_mb': peak_rss_mb()
+    }
+
+
+def normalize(vectors: np.ndarray) -> np.ndarray:
+    return vectors / np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+
+
+def top_k(chunk_vectors: np.ndarray, query_vectors: np.ndarray, k: int = TOP_K) -> np.ndarray:
+    """Indices of the k most similar chunks per query."""
+    scores = normalize(query_vectors) @ normalize(chunk_vectors).T
+    return np.argsort(-scores, axis=1)[:, :k]
+
+
+def agreement(baseline: dict, candidate: dict) -> dict:
+    """Top-k overlap and vector similarity of a backend against the baseline."""
+    expected = top_k(baseline['chunks'], baseline['queries'])
+    actual = top_k(candidate['chunks'], candidate['queries'])
+    overlaps = [len(set(e) & set(a)) / TOP_K for e, a in zip(expected, actual)]
+    cosines = np.sum(normalize(baseline['chunks']) * normalize(candidate['chunks']), axis=1)
+    return {
+        'overlap': float(np.mean(overlaps)),
+        'min_overlap': float(np.min(overlaps)),
+        'cosine': float(np.mean(cosines))
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--batch-size", type=int, default=64)
+    parser.add_argument("--backends", nargs="+", default=list(EMBEDDING_BACKENDS), choices=EMBEDDING_BACKENDS)
+    parser.add_argument("--min-overlap", type=float, default=DEFAULT_MIN_OVERLAP)
+    parser.add_argument("--child", choices=EMBEDDING_BACKENDS, help=argparse.SUPPRESS)
+    parser.add_argument("--corpus", help=argparse.SUPPRESS)
+    parser.add_argument("--output", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        print(json.dumps(run_backend(args.child, args.corpus, args.output, args.batch_size)))
+        return 0
+
+    print("=" * 50)
+    print("Embedding backend benchmark")
+    print("=" * 50 + "\n")
+
+    texts, queries = build_corpus(args.pages, args.queries)
+    work_dir = tempfile.mkdtemp()
+    corpus_path = os.path.join(work_dir, "corpus.json")
+    with open(corpus_path, "w", encoding="utf-8") as corpus_file:
+        json.dump({'texts': texts, 'queries': queries}, corpus_file)
+    print(f"{len(texts)} chunks, {len(queries)} queries, {os.cpu_count()} CPUs\n")
+
+    backends = ["torch"] + [backend for backend in args.backends if backend != "torch"]
+    results = {}
+    vectors = {}
+    for backend in backends:
+        output_path = os.path.join(work_dir, f"{backend}.npz")
+        completed = subprocess.run(
+            [sys.executable, "-m", "benchmarks.bench_embedding_backends", "--child", backend,
+             "--corpus", corpus_path, "--output", output_path, "--batch-size", str(args.batch_size)],
+            capture_output=True, text=True
+        )
+        if completed.returncode != 0:
+            error = (completed.stderr.strip().splitlines() or ["unknown error"])[-1]
+            print(f"⚠️ {backend}: skipped ({error})")
+            continue
+        results[backend] = json.loads(completed.stdout.strip().splitlines()[-1])
+        with np.load(output_path) as saved:
+            vectors[backend] = {'chunks': saved['chunks'], 'queries': saved['queries']}
+
+    if "torch" not in results:
+        print("❌ The baseline 'torch' backend could not run")
+        return 1
+
+    baseline = results["torch"]
+    print(f"\n{'Backend':<12}{'Chunks/s':>10}{'Speedup':>9}{'Model':>9}{'Peak':>9}"
+          f"{'Top-5':>8}{'Worst':>7}{'Cosine':>8}")
+    failures = 0
+    for backend, result in results.items():
+        throughput = len(texts) / result['encode_seconds']
+        speedup = baseline['encode_seconds'] / result['encode_seconds']
+        match = agreement(vectors["torch"], vectors[backend])
+        print(f"{backend:<12}{throughput:>10.0f}{speedup:>8.2f}x{result['model_mb']:>7.0f}MB"
+              f"{result['peak_mb']:>7.0f}MB{match['overlap']:>8.1%}{match['min_overlap']:>7.0%}"
+              f"{match['cosine']:>8.4f}")
+        if match['overlap'] < args.min_overlap:
+            failures += 1
+
+    if failures:
+        print(f"\n❌ {failures} backend(s) below {args.min_overlap:.0%} mean top-{TOP_K} overlap")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
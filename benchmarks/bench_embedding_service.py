@@ -0,0 +1,287 @@
+"""
+Load test: concurrent sessions encoding directly vs. through EmbeddingService.
+
+Simulates Streamlit sessions sharing one embedding model. Each session
+issues a mix of retrieval query encodes (1-3 short queries, as in
+retrieve_relevant_chunks) and document batches (64 thesis chunks, as in
+generate_embeddings), with short think times in between. The same workload
+runs twice:
+
+- direct:  every session calls the shared model concurrently (documents
+           in length buckets, as generate_embeddings does for a plain model)
+- service: every session goes through one micro-batching EmbeddingService
+           (a document batch is one request; the service buckets it)
+
+Reports wall time, throughput, per-request latency (p50/p95) for queries
+and document batches, and the service's queue wait and batch size
+histogram and encode throughput (model time only). A starvation case
+then floods the service with back-to-back queries from many sessions and
+submits one document batch in the middle. Fails (exit 1) if the service
+returns different vectors or the document batch does not finish while
+the flood lasts.
+
+With sentence-transformers installed the real model is used; otherwise a
+simulated model with MiniLM-sized matrix work and a fixed per-call
+overhead stands in for it (reported as such).
+
+Usage:
+    python -m benchmarks.bench_embedding_service [--sessions 8] [--requests 20] [--model auto]
+"""
+
+import argparse
+import hashlib
+import random
+import sys
+import threading
+import time
+from concurrent.futures import TimeoutError as FutureTimeoutError
+
+import numpy as np
+
+from benchmarks.bench_encoding_scheduler import build_thesis_pdf
+from utils.embedding_service import (
+    EmbeddingService, DEFAULT_MAX_BATCH_SIZE, DEFAULT_MAX_BATCH_TOKENS, DEFAULT_MAX_WAIT_MS
+)
+from utils.encoding_scheduler import EncodingStats, encode_bucketed, token_lengths
+from utils.pdf_processor import chunk_text, extract_text_with_metadata
+from utils.prompts import MODE_QUERIES
+
+
+# Chunks per document batch (iter_embedding_batches' default)
+DOCUMENT_BATCH = 64
+
+# Share of session requests that are document batches
+DOCUMENT_SHARE = 0.2
+
+MIN_COSINE = 0.9999
+
+# Starvation case: query sessions, and how long they keep the queue full
+FLOOD_SESSIONS = 48
+FLOOD_SECONDS = 15.0
+
+
+class SimulatedModel:
+    """
+    CPU stand-in for all-MiniLM-L6-v2 with the SentenceTransformer encode API.
+
+    Each encode call pays a fixed GIL-holding overhead (tokenization, module
+    dispatch) plus six transformer-sized matrix layers over the padded
+    batch. Vectors depend only on the text, so any batching gives the same
+    output.
+    """
+
+    tokenizer = None
+    max_seq_length = 256
+    dimension = 384
+    layers = 6
+
+    def __init__(self, call_overhead_ms: float = 2.0, seed: int = 5):
+        rng = np.random.default_rng(seed)
+        self.call_overhead = call_overhead_ms / 1000
+        self.up = rng.standard_normal((self.dimension, 4 * self.dimension)).astype(np.float32) * 0.05
+        self.down = rng.standard_normal((4 * self.dimension, self.dimension)).astype(np.float32) * 0.05
+
+    def get_sentence_embedding_dimension(self) -> int:
+        return self.dimension
+
+    def _vector(self, text: str) -> np.ndarray:
+        seed = int.from_bytes(hashlib.sha1(text.encode("utf-8")).digest()[:8], "little")
+        vector = np.random.default_rng(seed).standard_normal(self.dimension).astype(np.float32)
+        return vector / np.linalg.norm(vector)
+
+    def encode(self, sentences, batch_size: int = 32, show_progress_bar: bool = False) -> np.ndarray:
+        lengths = token_lengths(sentences, max_length=self.max_seq_length)
+        for start in range(0, len(sentences), batch_size):
+            deadline = time.perf_counter() + self.call_overhead
+            while time.perf_counter() < deadline:
+                pass
+            hidden = np.ones((len(lengths[start:start + batch_size]) * max(lengths[start:start + batch_size]),
+                              self.dimension), dtype=np.float32)
+            for _ in range(self.layers):
+                hidden = np.tanh(hidden @ self.up) @ self.down
+        return np.vstack([self._vector(text) for text in sentences])
+
+
+def load_benchmark_model(kind: str):
+    """Real model when requested or available, otherwise SimulatedModel; returns (model, label)."""
+    if kind != "simulated":
+        try:
+            from utils.embedding_backends import load_model
+            from utils.embeddings import EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND
+            return load_model(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND), f"{EMBEDDING_MODEL_NAME} ({EMBEDDING_BACKEND})"
+        except ImportError:
+            if kind == "real":
+                raise
+    return SimulatedModel(), "simulated MiniLM-sized model (sentence-transformers not installed)"
+
+
+def build_workload(texts, queries, sessions: int, requests: int, seed: int = 3):
+    """Per-session request lists: ('query'|'document', texts, think seconds)."""
+    rng = random.Random(seed)
+    workload = []
+    for _ in range(sessions):
+        plan = []
+        for _ in range(requests):
+            if rng.random() < DOCUMENT_SHARE:
+                start = rng.randrange(max(1, len(texts) - DOCUMENT_BATCH))
+                plan.append(('document', texts[start:start + DOCUMENT_BATCH], rng.uniform(0, 0.02)))
+            else:
+                plan.append(('query', rng.sample(queries, rng.randint(1, 3)), rng.uniform(0, 0.02)))
+        workload.append(plan)
+    return workload
+
+
+def run_workload(encoder, workload):
+    """Run every session on its own thread; returns (wall seconds, latencies by kind, vectors by request)."""
+    latencies = {'query': [], 'document': []}
+    vectors = {}
+    lock = threading.Lock()
+    barrier = threading.Barrier(len(workload) + 1)
+
+    def session(session_id, plan):
+        barrier.wait()
+        for request_id, (kind, texts, think) in enumerate(plan):
+            time.sleep(think)
+            start = time.perf_counter()
+            if kind == 'document' and not isinstance(encoder, EmbeddingService):
+                result = encode_bucketed(encoder, texts)
+            else:
+                result = np.asarray(encoder.encode(texts), dtype=np.float32)
+            elapsed = time.perf_counter() - start
+            with lock:
+                latencies[kind].append(elapsed)
+                vectors[(session_id, request_id)] = result
+
+    threads = [threading.Thread(target=session, args=(i, plan)) for i, plan in enumerate(workload)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return time.perf_counter() - start, latencies, vectors
+
+
+def check_starvation(service: EmbeddingService, texts, queries, seed: int = 9) -> str:
+    """
+    Submit a document batch while query sessions keep the queue busy.
+
+    Returns:
+        '' if the batch finished during the flood, otherwise a failure message
+    """
+    stop = threading.Event()
+    rng = random.Random(seed)
+    plans = [[rng.sample(queries, rng.randint(1, 3)) for _ in range(50)] for _ in range(FLOOD_SESSIONS)]
+    served = [0] * FLOOD_SESSIONS
+
+    def flood(session_id):
+        plan = plans[session_id]
+        while not stop.is_set():
+            service.encode(plan[served[session_id] % len(plan)])
+            served[session_id] += 1
+
+    threads = [threading.Thread(target=flood, args=(i,), daemon=True) for i in range(FLOOD_SESSIONS)]
+    for thread in threads:
+        thread.start()
+    time.sleep(0.5)
+
+    start = time.perf_counter()
+    future = service.submit(texts[:DOCUMENT_BATCH])
+    try:
+        future.result(timeout=FLOOD_SECONDS)
+        latency = time.perf_counter() - start
+    except FutureTimeoutError:
+        latency = None
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    print(f"\nStarvation: {FLOOD_SESSIONS} sessions sending back-to-back queries "
+          f"({sum(served)} queries served)")
+    if latency is None:
+        return f"document batch still queued after {FLOOD_SECONDS:g}s of query traffic"
+    print(f"Document batch under query flood: {1000 * latency:.0f}ms")
+    return ""
+
+
+def percentile_ms(values, fraction: float) -> float:
+    ordered = sorted(values)
+    return 1000 * ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] if ordered else 0.0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sessions", type=int, default=8)
+    parser.add_argument("--requests", type=int, default=20, help="Requests per session")
+    parser.add_argument("--pages", type=int, default=40)
+    parser.add_argument("--max-wait-ms", type=float, default=DEFAULT_MAX_WAIT_MS)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--max-batch-tokens", type=int, default=DEFAULT_MAX_BATCH_TOKENS)
+    parser.add_argument("--model", choices=["auto", "real", "simulated"], default="auto")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Embedding service load test")
+    print("=" * 50 + "\n")
+
+    model, label = load_benchmark_model(args.model)
+    pdf_data = extract_text_with_metadata(build_thesis_pdf(args.pages))
+    texts = [chunk['text'] for chunk in chunk_text(pdf_data['pages'])]
+    queries = list(MODE_QUERIES.values()) + [text[:80] for text in texts[::7]]
+    workload = build_workload(texts, queries, args.sessions, args.requests)
+    total_texts = sum(len(request[1]) for plan in workload for request in plan)
+
+    print(f"Model: {label}")
+    print(f"{args.sessions} sessions x {args.requests} requests, {total_texts} texts\n")
+
+    model.encode(texts[:DOCUMENT_BATCH])  # Warm-up
+    direct_seconds, direct_latencies, direct_vectors = run_workload(model, workload)
+
+    encoding_stats = EncodingStats()
+    service = EmbeddingService(model, max_batch_size=args.max_batch_size, max_batch_tokens=args.max_batch_tokens,
+                               max_wait_ms=args.max_wait_ms, encoding_stats=encoding_stats)
+    service_seconds, service_latencies, service_vectors = run_workload(service, workload)
+    stats = service.stats()
+    encoding = encoding_stats.snapshot()
+    service.close()
+
+    print(f"{'':<10}{'Wall':>8}{'Texts/s':>9}{'Query p50':>11}{'p95':>9}{'Doc p50':>10}{'p95':>9}")
+    for name, seconds, latencies in (("direct", direct_seconds, direct_latencies),
+                                     ("service", service_seconds, service_latencies)):
+        print(f"{name:<10}{seconds:>7.2f}s{total_texts / seconds:>9.0f}"
+              f"{percentile_ms(latencies['query'], 0.5):>9.0f}ms{percentile_ms(latencies['query'], 0.95):>7.0f}ms"
+              f"{percentile_ms(latencies['document'], 0.5):>8.0f}ms{percentile_ms(latencies['document'], 0.95):>7.0f}ms")
+    print(f"\nSpeedup: {direct_seconds / service_seconds:.2f}x wall time")
+
+    print(f"\nService: {stats['requests']} requests in {stats['batches']} micro-batches "
+          f"({stats['mean_requests_per_batch']:.1f} requests, {stats['mean_batch_size']:.1f} texts each)")
+    print(f"Queue wait: mean {stats['wait_ms']['mean']:.1f}ms, p50 {stats['wait_ms']['p50']:.1f}ms, "
+          f"p95 {stats['wait_ms']['p95']:.1f}ms, max {stats['wait_ms']['max']:.1f}ms")
+    print("Batch sizes (texts): " + ", ".join(f"{size}: {count}" for size, count in stats['batch_sizes'].items()))
+    print(f"Encoding: {encoding['tokens_per_second']:,.0f} tokens/s over {encoding['seconds']:.2f}s of model time, "
+          f"{encoding['batches']} passes, {encoding['padding_ratio']:.2f}x padding")
+
+    worst = min(
+        float(np.min(np.sum(direct_vectors[key] * service_vectors[key], axis=1) / (
+            np.linalg.norm(direct_vectors[key], axis=1) * np.linalg.norm(service_vectors[key], axis=1)
+        )))
+        for key in direct_vectors
+    )
+    if worst < MIN_COSINE:
+        print(f"\n❌ Service vectors differ from direct encoding (min cosine {worst:.6f})")
+        return 1
+    print(f"\n✅ Same vectors as direct encoding (min cosine {worst:.6f})")
+
+    service = EmbeddingService(model, max_batch_size=args.max_batch_size, max_batch_tokens=args.max_batch_tokens,
+                               max_wait_ms=args.max_wait_ms)
+    failure = check_starvation(service, texts, queries)
+    service.close()
+    if failure:
+        print(f"❌ Starvation: {failure}")
+        return 1
+    print("✅ Document batch made progress under query load")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
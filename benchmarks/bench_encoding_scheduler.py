@@ -0,0 +1,192 @@
+"""
+Benchmark: length-bucketed encoding vs. fixed-size batches on thesis chunks.
+
+Builds a synthetic thesis whose pages mix body text, chapter openings,
+table-of-contents and table pages, and reference lists, so the chunk
+lengths look like a real thesis (many full chunks, plus short headings,
+captions and page tails). Reports for each batching strategy:
+
+- forward passes and padded tokens (what the model actually processes)
+- padding overhead: padded / real tokens
+
+Strategies are document order in fixed batches (the pre-scheduler
+behaviour), character-sorted fixed batches (what sentence-transformers
+does inside one encode call), and the token-budget plan of
+utils.encoding_scheduler.
+
+If sentence-transformers is installed, both encode paths are also timed
+on the real model (tokens/s) and the benchmark fails (exit 1) if the
+bucketed vectors differ from plain model.encode.
+
+Usage:
+    python -m benchmarks.bench_encoding_scheduler [--pages 120] [--batch-size 32] [--no-encode]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import numpy as np
+import fitz  # PyMuPDF
+
+from utils.encoding_scheduler import (
+    DEFAULT_TOKEN_BUDGET, DEFAULT_MAX_BATCH_SIZE, EncodingStats,
+    encode_bucketed, plan_batches, padded_tokens, token_lengths
+)
+from utils.pdf_processor import chunk_text, extract_text_with_metadata
+
+
+WORDS = (
+    "research methodology sampling participants analysis results discussion "
+    "validity reliability framework literature theory hypothesis variable "
+    "significant findings data collection instrument questionnaire interview "
+    "qualitative quantitative conclusion recommendation limitation study"
+).split()
+
+# Minimum cosine similarity between bucketed and plain encode vectors
+MIN_COSINE = 0.9999
+
+
+def _sentence(rng: random.Random) -> str:
+    return " ".join(rng.choices(WORDS, k=rng.randint(8, 18))).capitalize() + "."
+
+
+def _page_text(rng: random.Random, page_num: int) -> str:
+    """Text of one page; the page kind follows a rough thesis layout."""
+    kind = rng.choices(
+        ["body", "short", "chapter", "toc", "table", "references"],
+        weights=[55, 10, 8, 6, 11, 10]
+    )[0]
+
+    if kind == "chapter":
+        return (f"CHAPTER {page_num // 20 + 1}\n\n{rng.choice(WORDS).upper()} AND {rng.choice(WORDS).upper()}\n\n"
+                + " ".join(_sentence(rng) for _ in range(rng.randint(2, 6))))
+    if kind == "toc":
+        return "\n".join(
+            f"{section}.{sub} {' '.join(rng.choices(WORDS, k=3)).title()} ........ {rng.randint(1, 200)}"
+            for section in range(1, 6) for sub in range(1, rng.randint(3, 7))
+        )
+    if kind == "table":
+        rows = [f"Table {page_num}.{rng.randint(1, 4)} {' '.join(rng.choices(WORDS, k=5)).title()}"]
+        rows += [" ".join(f"{rng.random() * 100:.2f}" for _ in range(6)) for _ in range(rng.randint(5, 15))]
+        rows.append(f"Note. {_sentence(rng)}")
+        return "\n".join(rows) + "\n\n" + " ".join(_sentence(rng) for _ in range(rng.randint(1, 8)))
+    if kind == "references":
+        return "\n".join(
+            f"{rng.choice(WORDS).title()}, {chr(65 + rng.randrange(26))}. ({rng.randint(1990, 2024)}) "
+            f"{' '.join(rng.choices(WORDS, k=rng.randint(5, 12))).capitalize()}. Journal of "
+            f"{rng.choice(WORDS).title()}, {rng.randint(1, 40)}({rng.randint(1, 6)}), "
+            f"{rng.randint(1, 300)}-{rng.randint(301, 600)}"
+            for _ in range(rng.randint(8, 16))
+        )
+    if kind == "short":
+        return " ".join(_sentence(rng) for _ in range(rng.randint(3, 10)))
+    return " ".join(_sentence(rng) for _ in range(rng.randint(22, 32)))
+
+
+def build_thesis_pdf(page_count: int, seed: int = 11) -> bytes:
+    """Create a PDF with a thesis-like mix of page kinds."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_num in range(page_count):
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), _page_text(rng, page_num), fontsize=9, fontname="helv")
+    pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return pdf_bytes
+
+
+def fixed_batches(order, batch_size: int):
+    return [order[i:i + batch_size] for i in range(0, len(order), batch_size)]
+
+
+def padding_report(texts, lengths, batch_size: int, token_budget: int, max_batch_size: int) -> None:
+    """Print forward passes and padding per batching strategy."""
+    real = sum(lengths)
+    by_chars = sorted(range(len(texts)), key=lambda i: -len(texts[i]))
+    strategies = [
+        (f"Document order, {batch_size}", fixed_batches(list(range(len(texts))), batch_size)),
+        (f"Sorted by chars, {batch_size}", fixed_batches(by_chars, batch_size)),
+        (f"Token budget {token_budget}", plan_batches(lengths, token_budget, max_batch_size))
+    ]
+
+    print(f"{'Strategy':<26}{'Passes':>8}{'Padded':>10}{'Overhead':>10}")
+    for name, batches in strategies:
+        padded = padded_tokens(lengths, batches)
+        print(f"{name:<26}{len(batches):>8}{padded:>10}{padded / real:>9.2f}x")
+
+
+def encode_report(texts, batch_size: int, token_budget: int, max_batch_size: int) -> int:
+    """Time plain and bucketed encoding on the real model; returns the number of failures."""
+    from utils.embeddings import EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND
+    from utils.embedding_backends import load_model
+
+    model = load_model(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND)
+    model.encode(texts[:batch_size], batch_size=batch_size)  # Warm-up
+
+    # Measuring lengths is part of the bucketed path, so time it too
+    start = time.perf_counter()
+    lengths = token_lengths(texts, model.tokenizer, model.max_seq_length)
+    real = sum(lengths)
+    plain = np.asarray(model.encode(texts, batch_size=batch_size), dtype=np.float32)
+    plain_seconds = time.perf_counter() - start
+
+    stats = EncodingStats()
+    start = time.perf_counter()
+    bucketed = encode_bucketed(model, texts, token_budget, max_batch_size, stats=stats)
+    bucketed_seconds = time.perf_counter() - start
+
+    snapshot = stats.snapshot()
+    cosines = np.sum(plain * bucketed, axis=1) / (
+        np.linalg.norm(plain, axis=1) * np.linalg.norm(bucketed, axis=1)
+    )
+
+    print(f"\nReal model ({EMBEDDING_BACKEND}), {real} tokens:")
+    print(f"  model.encode, batch {batch_size}:  {plain_seconds:.2f}s ({real / plain_seconds:.0f} tokens/s)")
+    print(f"  encode_bucketed:          {bucketed_seconds:.2f}s ({real / bucketed_seconds:.0f} tokens/s, "
+          f"{snapshot['batches']} passes, {snapshot['padding_ratio']:.2f}x padding)")
+    print(f"  Speedup: {plain_seconds / bucketed_seconds:.2f}x, min cosine {cosines.min():.6f}")
+
+    if cosines.min() < MIN_COSINE:
+        print(f"\n❌ Bucketed vectors differ from model.encode (min cosine {cosines.min():.6f})")
+        return 1
+    return 0
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=120)
+    parser.add_argument("--batch-size", type=int, default=32,
+                        help="Fixed batch size of the baselines (sentence-transformers default)")
+    parser.add_argument("--token-budget", type=int, default=DEFAULT_TOKEN_BUDGET)
+    parser.add_argument("--max-batch-size", type=int, default=DEFAULT_MAX_BATCH_SIZE)
+    parser.add_argument("--no-encode", action="store_true", help="Skip the real-model timing")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Encoding scheduler benchmark")
+    print("=" * 50 + "\n")
+
+    pdf_data = extract_text_with_metadata(build_thesis_pdf(args.pages))
+    texts = [chunk['text'] for chunk in chunk_text(pdf_data['pages'])]
+
+    # Estimated lengths (no tokenizer needed), truncated like MiniLM
+    lengths = token_lengths(texts, max_length=256)
+    print(f"{len(texts)} chunks from {args.pages} pages, {sum(lengths)} estimated tokens")
+    print(f"Chunk length (est. tokens): min {min(lengths)}, median {int(np.median(lengths))}, "
+          f"max {max(lengths)}, {sum(length < 40 for length in lengths)} under 40\n")
+    padding_report(texts, lengths, args.batch_size, args.token_budget, args.max_batch_size)
+
+    if args.no_encode:
+        return 0
+    try:
+        import sentence_transformers  # noqa: F401
+    except ImportError:
+        print("\nsentence-transformers not installed; skipping real-model timing")
+        return 0
+    return encode_report(texts, args.batch_size, args.token_budget, args.max_batch_size)
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+"""
+Benchmark: shared rate limiter and 429 retry/backoff against a local fake Groq server.
+
+Fires concurrent streamed critiques through one RateLimiter while the
+fake server rejects every Nth request with 429 + retry-after, then reports
+throughput, retries and limiter wait/queue metrics. The limiter runs on a
+short window (limits scaled to it) so the limit binds within seconds; the
+benchmark fails (exit 1) if any rolling window of server requests,
+retries included, holds more than the limit.
+
+Usage:
+    python -m benchmarks.bench_groq_limiter [--requests 24] [--threads 8] [--rpm 120] [--window 5]
+"""
+
+import argparse
+import math
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fake_groq_server import FakeGroqServer
+from utils.groq_client import get_groq_client, generate_critique
+from utils.rate_limiter import RateLimiter
+
+
+def peak_in_window(times, window: float) -> int:
+    """Most requests received in any rolling window of `window` seconds."""
+    times = sorted(times)
+    peak = 0
+    first = 0
+    for last, stamp in enumerate(times):
+        while times[first] <= stamp - window:
+            first += 1
+        peak = max(peak, last - first + 1)
+    return peak
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--requests", type=int, default=24)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--rpm", type=float, default=120)
+    parser.add_argument("--tpm", type=float, default=200_000)
+    parser.add_argument("--rate-limit-every", type=int, default=5)
+    parser.add_argument("--window", type=float, default=5.0, help="Limiter window in seconds")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Groq rate limiter benchmark (fake server)")
+    print("=" * 50 + "\n")
+
+    limiter = RateLimiter(requests_per_minute=args.rpm, tokens_per_minute=args.tpm, window_seconds=args.window)
+    window_limit = math.floor(max(1.0, args.rpm * args.window / 60))
+
+    with FakeGroqServer(token_delay=0.002, rate_limit_every=args.rate_limit_every, retry_after=0.5) as server:
+        client = get_groq_client("fake-key", base_url=server.base_url)
+
+        def run_one(i):
+            return "".join(generate_critique(client, f"prompt {i}", stream=True, limiter=limiter))
+
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=args.threads) as pool:
+            outputs = list(pool.map(run_one, range(args.requests)))
+        elapsed = time.perf_counter() - start
+
+        print(f"Server requests:     {server.request_count} ({server.rate_limited_count} answered 429)")
+        peak = peak_in_window(server.request_times, args.window)
+
+    metrics = limiter.metrics()
+    failures = sum(1 for output in outputs if not output)
+    print(f"Completed critiques: {len(outputs) - failures}/{args.requests}")
+    print(f"Wall time:           {elapsed:.2f}s")
+    print(f"Peak window:         {peak} requests in {args.window:g}s (limit {window_limit}, "
+          f"{args.rpm:g} requests/min)")
+    print(f"Retries:             {metrics['retries']} ({metrics['rate_limited']} rate-limit pauses)")
+    print(f"Waits:               {metrics['waits']} (avg {metrics['avg_wait_seconds']:.2f}s, max {metrics['max_wait_seconds']:.2f}s)")
+    print(f"Queue depth now:     {metrics['queue_depth']}")
+
+    if peak > window_limit:
+        print(f"\n❌ Limiter admitted {peak} requests in a {args.window:g}s window (limit {window_limit})")
+        return 1
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
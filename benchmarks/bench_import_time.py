@@ -0,0 +1,158 @@
+"""
+Benchmark: cold-start import time of the app's modules, with a budget.
+
+Imports everything app.py imports in a fresh interpreter under
+`python -X importtime` and fails (exit 1) if
+
+- the median total import time exceeds the budget, or
+- a heavy dependency (sentence-transformers, torch, chromadb, the Groq
+  SDK, ...) is imported eagerly instead of at first use.
+
+Streamlit itself is imported first and reported separately; it is paid by
+any Streamlit app and is not counted against the budget.
+
+Usage:
+    python -m benchmarks.bench_import_time [--budget-ms 600] [--runs 5]
+"""
+
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Tuple
+
+
+# Everything app.py imports from this repo
+APP_MODULES = [
+    "utils.pdf_processor",
+    "utils.embeddings",
+    "utils.index_manager",
+    "utils.ingestion",
+    "utils.groq_client",
+    "utils.annotator",
+    "utils.rate_limiter",
+    "utils.response_cache",
+    "utils.job_manager",
+    "utils.pipeline_jobs"
+]
+
+# Must only be imported when first used
+LAZY_MODULES = ["sentence_transformers", "torch", "transformers", "chromadb", "groq"]
+
+DEFAULT_BUDGET_MS = 600
+
+MARKER = "--- app modules ---"
+
+
+def parse_importtime(lines: List[str]) -> List[Tuple[int, str, int]]:
+    """
+    Parse `-X importtime` output.
+
+    Returns:
+        [(depth, module, cumulative microseconds)] in output order
+    """
+    entries = []
+    for line in lines:
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        if not cumulative.strip().isdigit():
+            continue  # Header line
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        entries.append((depth, name.strip(), int(cumulative)))
+    return entries
+
+
+def measure(modules: List[str]) -> Dict:
+    """
+    Import the modules in a fresh interpreter.
+
+    Returns:
+        {'streamlit_ms': float or None (not installed), 'total_ms': float,
+         'top': [(module, ms)], 'imported': set of module names}
+    """
+    code = (
+        "import sys\n"
+        "try:\n"
+        "    import streamlit\n"
+        "except ImportError:\n"
+        "    pass\n"
+        f"sys.stderr.write({MARKER!r} + ' ' + str(int('streamlit' in sys.modules)) + '\\n')\n"
+        + "".join(f"import {module}\n" for module in modules)
+    )
+    completed = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        capture_output=True, text=True
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(completed.stderr.strip().splitlines()[-1])
+
+    lines = completed.stderr.splitlines()
+    split = next(i for i, line in enumerate(lines) if line.startswith(MARKER))
+    streamlit_installed = lines[split].endswith("1")
+    before = parse_importtime(lines[:split])
+    after = parse_importtime(lines[split + 1:])
+
+    return {
+        'streamlit_ms': sum(
+            cumulative for depth, name, cumulative in before if depth == 0 and name == "streamlit"
+        ) / 1000 if streamlit_installed else None,
+        'total_ms': sum(cumulative for depth, _, cumulative in after if depth == 0) / 1000,
+        'top': sorted(
+            ((name, cumulative / 1000) for depth, name, cumulative in after if depth == 0),
+            key=lambda item: -item[1]
+        ),
+        'imported': {name for _, name, _ in before + after}
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--modules", nargs="+", default=APP_MODULES,
+                        help="Modules to import (default: everything app.py imports)")
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Cold-start import time benchmark")
+    print("=" * 50 + "\n")
+
+    runs = []
+    try:
+        # One extra run first so bytecode compilation is not measured
+        for _ in range(args.runs + 1):
+            runs.append(measure(args.modules))
+    except RuntimeError as e:
+        print(f"❌ Import failed: {e}")
+        return 2
+    runs = runs[1:]
+
+    median_total = statistics.median(run['total_ms'] for run in runs)
+    if runs[-1]['streamlit_ms'] is None:
+        print("streamlit (not budgeted): not installed")
+    else:
+        median_streamlit = statistics.median(run['streamlit_ms'] for run in runs)
+        print(f"streamlit (not budgeted): {median_streamlit:.0f}ms")
+    print(f"App modules:              {median_total:.0f}ms median of {args.runs} "
+          f"(budget {args.budget_ms:.0f}ms)\n")
+
+    print("Slowest top-level imports (last run):")
+    for name, ms in runs[-1]['top'][:8]:
+        print(f"  {name:<32}{ms:>8.1f}ms")
+
+    failures = 0
+    eager = sorted(module for module in LAZY_MODULES if module in runs[-1]['imported'])
+    if eager:
+        print(f"\n❌ Imported eagerly: {', '.join(eager)}")
+        failures += 1
+    if median_total > args.budget_ms:
+        print(f"\n❌ Cold start {median_total:.0f}ms exceeds the {args.budget_ms:.0f}ms budget")
+        failures += 1
+    if not failures:
+        print("\n✅ Within budget, heavy dependencies deferred")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,113 @@
+"""
+Benchmark: large-document ingestion within a memory ceiling.
+
+Builds a synthetic 400-page thesis, runs the streaming ingestion pipeline
+and fails (exit code 1) if peak resident memory exceeds the ceiling.
+
+Usage:
+    python -m benchmarks.bench_large_ingestion [--pages 400] [--max-rss-mb 1536]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import fitz  # PyMuPDF
+from sentence_transformers import SentenceTransformer
+
+from utils.embeddings import EMBEDDING_MODEL_NAME
+from utils.ingestion import ingest_pdf, current_rss_mb
+
+
+# Stated memory ceiling for a 400-page thesis, model weights included
+DEFAULT_CEILING_MB = 1536
+
+WORDS = (
+    "research methodology sampling participants analysis results discussion "
+    "validity reliability framework literature theory hypothesis variable "
+    "significant findings data collection instrument questionnaire interview "
+    "qualitative quantitative conclusion recommendation limitation study"
+).split()
+
+
+def build_synthetic_pdf(page_count: int, seed: int = 7) -> bytes:
+    """Create a text-heavy PDF with roughly 2,500 characters per page."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+
+    for page_num in range(page_count):
+        sentences = []
+        for _ in range(30):
+            words = rng.choices(WORDS, k=rng.randint(8, 18))
+            sentences.append(" ".join(words).capitalize() + ".")
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(
+            fitz.Rect(50, 50, 545, 792),
+            f"Chapter {page_num // 40 + 1}, page {page_num + 1}. " + " ".join(sentences),
+            fontsize=9,
+            fontname="helv"
+        )
+
+    pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return pdf_bytes
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=400)
+    parser.add_argument("--max-rss-mb", type=float, default=DEFAULT_CEILING_MB)
+    parser.add_argument("--batch-size", type=int, default=64)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print(f"Large-document ingestion benchmark ({args.pages} pages)")
+    print("=" * 50 + "\n")
+
+    pdf_bytes = build_synthetic_pdf(args.pages)
+    print(f"Synthetic PDF: {len(pdf_bytes) / (1024 * 1024):.1f}MB")
+
+    model = SentenceTransformer(EMBEDDING_MODEL_NAME)
+    if current_rss_mb() is None:
+        print("❌ RSS cannot be measured on this platform (install psutil)")
+        return 1
+    print(f"RSS after model load: {current_rss_mb():.0f}MB")
+
+    stage_times = {}
+
+    def on_progress(stage, done, total, message=None):
+        stage_times[stage] = time.perf_counter()
+        if message:
+            print(message)
+
+    start = time.perf_counter()
+    result = ingest_pdf(
+        pdf_bytes,
+        model,
+        batch_size=args.batch_size,
+        max_rss_mb=args.max_rss_mb,
+        progress_callback=on_progress
+    )
+    elapsed = time.perf_counter() - start
+
+    stats = result['stats']
+    print(f"Pages:        {result['pdf_data']['total_pages']}")
+    print(f"Chunks:       {len(result['chunks'])}")
+    print(f"Batches:      {stats['batches']}")
+    print(f"Wall time:    {elapsed:.1f}s ({result['pdf_data']['total_pages'] / elapsed:.1f} pages/s)")
+    for stage, finished in stage_times.items():
+        print(f"  {stage:<8} finished at {finished - start:.1f}s")
+    print(f"Peak RSS:     {stats['peak_rss_mb']:.0f}MB (ceiling {args.max_rss_mb:g}MB)")
+
+    print("\n" + "=" * 50)
+    if stats['peak_rss_mb'] <= args.max_rss_mb:
+        print("✅ Within memory ceiling")
+        return 0
+
+    print("❌ Memory ceiling exceeded")
+    return 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+"""
+Benchmark: margin layout packing time and correctness as comments grow.
+
+Packs randomly anchored comment and rewrite boxes into A4 margin columns
+(with a reserved legend band) for increasing document sizes, checks that
+no two placed boxes or reserved bands overlap, and reports time per box,
+which should stay roughly flat (O(n log n) overall).
+
+Usage:
+    python -m benchmarks.bench_margin_layout [--pages 50]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+from utils.margin_layout import DEFAULT_GAP, MarginLayout
+
+
+PAGE_HEIGHT = 842
+LEGEND_BAND = (10, 130)
+
+
+def check_page(placed, reserved, heights) -> int:
+    """Count overlapping pairs among one page's placed boxes and reserved bands."""
+    spans = sorted([(y, y + heights[key]) for y, key in placed] + list(reserved))
+    return sum(1 for a, b in zip(spans, spans[1:]) if a[1] + DEFAULT_GAP > b[0] + 1e-6)
+
+
+def run(pages: int, boxes_per_page: int, seed: int = 1):
+    """Lay out pages * boxes_per_page boxes; return (seconds, placed, overflow, overlaps)."""
+    rng = random.Random(seed)
+    layout = MarginLayout()
+    heights = {}
+    layout.reserve(0, *LEGEND_BAND)
+    for page_num in range(pages):
+        for i in range(boxes_per_page):
+            key = (page_num, i)
+            heights[key] = rng.choice([80, 100])
+            layout.add(page_num, rng.uniform(40, 800), heights[key], key)
+
+    start = time.perf_counter()
+    placed, overflow = layout.solve(lambda page_num: PAGE_HEIGHT)
+    elapsed = time.perf_counter() - start
+
+    per_page = {}
+    for page_num, y, key in placed:
+        per_page.setdefault(page_num, []).append((y, key))
+    overlaps = sum(
+        check_page(boxes, [LEGEND_BAND] if page_num == 0 else [], heights)
+        for page_num, boxes in per_page.items()
+    )
+    return elapsed, len(placed), len(overflow), overlaps
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=50)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Margin layout benchmark")
+    print("=" * 50 + "\n")
+
+    print(f"{'Boxes/page':>10}{'Boxes':>9}{'Placed':>9}{'Overflow':>10}{'Time':>10}{'Per box':>10}")
+    total_overlaps = 0
+    for boxes_per_page in (2, 5, 10, 50, 200, 1000):
+        elapsed, placed, overflow, overlaps = run(args.pages, boxes_per_page)
+        total_overlaps += overlaps
+        count = args.pages * boxes_per_page
+        print(f"{boxes_per_page:>10}{count:>9}{placed:>9}{overflow:>10}"
+              f"{elapsed * 1000:>8.1f}ms{elapsed / count * 1e6:>8.2f}us")
+
+    if total_overlaps:
+        print(f"\n❌ {total_overlaps} overlapping boxes")
+        return 1
+    print("\n✅ No overlapping boxes")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
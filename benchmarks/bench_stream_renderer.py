@@ -0,0 +1,134 @@
+"""
+Benchmark: per-token re-rendering vs. the coalescing StreamRenderer.
+
+Replays a fake ~2000-token critique stream on a simulated clock (so the
+token rate is exact and the run is fast) into a sink that serializes the
+text like a placeholder update would. Compares rendering the full text
+after every token with StreamRenderer at several flush cadences: renders,
+bytes sent and time spent in the sink. The last render must always equal
+the full critique.
+
+Usage:
+    python -m benchmarks.bench_stream_renderer [--tokens 2000] [--tokens-per-second 250]
+"""
+
+import argparse
+import json
+import random
+import sys
+import time
+from typing import List
+
+from utils.stream_renderer import StreamRenderer
+
+
+WORDS = (
+    "the methodology section does not justify the sample size and the "
+    "literature review omits recent work on **validity** while the "
+    "discussion overstates what the results support; consider adding"
+).split()
+
+# (interval seconds, min chars)
+CADENCES = [(0.05, 100), (0.1, 200), (0.25, 500)]
+
+
+def fake_token_stream(tokens: int, seed: int = 5) -> List[str]:
+    """Roughly token-sized chunks of critique-like markdown."""
+    rng = random.Random(seed)
+    chunks = []
+    for i in range(tokens):
+        word = rng.choice(WORDS)
+        if i % 60 == 0:
+            chunks.append(f"\n\n## Section {i // 60 + 1}\n- ")
+        elif i % 12 == 0:
+            chunks.append("\n- " + word)
+        else:
+            chunks.append(" " + word)
+    return chunks
+
+
+class SimulatedClock:
+    """Clock advanced by the replay loop instead of real time."""
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class Sink:
+    """Stands in for placeholder.markdown: serializes each update."""
+
+    def __init__(self):
+        self.renders = 0
+        self.bytes_sent = 0
+        self.seconds = 0.0
+        self.last = ""
+
+    def __call__(self, text: str):
+        start = time.perf_counter()
+        message = json.dumps({'markdown': {'body': text}}).encode("utf-8")
+        self.seconds += time.perf_counter() - start
+        self.renders += 1
+        self.bytes_sent += len(message)
+        self.last = text
+
+
+def run_naive(chunks: List[str]) -> Sink:
+    """The previous loop: full_critique += chunk, then render everything."""
+    sink = Sink()
+    full_text = ""
+    for chunk in chunks:
+        full_text += chunk
+        sink(full_text)
+    return sink
+
+
+def run_renderer(chunks: List[str], token_interval: float, interval: float, min_chars: int) -> Sink:
+    sink = Sink()
+    clock = SimulatedClock()
+    renderer = StreamRenderer(sink, interval=interval, min_chars=min_chars, clock=clock)
+    for chunk in chunks:
+        clock.now += token_interval
+        renderer.write(chunk)
+    renderer.close()
+    return sink
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--tokens", type=int, default=2000)
+    parser.add_argument("--tokens-per-second", type=float, default=250.0)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Stream renderer benchmark")
+    print("=" * 50 + "\n")
+
+    chunks = fake_token_stream(args.tokens)
+    full_text = "".join(chunks)
+    print(f"{len(chunks)} chunks, {len(full_text):,} characters, "
+          f"{args.tokens_per_second:g} tokens/s simulated\n")
+
+    print(f"{'Strategy':<24}{'Renders':>9}{'Sent':>12}{'Sink time':>12}")
+    baseline = run_naive(chunks)
+    print(f"{'per token':<24}{baseline.renders:>9}{baseline.bytes_sent / 1024:>10.0f}KB"
+          f"{baseline.seconds * 1000:>10.1f}ms")
+
+    failures = 0 if baseline.last == full_text else 1
+    for interval, min_chars in CADENCES:
+        sink = run_renderer(chunks, 1.0 / args.tokens_per_second, interval, min_chars)
+        label = f"{interval * 1000:g}ms / {min_chars} chars"
+        print(f"{label:<24}{sink.renders:>9}{sink.bytes_sent / 1024:>10.0f}KB"
+              f"{sink.seconds * 1000:>10.1f}ms  "
+              f"({baseline.bytes_sent / sink.bytes_sent:.0f}x fewer bytes)")
+        if sink.last != full_text:
+            print(f"❌ {label}: final render differs from the full critique")
+            failures += 1
+
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,130 @@
+"""
+Benchmark: TextIndex probes vs. per-issue page.search_for scans.
+
+Builds a synthetic thesis, samples snippets from its text (verbatim,
+length-capped mid-word, lightly paraphrased, and absent), and compares the
+previous lookup (search_for over up to 20 pages per issue) with one index
+build plus one probe per issue.
+
+Usage:
+    python -m benchmarks.bench_text_index [--pages 60] [--issues 40]
+"""
+
+import argparse
+import random
+import sys
+import time
+
+import fitz  # PyMuPDF
+
+from utils.text_index import TextIndex
+
+
+WORDS = (
+    "research methodology sampling participants analysis results discussion "
+    "validity reliability framework literature theory hypothesis variable "
+    "significant findings data collection instrument questionnaire interview "
+    "qualitative quantitative conclusion recommendation limitation study"
+).split()
+
+
+def build_synthetic_pdf(page_count: int, seed: int = 7) -> bytes:
+    """Create a text-heavy PDF with roughly 2,500 characters per page."""
+    rng = random.Random(seed)
+    doc = fitz.open()
+    for page_num in range(page_count):
+        sentences = [
+            " ".join(rng.choices(WORDS, k=rng.randint(8, 18))).capitalize() + "."
+            for _ in range(30)
+        ]
+        page = doc.new_page(width=595, height=842)
+        page.insert_textbox(fitz.Rect(50, 50, 545, 792), " ".join(sentences), fontsize=9, fontname="helv")
+    pdf_bytes = doc.tobytes(garbage=3, deflate=True)
+    doc.close()
+    return pdf_bytes
+
+
+def sample_snippets(doc: fitz.Document, count: int, seed: int = 3):
+    """Return (kind, snippet, page_num) tuples drawn from the document text."""
+    rng = random.Random(seed)
+    snippets = []
+    for i in range(count):
+        page_num = rng.randrange(doc.page_count)
+        words = [word[4] for word in doc[page_num].get_text("words")]
+        start = rng.randrange(len(words) - 12)
+        phrase = words[start:start + 12]
+        kind = ("exact", "capped", "paraphrased", "absent")[i % 4]
+        if kind == "capped":
+            snippet = " ".join(phrase)[:50]
+        elif kind == "paraphrased":
+            phrase[5] = "notably"
+            snippet = " ".join(phrase)
+        elif kind == "absent":
+            snippet = "this sentence never appears anywhere in the synthetic thesis text"
+        else:
+            snippet = " ".join(phrase)
+        snippets.append((kind, snippet, page_num))
+    return snippets
+
+
+def legacy_lookup(doc: fitz.Document, snippet: str):
+    """The previous lookup: search_for the first 50 characters on up to 20 pages."""
+    for page_num in range(min(20, doc.page_count)):
+        if doc[page_num].search_for(snippet[:50]):
+            return page_num
+    return None
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--pages", type=int, default=60)
+    parser.add_argument("--issues", type=int, default=40)
+    args = parser.parse_args()
+
+    print("=" * 50)
+    print("Annotation text lookup benchmark")
+    print("=" * 50 + "\n")
+
+    doc = fitz.open(stream=build_synthetic_pdf(args.pages), filetype="pdf")
+    snippets = sample_snippets(doc, args.issues)
+
+    start = time.perf_counter()
+    legacy_found = {kind: 0 for kind, _, _ in snippets}
+    for kind, snippet, page_num in snippets:
+        if legacy_lookup(doc, snippet) == page_num:
+            legacy_found[kind] += 1
+    legacy_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index = TextIndex.from_document(doc)
+    build_time = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index_found = {kind: 0 for kind, _, _ in snippets}
+    false_matches = 0
+    for kind, snippet, page_num in snippets:
+        match = index.find(snippet)
+        if match and match['page_num'] == page_num:
+            index_found[kind] += 1
+        elif match and kind == "absent":
+            false_matches += 1
+    probe_time = time.perf_counter() - start
+    doc.close()
+
+    per_kind = args.issues // 4
+    print(f"{args.pages} pages, {len(index):,} indexed words, {args.issues} issues\n")
+    print(f"{'Snippet kind':<14}{'search_for':>12}{'TextIndex':>12}")
+    for kind in legacy_found:
+        print(f"{kind:<14}{legacy_found[kind]:>9}/{per_kind}{index_found[kind]:>9}/{per_kind}")
+    print(f"\nsearch_for scans:  {legacy_time * 1000:8.1f}ms")
+    print(f"Index build:       {build_time * 1000:8.1f}ms")
+    print(f"Index probes:      {probe_time * 1000:8.1f}ms ({probe_time / args.issues * 1e6:.0f}us per issue)")
+    print(f"Speedup:           {legacy_time / (build_time + probe_time):8.2f}x (build included)")
+
+    if false_matches:
+        print(f"❌ {false_matches} absent snippets matched")
+    return 1 if false_matches or index_found['exact'] < per_kind else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,92 @@
+"""
+Benchmark: NumPy brute-force index vs. ChromaDB (HNSW) build and query latency.
+
+Uses random 384-dimensional vectors (all-MiniLM-L6-v2 size). The Chroma
+rows are skipped if chromadb is not installed.
+
+Usage:
+    python -m benchmarks.bench_vector_index [--sizes 300 1000 5000 20000] [--queries 200]
+"""
+
+import argparse
+import sys
+import time
+
+import numpy as np
+
+from utils.vector_index import NumpyIndex, ChromaIndex
+
+
+DIM = 384
+
+
+def make_corpus(size: int, rng: np.random.Generator):
+    embeddings = rng.standard_normal((size, DIM)).astype(np.float32)
+    chunks = [
+        {'text': f"chunk {i}", 'chunk_id': i, 'page_num': i // 10 + 1, 'start_char': 0, 'end_char': 0}
+        for i in range(size)
+    ]
+    return chunks, embeddings
+
+
+def bench_backend(index_factory, chunks, embeddings, queries, top_k: int):
+    start = time.perf_counter()
+    index = index_factory()
+    index.add(chunks, embeddings)
+    build_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    results = [index.search(query[None, :], top_k=top_k)[0] for query in queries]
+    query_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    start = time.perf_counter()
+    index.search(queries, top_k=top_k)
+    batch_ms = (time.perf_counter() - start) * 1000 / len(queries)
+
+    return build_ms, query_ms, batch_ms, results
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--sizes", type=int, nargs="+", default=[300, 1000, 5000, 20000])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--top-k", type=int, default=5)
+    args = parser.parse_args()
+
+    try:
+        import chromadb  # noqa: F401
+        have_chroma = True
+    except ImportError:
+        have_chroma = False
+
+    print("=" * 50)
+    print("Vector index benchmark")
+    print("=" * 50 + "\n")
+    print(f"{'backend':<8} {'vectors':>8} {'build ms':>10} {'query ms':>10} {'batched ms':>11} {'recall@k':>9}")
+
+    rng = np.random.default_rng(0)
+    for size in args.sizes:
+        chunks, embeddings = make_corpus(size, rng)
+        queries = rng.standard_normal((args.queries, DIM)).astype(np.float32)
+
+        build_ms, query_ms, batch_ms, exact = bench_backend(NumpyIndex, chunks, embeddings, queries, args.top_k)
+        print(f"{'numpy':<8} {size:>8} {build_ms:>10.1f} {query_ms:>10.3f} {batch_ms:>11.4f} {1.0:>9.2f}")
+
+        if have_chroma:
+            build_ms, query_ms, batch_ms, approx = bench_backend(
+                ChromaIndex, chunks, embeddings, queries, args.top_k
+            )
+            recall = np.mean([
+                len({r['chunk_id'] for r in a} & {r['chunk_id'] for r in e}) / len(e)
+                for a, e in zip(approx, exact)
+            ])
+            print(f"{'chroma':<8} {size:>8} {build_ms:>10.1f} {query_ms:>10.3f} {batch_ms:>11.4f} {recall:>9.2f}")
+
+    if not have_chroma:
+        print("\nchromadb not installed - Chroma rows skipped")
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,180 @@
+"""
+Minimal local stand-in for the Groq chat completions API.
+
+Serves POST /openai/v1/chat/completions (streaming SSE and non-streaming)
+and can answer a share of requests with 429 + retry-after, so the rate
+limiter, retry/backoff and caching layers can be exercised offline:
+
+    python -m benchmarks.fake_groq_server --port 8765 --rate-limit-every 4
+
+Then point the client at it with get_groq_client(key, base_url="http://127.0.0.1:8765").
+"""
+
+import argparse
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+DEFAULT_RESPONSE = (
+    "## MAJOR Issues\n"
+    "- \"The study aims to investigate factors affecting student performance\" (Page 2)\n"
+    "  Problem: The problem statement is too broad.\n"
+    "  Suggestion: Specify which factors and which aspects of performance.\n"
+)
+
+
+class _BurstHTTPServer(ThreadingHTTPServer):
+    # socketserver's default listen backlog of 5 makes bursts of connections
+    # wait for a SYN retry (about 1s), skewing request arrival times
+    request_queue_size = 128
+
+
+class FakeGroqServer:
+    """
+    Threaded fake Groq server.
+
+    Args:
+        port: Port to listen on (0 picks a free port)
+        response_text: Completion text returned for every request
+        token_delay: Seconds between streamed chunks
+        rate_limit_every: Answer every Nth request with 429 (0 disables)
+        retry_after: retry-after header value sent with 429 responses
+    """
+
+    def __init__(
+        self,
+        port: int = 0,
+        response_text: str = DEFAULT_RESPONSE,
+        token_delay: float = 0.0,
+        rate_limit_every: int = 0,
+        retry_after: float = 0.2
+    ):
+        self.response_text = response_text
+        self.token_delay = token_delay
+        self.rate_limit_every = rate_limit_every
+        self.retry_after = retry_after
+        self.request_count = 0
+        self.rate_limited_count = 0
+        self.request_times = []  # time.monotonic() of every request received
+        self._lock = threading.Lock()
+
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_POST(self):
+                body = json.loads(self.rfile.read(int(self.headers.get('Content-Length', 0))) or b"{}")
+
+                with server._lock:
+                    server.request_count += 1
+                    server.request_times.append(time.monotonic())
+                    limited = server.rate_limit_every and server.request_count % server.rate_limit_every == 0
+                    if limited:
+                        server.rate_limited_count += 1
+
+                if limited:
+                    self._send_json(429, {
+                        'error': {
+                            'message': f"Rate limit reached. Please try again in {server.retry_after}s.",
+                            'type': 'tokens',
+                            'code': 'rate_limit_exceeded'
+                        }
+                    }, headers={'retry-after': str(server.retry_after)})
+                    return
+
+                if body.get('stream'):
+                    self._send_stream(body.get('model', 'fake'))
+                else:
+                    self._send_json(200, {
+                        'id': 'chatcmpl-fake',
+                        'object': 'chat.completion',
+                        'created': int(time.time()),
+                        'model': body.get('model', 'fake'),
+                        'choices': [{
+                            'index': 0,
+                            'message': {'role': 'assistant', 'content': server.response_text},
+                            'finish_reason': 'stop'
+                        }],
+                        'usage': {'prompt_tokens': 10, 'completion_tokens': 10, 'total_tokens': 20}
+                    })
+
+            def _send_json(self, status, payload, headers=None):
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(data)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                self.wfile.write(data)
+
+            def _send_stream(self, model):
+                self.send_response(200)
+                self.send_header('Content-Type', 'text/event-stream')
+                self.end_headers()
+                for token in server.response_text.split(" "):
+                    chunk = {
+                        'id': 'chatcmpl-fake',
+                        'object': 'chat.completion.chunk',
+                        'created': int(time.time()),
+                        'model': model,
+                        'choices': [{'index': 0, 'delta': {'content': token + " "}, 'finish_reason': None}]
+                    }
+                    self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                    self.wfile.flush()
+                    if server.token_delay:
+                        time.sleep(server.token_delay)
+                self.wfile.write(b"data: [DONE]\n\n")
+                self.wfile.flush()
+
+        self._httpd = _BurstHTTPServer(("127.0.0.1", port), Handler)
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "FakeGroqServer":
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fake Groq chat completions server")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--token-delay", type=float, default=0.01)
+    parser.add_argument("--rate-limit-every", type=int, default=0)
+    parser.add_argument("--retry-after", type=float, default=1.0)
+    args = parser.parse_args()
+
+    server = FakeGroqServer(
+        port=args.port,
+        token_delay=args.token_delay,
+        rate_limit_every=args.rate_limit_every,
+        retry_after=args.retry_after
+    )
+    print(f"Fake Groq server listening on {server.base_url}")
+    try:
+        server._httpd.serve_forever()
+    except KeyboardInterrupt:
+        server.stop()
+
+
+if __name__ == "__main__":
+    main()
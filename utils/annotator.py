@@ -3,8 +3,14 @@ Enhanced PDF annotation utilities with professional-grade features.
 """
 
 import fitz  # PyMuPDF
-from typing import List, Dict, Tuple, Optional
-import io
+from typing import BinaryIO, List, Dict, Tuple, Optional, Union
+import os
+import textwrap
+from concurrent.futures import ProcessPoolExecutor
+
+from utils.text_index import TextIndex
+from utils.document_session import DocumentSession
+from utils.margin_layout import MarginLayout
 
 
 # Enhanced color scheme for severity levels
@@ -32,6 +38,18 @@ ANNOTATION_ICONS = {
     'general': '📝'
 }
 
+# Margin box sizes (comments sit 180pt from the right edge, rewrites 200pt)
+COMMENT_BOX_HEIGHT = 80
+REWRITE_BOX_HEIGHT = 100
+
+# Documents with at least this many pages are annotated with a process pool
+# when create_annotated_pdf is called with workers > 1 (or None)
+PARALLEL_ANNOTATION_PAGE_THRESHOLD = 40
+MAX_ANNOTATION_WORKERS = 4
+
+# Where create_annotated_pdf writes: a file path or a writable binary stream
+PdfOutput = Union[str, os.PathLike, BinaryIO]
+
 # Section names for summary boxes
 SECTION_NAMES = [
     'abstract', 'introduction', 'literature review',
@@ -39,13 +57,65 @@ SECTION_NAMES = [
 ]
 
 
+class DrawingBatch:
+    """
+    Collects vector drawing and text per page and writes each page once.
+
+    Every committed Shape appends a content stream to the page and wraps the
+    existing ones, so drawing each box, line and text run separately bloats
+    the output and slows saving. Helpers draw into the page's shared Shape
+    instead; commit() writes them all. Text is layered above the page's
+    boxes and lines. Inserting pages invalidates the document's Page
+    objects, so commit before adding a page.
+    """
+
+    def __init__(self):
+        self._shapes: Dict[int, fitz.Shape] = {}
+
+    def _shape(self, page: fitz.Page) -> fitz.Shape:
+        shape = self._shapes.get(page.number)
+        if shape is None:
+            shape = page.new_shape()
+            self._shapes[page.number] = shape
+        return shape
+
+    def draw_rect(self, page: fitz.Page, rect: fitz.Rect, **style):
+        """Queue a rectangle; style is passed to Shape.finish (color, fill, width, ...)."""
+        shape = self._shape(page)
+        shape.draw_rect(rect)
+        shape.finish(**style)
+
+    def draw_line(self, page: fitz.Page, start: fitz.Point, end: fitz.Point, **style):
+        """Queue a line; style is passed to Shape.finish (color, width, dashes, ...)."""
+        shape = self._shape(page)
+        shape.draw_line(start, end)
+        shape.finish(**style)
+
+    def insert_text(self, page: fitz.Page, point: fitz.Point, text: str, **options):
+        """Queue a single line of text; options are passed to Shape.insert_text."""
+        self._shape(page).insert_text(point, text, **options)
+
+    def commit(self):
+        """Write every page's queued drawing to its content stream."""
+        for shape in self._shapes.values():
+            shape.commit()
+        self._shapes = {}
+
+
 def create_annotated_pdf(
     original_pdf_bytes: bytes,
     issues: List[Dict],
     section_summaries: Optional[List[Dict]] = None,
     rewrites: Optional[List[Dict]] = None,
-    include_legend: bool = True
-) -> bytes:
+    include_legend: bool = True,
+    text_index: Optional[TextIndex] = None,
+    document: Optional[DocumentSession] = None,
+    output: Optional[PdfOutput] = None,
+    incremental: bool = False,
+    garbage: int = 0,
+    deflate: bool = False,
+    workers: Optional[int] = 1
+) -> Optional[bytes]:
     """
     Create professionally annotated PDF with advanced features.
 
@@ -55,58 +125,340 @@ def create_annotated_pdf(
         section_summaries: Optional list of section-level summaries
         rewrites: Optional list of inline rewrite suggestions
         include_legend: Whether to add color legend on first page
+        text_index: Optional prebuilt TextIndex for this PDF (built here if None)
+        document: Optional DocumentSession for this PDF; its text index is
+            reused so page text is not extracted again
+        output: Optional file path or writable binary stream to write the
+            annotated PDF to instead of returning it
+        incremental: Append only the new annotation objects after an
+            unchanged copy of the original (output must be a file path)
+        garbage: PyMuPDF garbage collection level (0-4) for full saves
+        deflate: Compress new and rewritten streams
+        workers: Worker processes. 1 annotates serially in-process, None
+            picks a count from the available CPUs. Documents shorter than
+            PARALLEL_ANNOTATION_PAGE_THRESHOLD pages, and incremental saves,
+            are always annotated serially.
 
     Returns:
-        Annotated PDF as bytes
+        Annotated PDF as bytes, or None when written to output
+
+    Raises:
+        ValueError: If incremental is requested without a file path output,
+            or together with garbage collection (which rewrites every object)
     """
+    if incremental:
+        if not isinstance(output, (str, os.PathLike)):
+            raise ValueError("Incremental saves need an output file path")
+        if garbage:
+            raise ValueError("Garbage collection cannot be combined with incremental saves")
+
+    if document is not None and text_index is None:
+        text_index = document.text_index
+
+    if workers is None:
+        workers = min(MAX_ANNOTATION_WORKERS, os.cpu_count() or 1)
+
+    if workers > 1 and not incremental:
+        source = fitz.open(stream=original_pdf_bytes, filetype="pdf")
+        parallel = source.page_count >= PARALLEL_ANNOTATION_PAGE_THRESHOLD
+        if parallel:
+            if text_index is None:
+                text_index = TextIndex.from_document(source)
+            plan = plan_annotations(source.page_count, issues, section_summaries, rewrites, text_index)
+            doc = _annotate_in_workers(original_pdf_bytes, source, plan, include_legend, workers)
+            source.close()
+            try:
+                return save_annotated_pdf(doc, output, garbage=garbage, deflate=deflate)
+            finally:
+                doc.close()
+        source.close()
+
     # Open PDF
-    doc = fitz.open(stream=original_pdf_bytes, filetype="pdf")
+    if incremental:
+        # Incremental updates are appended to the file the document was opened from
+        with open(output, "wb") as output_file:
+            output_file.write(original_pdf_bytes)
+        doc = fitz.open(output)
+    elif document is not None:
+        doc = document.working_copy()
+    else:
+        doc = fitz.open(stream=original_pdf_bytes, filetype="pdf")
+
+    # Index the original text once, before any annotation text is added
+    if text_index is None:
+        text_index = TextIndex.from_document(doc)
+
+    # Locate everything first, then draw page by page
+    plan = plan_annotations(doc.page_count, issues, section_summaries, rewrites, text_index)
+    overflow = annotate_pages(doc, plan, range(doc.page_count), include_legend)
+    if overflow:
+        add_overflow_comment_pages(doc, overflow)
+
+    try:
+        return save_annotated_pdf(doc, output, incremental, garbage, deflate)
+    finally:
+        if not doc.is_closed:  # The incremental fallback closes it
+            doc.close()
+
+
+def plan_annotations(
+    page_count: int,
+    issues: List[Dict],
+    section_summaries: Optional[List[Dict]],
+    rewrites: Optional[List[Dict]],
+    text_index: TextIndex
+) -> Dict[int, Dict[str, List]]:
+    """
+    Resolve where every annotation goes, before anything is drawn.
+
+    Comment numbers are assigned here in issue order, so pages can then be
+    annotated independently (and in any process) with the same result.
+
+    Args:
+        page_count: Number of pages in the document
+        issues: Issues as for create_annotated_pdf
+        section_summaries: Optional section summaries
+        rewrites: Optional rewrite suggestions
+        text_index: TextIndex of the document
+
+    Returns:
+        Mapping of 0-indexed page number to {'issues': [(issue, rects or
+        None, comment number)], 'summaries': [summary], 'rewrites':
+        [(rewrite, rect)]}, for pages with at least one annotation
+    """
+    plan: Dict[int, Dict[str, List]] = {}
+
+    def page_plan(page_num: int) -> Dict[str, List]:
+        if page_num not in plan:
+            plan[page_num] = {'issues': [], 'summaries': [], 'rewrites': []}
+        return plan[page_num]
 
-    # Track annotations
     highlighted_texts = set()
     comment_counter = 1
+    for issue in issues:
+        placement = locate_issue(issue, highlighted_texts, text_index, page_count)
+        if placement:
+            page_plan(placement['page_num'])['issues'].append((issue, placement['rects'], comment_counter))
+            comment_counter += 1
+
+    # Parsers emit 'page_num': None when the critique cites no page
+    for summary in section_summaries or []:
+        page_num = (summary.get('page_num') or 0) - 1
+        if 0 <= page_num < page_count:
+            page_plan(page_num)['summaries'].append(summary)
+
+    for rewrite in rewrites or []:
+        page_num = (rewrite.get('page_num') or 0) - 1
+        if rewrite.get('page_num') is None:
+            # No page cited: look for the wording anywhere in the document
+            match = text_index.find(rewrite.get('original', ''), fuzzy=False)
+            if match:
+                rewrite = dict(rewrite, page_num=match['page_num'] + 1)
+                page_plan(match['page_num'])['rewrites'].append((rewrite, match['rects'][0]))
+        elif 0 <= page_num < page_count:
+            # Exact wording only - it is about to be rewritten
+            match = text_index.find(rewrite.get('original', ''), pages=[page_num], fuzzy=False)
+            if match:
+                page_plan(page_num)['rewrites'].append((rewrite, match['rects'][0]))
+
+    return plan
+
+
+def annotate_pages(
+    doc: fitz.Document,
+    plan: Dict[int, Dict[str, List]],
+    pages: range,
+    include_legend: bool = True
+) -> List[Tuple[int, Dict]]:
+    """
+    Draw the planned annotations of a page range.
+
+    Args:
+        doc: PyMuPDF document
+        plan: Result of plan_annotations()
+        pages: 0-indexed pages to annotate
+        include_legend: Add the color legend if page 0 is in pages
+
+    Returns:
+        Margin comments that did not fit on their page, as (0-indexed page
+        number, {'label', 'text'}) pairs for add_overflow_comment_pages
+    """
+    # Boxes, lines and margin text are written once per page at the end
+    batch = DrawingBatch()
+
+    # Margin boxes are collected first and packed per page afterwards
+    layout = MarginLayout()
 
     # Add annotation legend to first page
-    if include_legend and doc.page_count > 0:
-        add_annotation_legend(doc[0])
+    if include_legend and 0 in pages and doc.page_count > 0:
+        add_annotation_legend(doc[0], batch, layout)
 
-    # Process main issues
-    for issue in issues:
-        result = add_issue_annotation(
-            doc,
-            issue,
-            highlighted_texts,
-            comment_counter
-        )
-        if result:
-            comment_counter = result
+    for page_num in pages:
+        page_plan = plan.get(page_num)
+        if not page_plan:
+            continue
+        page = doc[page_num]
+
+        for issue, rects, comment_num in page_plan['issues']:
+            draw_issue_annotation(page, issue, rects, comment_num, batch, layout)
+
+        for summary in page_plan['summaries']:
+            add_section_summary_box(doc, summary, batch, layout)
+
+        for rewrite, rect in page_plan['rewrites']:
+            add_inline_rewrite(doc, rewrite, batch=batch, layout=layout, rect=rect)
+
+    overflow = render_margin_layout(doc, layout, batch, append_overflow=False)
+    batch.commit()
+    return overflow
+
+
+def _annotate_page_range(
+    pdf_bytes: bytes,
+    plan: Dict[int, Dict[str, List]],
+    start: int,
+    end: int,
+    include_legend: bool
+) -> Tuple[bytes, List[Tuple[int, Dict]]]:
+    """
+    Annotate pages [start, end) with a private document handle.
+
+    Runs inside worker processes, so it must stay a module-level function.
+
+    Returns:
+        (PDF bytes holding only pages start..end-1, overflow comments)
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    part = fitz.open()
+    try:
+        overflow = annotate_pages(doc, plan, range(start, end), include_legend)
+        part.insert_pdf(doc, from_page=start, to_page=end - 1)
+        return part.tobytes(), overflow
+    finally:
+        part.close()
+        doc.close()
+
+
+def _split_page_ranges(page_count: int, plan: Dict[int, Dict[str, List]], parts: int) -> List[Tuple[int, int]]:
+    """Split the pages into contiguous ranges of roughly equal annotation work."""
+    weights = [
+        1 + sum(len(items) for items in plan.get(page_num, {}).values())
+        for page_num in range(page_count)
+    ]
+    target = sum(weights) / parts
+    ranges = []
+    start, total = 0, 0
+    for page_num, weight in enumerate(weights):
+        total += weight
+        if total >= target * (len(ranges) + 1) and len(ranges) < parts - 1:
+            ranges.append((start, page_num + 1))
+            start = page_num + 1
+    if start < page_count:
+        ranges.append((start, page_count))
+    return ranges
+
+
+def _annotate_in_workers(
+    pdf_bytes: bytes,
+    source: fitz.Document,
+    plan: Dict[int, Dict[str, List]],
+    include_legend: bool,
+    workers: int
+) -> fitz.Document:
+    """
+    Annotate page ranges in worker processes and merge them in page order.
 
-    # Add section summaries if provided
-    if section_summaries:
-        for summary in section_summaries:
-            add_section_summary_box(doc, summary)
+    insert_pdf keeps annotations and the links within each range; the
+    outline and metadata are copied from the source document. Links from
+    one range to a page in another range are not carried over.
+    """
+    ranges = _split_page_ranges(source.page_count, plan, workers)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = [
+            executor.submit(
+                _annotate_page_range,
+                pdf_bytes,
+                {page_num: plan[page_num] for page_num in range(start, end) if page_num in plan},
+                start,
+                end,
+                include_legend
+            )
+            for start, end in ranges
+        ]
+        results = [future.result() for future in futures]
 
-    # Add inline rewrites if provided
-    if rewrites:
-        for rewrite in rewrites:
-            add_inline_rewrite(doc, rewrite)
+    doc = fitz.open()
+    overflow = []
+    for part_bytes, part_overflow in results:
+        part = fitz.open(stream=part_bytes, filetype="pdf")
+        doc.insert_pdf(part)
+        part.close()
+        overflow.extend(part_overflow)
 
-    # Save to bytes
-    output_buffer = io.BytesIO()
-    doc.save(output_buffer)
-    doc.close()
+    doc.set_metadata(source.metadata)
+    try:
+        doc.set_toc(source.get_toc(simple=False))
+    except Exception:
+        pass
+
+    if overflow:
+        add_overflow_comment_pages(doc, overflow)
+    return doc
+
+
+def save_annotated_pdf(
+    doc: fitz.Document,
+    output: Optional[PdfOutput] = None,
+    incremental: bool = False,
+    garbage: int = 0,
+    deflate: bool = False
+) -> Optional[bytes]:
+    """
+    Write an annotated document without intermediate copies.
 
-    annotated_pdf_bytes = output_buffer.getvalue()
-    output_buffer.close()
+    Args:
+        doc: Annotated PyMuPDF document (opened from the output file when
+            incremental). If an incremental save has to fall back to a
+            full rewrite, the document is closed before its file is
+            replaced, since an open handle would block the replace on
+            Windows and keep reading the old file elsewhere.
+        output: File path or writable binary stream, or None to return bytes
+        incremental: Append only changed objects to the document's own file
+        garbage: PyMuPDF garbage collection level (0-4) for full saves
+        deflate: Compress new and rewritten streams
 
-    return annotated_pdf_bytes
+    Returns:
+        PDF bytes when output is None, otherwise None
+    """
+    if incremental:
+        if doc.can_save_incrementally():
+            doc.save(doc.name, incremental=True, encryption=fitz.PDF_ENCRYPT_KEEP, deflate=deflate)
+        else:
+            # Repaired or re-encrypted files must be rewritten in full
+            path = doc.name
+            temp_path = f"{path}.tmp"
+            doc.save(temp_path, deflate=deflate)
+            doc.close()
+            os.replace(temp_path, path)
+        return None
+
+    if output is None:
+        # Pass an output to stream to disk instead of holding the whole PDF in memory
+        return doc.tobytes(garbage=garbage, deflate=deflate)
+
+    doc.save(output, garbage=garbage, deflate=deflate)
+    return None
 
 
 def add_issue_annotation(
     doc: fitz.Document,
     issue: Dict,
     highlighted_texts: set,
-    comment_counter: int
+    comment_counter: int,
+    text_index: Optional[TextIndex] = None,
+    batch: Optional[DrawingBatch] = None,
+    layout: Optional[MarginLayout] = None
 ) -> Optional[int]:
     """
     Add a single issue annotation to the PDF.
@@ -116,74 +468,140 @@ def add_issue_annotation(
         issue: Issue dictionary
         highlighted_texts: Set of already highlighted text
         comment_counter: Current comment number
+        text_index: TextIndex of the document (built if None)
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+        layout: Optional MarginLayout to queue the margin comment into (drawn
+            at the highlight if None)
 
     Returns:
         Updated comment counter, or None if not added
     """
     text_snippet = issue.get('text_snippet', '')
-    severity = issue.get('severity', 'medium')
-    suggestion = issue.get('suggestion', 'Review this section')
-    issue_type = issue.get('type', 'general')
-    page_hint = issue.get('page_hint')
 
     # Skip if already highlighted
     if text_snippet in highlighted_texts:
         return comment_counter
 
-    # Determine pages to search
+    if text_index is None:
+        text_index = TextIndex.from_document(doc)
+
+    placement = locate_issue(issue, highlighted_texts, text_index, doc.page_count)
+    if placement is None:
+        return comment_counter
+
+    draw_issue_annotation(
+        doc[placement['page_num']],
+        issue,
+        placement['rects'],
+        comment_counter,
+        batch,
+        layout
+    )
+    return comment_counter + 1
+
+
+def locate_issue(
+    issue: Dict,
+    highlighted_texts: set,
+    text_index: TextIndex,
+    page_count: int
+) -> Optional[Dict]:
+    """
+    Find where an issue should be annotated.
+
+    Args:
+        issue: Issue dictionary
+        highlighted_texts: Set of already highlighted text (updated on a match)
+        text_index: TextIndex of the document
+        page_count: Number of pages in the document
+
+    Returns:
+        {'page_num': int (0-indexed), 'rects': [fitz.Rect] or None for a
+        page-level note}, or None if the issue is a duplicate or cannot be
+        placed
+    """
+    text_snippet = issue.get('text_snippet', '')
+    page_hint = issue.get('page_hint')
+
+    # Skip if already highlighted
+    if text_snippet in highlighted_texts:
+        return None
+
+    # Determine pages to search (the whole document is one index probe)
     if page_hint:
         pages_to_search = range(
             max(0, page_hint - 2),
-            min(doc.page_count, page_hint + 1)
+            min(page_count, page_hint + 1)
         )
     else:
-        pages_to_search = range(min(20, doc.page_count))
+        pages_to_search = None
 
-    # Try to find and highlight the text
-    for page_num in pages_to_search:
-        page = doc[page_num]
+    # Try to find the text (tolerates slight paraphrasing)
+    match = text_index.find(text_snippet, pages=pages_to_search)
 
-        # Search for text (try first 50 chars)
-        search_text = text_snippet[:50]
-        text_instances = page.search_for(search_text)
+    if match:
+        highlighted_texts.add(text_snippet)
+        return {'page_num': match['page_num'], 'rects': match['rects']}
 
-        if text_instances:
-            rect = text_instances[0]
+    # If not found but have page hint, add general note
+    if page_hint and 0 <= page_hint - 1 < page_count:
+        return {'page_num': page_hint - 1, 'rects': None}
 
-            # Add highlight
-            add_highlight(page, rect, severity)
+    return None
 
-            # Add margin comment
-            add_margin_comment(
-                page,
-                rect,
-                comment_counter,
-                issue_type,
-                suggestion,
-                severity
-            )
 
-            highlighted_texts.add(text_snippet)
-            return comment_counter + 1
+def draw_issue_annotation(
+    page: fitz.Page,
+    issue: Dict,
+    rects: Optional[List[fitz.Rect]],
+    comment_num: int,
+    batch: Optional[DrawingBatch] = None,
+    layout: Optional[MarginLayout] = None
+):
+    """
+    Highlight a located issue and add its margin comment.
 
-    # If not found but have page hint, add general note
-    if page_hint and 0 <= page_hint - 1 < doc.page_count:
-        page = doc[page_hint - 1]
-        rect = fitz.Rect(50, 50, 150, 100)
-        add_sticky_note(
+    Args:
+        page: PyMuPDF page the issue was located on
+        issue: Issue dictionary
+        rects: Text rectangles from locate_issue, or None for a page-level note
+        comment_num: Comment number
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+        layout: Optional MarginLayout to queue the margin comment into
+    """
+    severity = issue.get('severity', 'medium')
+    suggestion = issue.get('suggestion', 'Review this section')
+    issue_type = issue.get('type', 'general')
+
+    if rects:
+        # Add highlight
+        add_highlight(page, rects, severity)
+
+        # Add margin comment
+        add_margin_comment(
             page,
-            rect,
-            f"[{comment_counter}] {issue_type.upper()}\n\n{suggestion}",
-            icon="Help"
+            rects[0],
+            comment_num,
+            issue_type,
+            suggestion,
+            severity,
+            batch,
+            layout
         )
-        return comment_counter + 1
-
-    return comment_counter
+        return
+
+    rect = fitz.Rect(50, 50, 150, 100)
+    add_sticky_note(
+        page,
+        rect,
+        f"[{comment_num}] {issue_type.upper()}\n\n{suggestion}",
+        icon="Help"
+    )
 
 
 def add_highlight(
     page: fitz.Page,
-    rect: fitz.Rect,
+    rect: fitz.Rect | List[fitz.Rect],
     severity: str = 'medium'
 ):
     """
@@ -191,7 +609,7 @@ def add_highlight(
 
     Args:
         page: PyMuPDF page object
-        rect: Rectangle to highlight
+        rect: Rectangle to highlight, or one rectangle per text line
         severity: Severity level (critical, major, minor, suggestion, strength)
     """
     try:
@@ -212,7 +630,9 @@ def add_margin_comment(
     comment_num: int,
     issue_type: str,
     suggestion: str,
-    severity: str = 'medium'
+    severity: str = 'medium',
+    batch: Optional[DrawingBatch] = None,
+    layout: Optional[MarginLayout] = None
 ):
     """
     Add numbered comment in margin with connector line.
@@ -224,32 +644,47 @@ def add_margin_comment(
         issue_type: Type of issue (grammar, logic, etc.)
         suggestion: Suggestion text
         severity: Severity level
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+        layout: Optional MarginLayout to queue the box into instead of drawing
+            it at the text's height now
     """
     try:
-        # Get page dimensions
-        page_rect = page.rect
-        margin_x = page_rect.width - 180  # Right margin
-
-        # Position comment in right margin
-        comment_y = text_rect.y0
-        comment_rect = fitz.Rect(
-            margin_x,
-            comment_y,
-            page_rect.width - 10,
-            comment_y + 80
-        )
-
         # Get icon for issue type
         icon = ANNOTATION_ICONS.get(issue_type, '📝')
 
         # Format comment text
         comment_text = f"{icon} [{comment_num}] {issue_type.upper()}\n\n{suggestion[:120]}"
 
-        # Add comment box with background
-        add_comment_box(page, comment_rect, comment_text, severity)
+        def draw(target: fitz.Page, comment_y: float, drawing: DrawingBatch):
+            # Position comment in right margin
+            page_rect = target.rect
+            comment_rect = fitz.Rect(
+                page_rect.width - 180,
+                comment_y,
+                page_rect.width - 10,
+                comment_y + COMMENT_BOX_HEIGHT
+            )
+
+            # Add comment box with background
+            add_comment_box(target, comment_rect, comment_text, severity, drawing)
 
-        # Add connector line from text to comment
-        add_connector_line(page, text_rect, comment_rect)
+            # Add connector line from text to comment
+            add_connector_line(target, text_rect, comment_rect, batch=drawing)
+
+        if layout is not None:
+            layout.add(page.number, text_rect.y0, COMMENT_BOX_HEIGHT, {
+                'draw': draw,
+                'label': f"[{comment_num}] {issue_type.upper()}",
+                'text': suggestion,
+                'note_rect': text_rect,
+                'note': f"[{comment_num}] {suggestion}"
+            })
+            return
+
+        drawing = batch if batch is not None else DrawingBatch()
+        draw(page, text_rect.y0, drawing)
+        if batch is None:
+            drawing.commit()
 
     except Exception:
         # Fallback to simple sticky note
@@ -265,7 +700,8 @@ def add_comment_box(
     page: fitz.Page,
     rect: fitz.Rect,
     text: str,
-    severity: str = 'medium'
+    severity: str = 'medium',
+    batch: Optional[DrawingBatch] = None
 ):
     """
     Add a styled comment box with background color.
@@ -275,22 +711,24 @@ def add_comment_box(
         rect: Rectangle for comment box
         text: Comment text
         severity: Severity level for color coding
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
     """
     try:
+        drawing = batch if batch is not None else DrawingBatch()
+
         # Get color based on severity
         color_rgba = HIGHLIGHT_COLORS.get(severity, HIGHLIGHT_COLORS['medium'])
         bg_color = (color_rgba[0], color_rgba[1], color_rgba[2])
 
         # Draw rectangle background
-        shape = page.new_shape()
-        shape.draw_rect(rect)
-        shape.finish(
+        drawing.draw_rect(
+            page,
+            rect,
             color=bg_color,
             fill=bg_color,
             width=0.5,
             fill_opacity=0.1
         )
-        shape.commit()
 
         # Add text using insert_text to avoid mirroring (split into lines)
         lines = text.split('\n')
@@ -298,7 +736,8 @@ def add_comment_box(
         for line in lines[:8]:  # Limit to 8 lines
             if line.strip():
                 text_point = fitz.Point(rect.x0 + 3, y_pos)
-                page.insert_text(
+                drawing.insert_text(
+                    page,
                     text_point,
                     line[:35],  # Truncate long lines
                     fontsize=7,
@@ -307,6 +746,9 @@ def add_comment_box(
                 )
             y_pos += 9
 
+        if batch is None:
+            drawing.commit()
+
     except Exception:
         pass
 
@@ -315,7 +757,8 @@ def add_connector_line(
     page: fitz.Page,
     from_rect: fitz.Rect,
     to_rect: fitz.Rect,
-    color: Tuple[float, float, float] = (0.5, 0.5, 0.5)
+    color: Tuple[float, float, float] = (0.5, 0.5, 0.5),
+    batch: Optional[DrawingBatch] = None
 ):
     """
     Draw a line connecting highlighted text to margin comment.
@@ -325,6 +768,7 @@ def add_connector_line(
         from_rect: Source rectangle (highlighted text)
         to_rect: Target rectangle (comment box)
         color: Line color RGB tuple
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
     """
     try:
         # Calculate connection points
@@ -332,31 +776,45 @@ def add_connector_line(
         end_point = fitz.Point(to_rect.x0, to_rect.y0 + to_rect.height / 2)
 
         # Draw line
-        shape = page.new_shape()
-        shape.draw_line(start_point, end_point)
-        shape.finish(
+        drawing = batch if batch is not None else DrawingBatch()
+        drawing.draw_line(
+            page,
+            start_point,
+            end_point,
             color=color,
             width=0.5,
             dashes="[2 2]"  # Dashed line
         )
-        shape.commit()
+        if batch is None:
+            drawing.commit()
 
     except Exception:
         pass
 
 
-def add_inline_rewrite(doc: fitz.Document, rewrite: Dict):
+def add_inline_rewrite(
+    doc: fitz.Document,
+    rewrite: Dict,
+    text_index: Optional[TextIndex] = None,
+    batch: Optional[DrawingBatch] = None,
+    layout: Optional[MarginLayout] = None,
+    rect: Optional[fitz.Rect] = None
+):
     """
     Add rewrite suggestion with strikethrough and margin comment.
 
     Args:
         doc: PyMuPDF document
         rewrite: Dictionary with 'original', 'suggested', 'page_num', 'explanation'
+        text_index: TextIndex of the document (built if None)
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+        layout: Optional MarginLayout to queue the margin box into
+        rect: Rectangle of the original text if already located (skips the lookup)
     """
     try:
         original_text = rewrite.get('original', '')
         suggested_text = rewrite.get('suggested', '')
-        page_num = rewrite.get('page_num', 1) - 1  # Convert to 0-indexed
+        page_num = (rewrite.get('page_num') or 0) - 1  # Convert to 0-indexed (None: no page)
         explanation = rewrite.get('explanation', '')
 
         if page_num < 0 or page_num >= doc.page_count:
@@ -365,11 +823,16 @@ def add_inline_rewrite(doc: fitz.Document, rewrite: Dict):
         page = doc[page_num]
         page_rect = page.rect
 
-        # Find original text
-        text_instances = page.search_for(original_text[:50])
+        if rect is None:
+            if text_index is None:
+                text_index = TextIndex.from_document(doc)
+
+            # Find original text (exact wording only - it is about to be rewritten)
+            match = text_index.find(original_text, pages=[page_num], fuzzy=False)
+            if match:
+                rect = match['rects'][0]
 
-        if text_instances:
-            rect = text_instances[0]
+        if rect is not None:
 
             # Add underline annotation (more visible than strikethrough)
             underline = page.add_underline_annot(rect)
@@ -377,62 +840,74 @@ def add_inline_rewrite(doc: fitz.Document, rewrite: Dict):
             underline.set_info(content=f"REWRITE: {suggested_text}")
             underline.update()
 
-            # Create prominent margin comment box for the rewrite
-            margin_x = page_rect.width - 200
-            comment_y = rect.y0
-
-            # Make sure it doesn't go off page
-            if comment_y + 100 > page_rect.height:
-                comment_y = page_rect.height - 110
-
-            comment_rect = fitz.Rect(
-                margin_x,
-                comment_y,
-                page_rect.width - 10,
-                comment_y + 100
-            )
-
             # Create comment text with clear formatting
             comment_text = f"✏️ REWRITE SUGGESTION\n\nOriginal:\n{original_text[:60]}...\n\nSuggested:\n{suggested_text[:60]}..."
 
-            # Draw comment box with blue background (for rewrites)
-            shape = page.new_shape()
-            shape.draw_rect(comment_rect)
-            shape.finish(
-                color=(0, 0.5, 1),  # Blue border
-                fill=(0.9, 0.95, 1),  # Light blue fill
-                width=1.5,
-                fill_opacity=0.3
-            )
-            shape.commit()
+            def draw(target: fitz.Page, comment_y: float, drawing: DrawingBatch):
+                # Create prominent margin comment box for the rewrite
+                target_rect = target.rect
+                comment_rect = fitz.Rect(
+                    target_rect.width - 200,
+                    comment_y,
+                    target_rect.width - 10,
+                    comment_y + REWRITE_BOX_HEIGHT
+                )
 
-            # Add comment text using insert_text (split into lines to avoid mirroring)
-            lines = comment_text.split('\n')
-            y_pos = comment_rect.y0 + 10
-            for line in lines[:10]:  # Limit to 10 lines
-                if line.strip():
-                    text_point = fitz.Point(comment_rect.x0 + 3, y_pos)
-                    page.insert_text(
-                        text_point,
-                        line[:40],  # Truncate long lines to fit in margin
-                        fontsize=7,
-                        fontname="helv",
-                        color=(0, 0, 0)
-                    )
-                y_pos += 9
-
-            # Draw connector line from underlined text to comment
-            start_point = fitz.Point(rect.x1, rect.y0 + rect.height / 2)
-            end_point = fitz.Point(comment_rect.x0, comment_rect.y0 + comment_rect.height / 2)
-
-            line_shape = page.new_shape()
-            line_shape.draw_line(start_point, end_point)
-            line_shape.finish(
-                color=(0, 0.5, 1),
-                width=1,
-                dashes="[2 2]"
-            )
-            line_shape.commit()
+                # Draw comment box with blue background (for rewrites)
+                drawing.draw_rect(
+                    target,
+                    comment_rect,
+                    color=(0, 0.5, 1),  # Blue border
+                    fill=(0.9, 0.95, 1),  # Light blue fill
+                    width=1.5,
+                    fill_opacity=0.3
+                )
+
+                # Add comment text using insert_text (split into lines to avoid mirroring)
+                lines = comment_text.split('\n')
+                y_pos = comment_rect.y0 + 10
+                for line in lines[:10]:  # Limit to 10 lines
+                    if line.strip():
+                        text_point = fitz.Point(comment_rect.x0 + 3, y_pos)
+                        drawing.insert_text(
+                            target,
+                            text_point,
+                            line[:40],  # Truncate long lines to fit in margin
+                            fontsize=7,
+                            fontname="helv",
+                            color=(0, 0, 0)
+                        )
+                    y_pos += 9
+
+                # Draw connector line from underlined text to comment
+                start_point = fitz.Point(rect.x1, rect.y0 + rect.height / 2)
+                end_point = fitz.Point(comment_rect.x0, comment_rect.y0 + comment_rect.height / 2)
+
+                drawing.draw_line(
+                    target,
+                    start_point,
+                    end_point,
+                    color=(0, 0.5, 1),
+                    width=1,
+                    dashes="[2 2]"
+                )
+
+            if layout is not None:
+                layout.add(page_num, rect.y0, REWRITE_BOX_HEIGHT, {
+                    'draw': draw,
+                    'label': "REWRITE",
+                    'text': f"Original: {original_text}\nSuggested: {suggested_text}"
+                })
+            else:
+                # Make sure it doesn't go off page
+                comment_y = rect.y0
+                if comment_y + REWRITE_BOX_HEIGHT > page_rect.height:
+                    comment_y = page_rect.height - 110
+
+                drawing = batch if batch is not None else DrawingBatch()
+                draw(page, comment_y, drawing)
+                if batch is None:
+                    drawing.commit()
 
             # Add clickable sticky note for full details
             note_pos = fitz.Point(rect.x1 + 2, rect.y0)
@@ -462,17 +937,24 @@ def add_inline_rewrite(doc: fitz.Document, rewrite: Dict):
             pass
 
 
-def add_section_summary_box(doc: fitz.Document, summary: Dict):
+def add_section_summary_box(
+    doc: fitz.Document,
+    summary: Dict,
+    batch: Optional[DrawingBatch] = None,
+    layout: Optional[MarginLayout] = None
+):
     """
     Add a summary box at the top/bottom of a section.
 
     Args:
         doc: PyMuPDF document
         summary: Dictionary with 'section', 'page_num', 'strengths', 'issues', 'suggestions', 'score'
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+        layout: Optional MarginLayout; the box's band is kept free of margin boxes
     """
     try:
         section_name = summary.get('section', 'Section')
-        page_num = summary.get('page_num', 1) - 1
+        page_num = (summary.get('page_num') or 0) - 1
         strengths = summary.get('strengths', [])
         issues = summary.get('issues', [])
         suggestions = summary.get('suggestions', [])
@@ -492,6 +974,8 @@ def add_section_summary_box(doc: fitz.Document, summary: Dict):
             page_rect.width - 50,
             50 + box_height
         )
+        if layout is not None:
+            layout.reserve(page_num, summary_rect.y0, summary_rect.y1)
 
         # Build summary text
         summary_text = f"📊 {section_name.upper()} REVIEW (Score: {score}/10)\n\n"
@@ -513,16 +997,17 @@ def add_section_summary_box(doc: fitz.Document, summary: Dict):
             for suggestion in suggestions[:2]:
                 summary_text += f"  • {suggestion[:60]}\n"
 
+        drawing = batch if batch is not None else DrawingBatch()
+
         # Draw box with border
-        shape = page.new_shape()
-        shape.draw_rect(summary_rect)
-        shape.finish(
+        drawing.draw_rect(
+            page,
+            summary_rect,
             color=(0, 0.5, 1),
             fill=(0.9, 0.95, 1),
             width=1,
             fill_opacity=0.3
         )
-        shape.commit()
 
         # Add text using insert_text (split into lines to avoid mirroring)
         lines = summary_text.split('\n')
@@ -532,7 +1017,8 @@ def add_section_summary_box(doc: fitz.Document, summary: Dict):
                 break
             if line.strip():
                 text_point = fitz.Point(summary_rect.x0 + 8, y_pos)
-                page.insert_text(
+                drawing.insert_text(
+                    page,
                     text_point,
                     line[:80],  # Truncate very long lines
                     fontsize=8,
@@ -541,18 +1027,28 @@ def add_section_summary_box(doc: fitz.Document, summary: Dict):
                 )
             y_pos += 10
 
+        if batch is None:
+            drawing.commit()
+
     except Exception:
         pass
 
 
-def add_annotation_legend(page: fitz.Page):
+def add_annotation_legend(
+    page: fitz.Page,
+    batch: Optional[DrawingBatch] = None,
+    layout: Optional[MarginLayout] = None
+):
     """
     Add a color legend explaining the annotation system.
 
     Args:
         page: PyMuPDF page object (typically first page)
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+        layout: Optional MarginLayout; the legend's band is kept free of margin boxes
     """
     try:
+        drawing = batch if batch is not None else DrawingBatch()
         page_rect = page.rect
 
         # Position legend in top-right corner
@@ -564,21 +1060,23 @@ def add_annotation_legend(page: fitz.Page):
             page_rect.width - 10,
             10 + legend_height
         )
+        if layout is not None:
+            layout.reserve(page.number, legend_rect.y0, legend_rect.y1)
 
         # Draw legend box
-        shape = page.new_shape()
-        shape.draw_rect(legend_rect)
-        shape.finish(
+        drawing.draw_rect(
+            page,
+            legend_rect,
             color=(0, 0, 0),
             fill=(1, 1, 1),
             width=1,
             fill_opacity=0.9
         )
-        shape.commit()
 
         # Add title using insert_text (not insert_textbox to avoid mirroring)
         title_point = fitz.Point(legend_rect.x0 + legend_width / 2 - 50, legend_rect.y0 + 15)
-        page.insert_text(
+        drawing.insert_text(
+            page,
             title_point,
             "ANNOTATION LEGEND",
             fontsize=9,
@@ -605,19 +1103,19 @@ def add_annotation_legend(page: fitz.Page):
                 legend_rect.y0 + y_offset + 12
             )
 
-            sample_shape = page.new_shape()
-            sample_shape.draw_rect(sample_rect)
-            sample_shape.finish(
+            drawing.draw_rect(
+                page,
+                sample_rect,
                 color=color[:3],
                 fill=color[:3],
                 width=0.5,
                 fill_opacity=color[3]
             )
-            sample_shape.commit()
 
             # Add label using insert_text
             label_point = fitz.Point(legend_rect.x0 + 35, legend_rect.y0 + y_offset + 9)
-            page.insert_text(
+            drawing.insert_text(
+                page,
                 label_point,
                 label,
                 fontsize=7,
@@ -627,10 +1125,111 @@ def add_annotation_legend(page: fitz.Page):
 
             y_offset += 16
 
+        if batch is None:
+            drawing.commit()
+
     except Exception:
         pass
 
 
+def render_margin_layout(
+    doc: fitz.Document,
+    layout: MarginLayout,
+    batch: Optional[DrawingBatch] = None,
+    append_overflow: bool = True
+) -> List[Tuple[int, Dict]]:
+    """
+    Place and draw every margin box queued in a MarginLayout.
+
+    Boxes that do not fit beside their text get a sticky note at the text
+    (where they carry one) and are listed on comment pages appended to the
+    document.
+
+    Args:
+        doc: PyMuPDF document
+        layout: MarginLayout filled by the add_* helpers
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+        append_overflow: Append the comment pages here; when False the
+            caller passes the returned overflow to add_overflow_comment_pages
+
+    Returns:
+        Overflowed comments as (0-indexed page number, {'label', 'text'})
+    """
+    drawing = batch if batch is not None else DrawingBatch()
+    placed, overflow = layout.solve(lambda page_num: doc[page_num].rect.height)
+
+    for page_num, comment_y, box in placed:
+        try:
+            box['draw'](doc[page_num], comment_y, drawing)
+        except Exception:
+            pass
+
+    comments = []
+    for page_num, box in overflow:
+        if box.get('note'):
+            add_sticky_note(doc[page_num], box['note_rect'], box['note'], icon="Note")
+        comments.append((page_num, {'label': box['label'], 'text': box['text']}))
+
+    if comments and append_overflow:
+        add_overflow_comment_pages(doc, comments, drawing)
+
+    if batch is None:
+        drawing.commit()
+    return comments
+
+
+def add_overflow_comment_pages(
+    doc: fitz.Document,
+    overflow: List[Tuple[int, Dict]],
+    batch: Optional[DrawingBatch] = None
+):
+    """
+    Append pages listing margin comments that did not fit on their page.
+
+    Args:
+        doc: PyMuPDF document
+        overflow: (0-indexed page number, box) pairs from MarginLayout.solve
+        batch: Optional DrawingBatch to queue drawing into (committed here if None)
+    """
+    drawing = batch if batch is not None else DrawingBatch()
+    page = None
+    y_pos = 0
+
+    for page_num, box in overflow:
+        lines = [f"{box['label']} (page {page_num + 1})"]
+        for paragraph in box['text'].split('\n'):
+            lines.extend(textwrap.wrap(paragraph, 110) or [""])
+
+        if page is None or y_pos + 10 * len(lines) > 792:
+            # New pages invalidate the pages pending drawing refers to
+            drawing.commit()
+            page = doc.new_page(width=595, height=842)  # A4 size
+            drawing.insert_text(
+                page,
+                fitz.Point(50, 60),
+                "ADDITIONAL REVIEW COMMENTS",
+                fontsize=12,
+                fontname="helv",
+                color=(0, 0, 0)
+            )
+            y_pos = 90
+
+        for i, line in enumerate(lines):
+            drawing.insert_text(
+                page,
+                fitz.Point(50 if i == 0 else 60, y_pos),
+                line,
+                fontsize=8,
+                fontname="helv",
+                color=(0, 0, 0)
+            )
+            y_pos += 10
+        y_pos += 6
+
+    if batch is None:
+        drawing.commit()
+
+
 def add_sticky_note(
     page: fitz.Page,
     rect: fitz.Rect,
@@ -665,69 +1264,3 @@ def add_sticky_note(
         annot.update()
     except Exception:
         pass
-
-
-def add_summary_page(pdf_bytes: bytes, critique_summary: str, issue_count: int) -> bytes:
-    """
-    Add a summary page at the beginning of the PDF.
-
-    Args:
-        pdf_bytes: Original PDF bytes
-        critique_summary: Summary text to add
-        issue_count: Number of issues found
-
-    Returns:
-        PDF with summary page prepended
-    """
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-
-    # Insert blank page at the beginning
-    new_page = doc.new_page(0, width=595, height=842)  # A4 size
-
-    # Add title using insert_text
-    title_point = fitz.Point(200, 70)
-    new_page.insert_text(
-        title_point,
-        "Thesis Review Summary",
-        fontsize=18,
-        fontname="helv",
-        color=(0, 0, 0)
-    )
-
-    # Add issue count
-    count_point = fitz.Point(50, 130)
-    new_page.insert_text(
-        count_point,
-        f"Total Issues Found: {issue_count}",
-        fontsize=12,
-        fontname="helv",
-        color=(0, 0, 0)
-    )
-
-    # Add summary (truncate if too long and split into lines)
-    summary_text = critique_summary[:1000] + "..." if len(critique_summary) > 1000 else critique_summary
-    lines = summary_text.split('\n')
-    y_pos = 170
-    for line in lines[:50]:  # Limit to 50 lines
-        if y_pos > 750:
-            break
-        if line.strip():
-            text_point = fitz.Point(50, y_pos)
-            new_page.insert_text(
-                text_point,
-                line[:100],  # Truncate very long lines
-                fontsize=10,
-                fontname="helv",
-                color=(0, 0, 0)
-            )
-        y_pos += 12
-
-    # Save to bytes
-    output_buffer = io.BytesIO()
-    doc.save(output_buffer)
-    doc.close()
-
-    result_bytes = output_buffer.getvalue()
-    output_buffer.close()
-
-    return result_bytes
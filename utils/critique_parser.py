@@ -0,0 +1,513 @@
+"""
+Compiled, single-pass parsing of generated critiques.
+
+The critique is tokenized once into a CritiqueDocument: lines, line offsets
+and the severity/type keywords found on each line (one substring search per
+keyword over the whole text instead of a dozen keyword scans per line). The issue, rewrite and
+section parsers all read from the same document, and produce exactly the
+output of the original line-by-line parsers.
+"""
+
+import re
+from bisect import bisect_right
+from functools import cached_property
+from typing import Dict, List, Optional, Tuple
+
+
+# Severity categories in priority order (the first one present on a line wins)
+SEVERITY_KEYWORDS = [
+    ('critical', ['critical', 'major issue', 'serious', 'fatal', 'fundamental']),
+    ('major', ['major', 'significant', 'important']),
+    ('minor', ['minor', 'small', 'typo', 'grammar']),
+    ('suggestion', ['suggest', 'could', 'might', 'consider', 'recommendation']),
+    ('strength', ['strength', 'well-written', 'excellent', 'good', 'clear']),
+]
+
+# Issue type categories in priority order
+TYPE_KEYWORDS = [
+    ('methodology', ['methodology', 'research design']),
+    ('grammar', ['grammar', 'spelling', 'typo']),
+    ('clarity', ['writing', 'clarity', 'style']),
+    ('logic', ['logic', 'argument', 'reasoning']),
+]
+
+SECTION_NAMES = [
+    'abstract', 'introduction', 'literature review',
+    'methodology', 'results', 'discussion', 'conclusion'
+]
+
+MAX_REWRITES = 10
+MAX_FALLBACK_QUOTES = 5
+
+# Lines after a quoted snippet that make up its suggestion
+SUGGESTION_LINES = 3
+
+QUOTE_PATTERN = re.compile(r'"([^"]{20,200})"')
+PAGE_PATTERN = re.compile(r'(?:page|pg\.?|p\.)\s*(\d+)', re.IGNORECASE)
+REWRITE_PATTERN = re.compile(
+    r'"([^"]+)"\s*(?:→|->|should be|could be|replace with)\s*"([^"]+)"',
+    re.IGNORECASE
+)
+# One named group per section, so case-folded matches map back to the name
+SECTION_HEADING_PATTERN = re.compile(
+    r'##\s*(?:' + '|'.join(
+        f'(?P<s{i}>{re.escape(name)})' for i, name in enumerate(SECTION_NAMES)
+    ) + r')',
+    re.IGNORECASE
+)
+SCORE_PATTERN = re.compile(r'score:?\s*(\d+)(?:/10)?', re.IGNORECASE)
+
+STRENGTH_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'strength[s]?:?\s*[-•]\s*([^\n]+)',
+        r'good:?\s*[-•]\s*([^\n]+)',
+        r'well[- ](?:written|done):?\s*[-•]\s*([^\n]+)'
+    ]
+]
+ISSUE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'issue[s]?:?\s*[-•]\s*([^\n]+)',
+        r'problem[s]?:?\s*[-•]\s*([^\n]+)',
+        r'concern[s]?:?\s*[-•]\s*([^\n]+)',
+        r'weakness[es]*:?\s*[-•]\s*([^\n]+)'
+    ]
+]
+SUGGESTION_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE) for pattern in [
+        r'suggest[ion]*[s]?:?\s*[-•]\s*([^\n]+)',
+        r'recommend[ation]*[s]?:?\s*[-•]\s*([^\n]+)',
+        r'should:?\s*[-•]\s*([^\n]+)'
+    ]
+]
+
+
+def _compile_keywords() -> Dict[str, Tuple[int, int]]:
+    """
+    Build the keyword table shared by every line.
+
+    Keywords appearing in several categories (e.g. 'typo' is both a minor
+    severity and a grammar type) are listed once.
+
+    Returns:
+        {keyword: (severity_mask, type_mask)} where bit n marks the n-th
+        category of SEVERITY_KEYWORDS / TYPE_KEYWORDS
+    """
+    masks: Dict[str, Tuple[int, int]] = {}
+    for rank, (_, words) in enumerate(SEVERITY_KEYWORDS):
+        for word in words:
+            severity_mask, type_mask = masks.get(word, (0, 0))
+            masks[word] = (severity_mask | 1 << rank, type_mask)
+    for rank, (_, words) in enumerate(TYPE_KEYWORDS):
+        for word in words:
+            severity_mask, type_mask = masks.get(word, (0, 0))
+            masks[word] = (severity_mask, type_mask | 1 << rank)
+    return masks
+
+
+KEYWORD_MASKS = _compile_keywords()
+
+
+def _lowest_bit(mask: int) -> int:
+    """Index of the highest-priority (lowest) set bit."""
+    return (mask & -mask).bit_length() - 1
+
+
+class CritiqueDocument:
+    """
+    A critique tokenized once for all parsers.
+
+    The line split and keyword scan are computed on first use, so parsers
+    that only need the raw text do not pay for them.
+
+    Attributes:
+        text: Raw critique text
+        lines: text split on newlines
+        keyword_lines: {line_index: (severity_mask, type_mask)} for lines
+            containing at least one severity or type keyword
+        quote_lines: Indexes of lines containing a double quote
+    """
+
+    def __init__(self, text: str):
+        self.text = text
+
+    @cached_property
+    def lines(self) -> List[str]:
+        return self.text.split('\n')
+
+    @cached_property
+    def keyword_lines(self) -> Dict[int, Tuple[int, int]]:
+        # Lower-casing never adds or removes newlines, so the lowered text has
+        # the same lines (though not necessarily the same offsets) as the original
+        lowered = self.text.lower()
+        line_starts = [0]
+        line_starts.extend(match.end() for match in re.finditer('\n', lowered))
+        line_starts.append(len(lowered) + 1)
+
+        severity_masks = [0] * len(line_starts)
+        type_masks = [0] * len(line_starts)
+        find = lowered.find
+
+        # One substring search per keyword over the whole text; after a hit
+        # the search skips to the next line, since presence is all that matters
+        for keyword, (severity_mask, type_mask) in KEYWORD_MASKS.items():
+            position = find(keyword)
+            while position != -1:
+                line_index = bisect_right(line_starts, position) - 1
+                severity_masks[line_index] |= severity_mask
+                type_masks[line_index] |= type_mask
+                position = find(keyword, line_starts[line_index + 1])
+
+        return {
+            i: (severity_masks[i], type_masks[i])
+            for i in range(len(line_starts) - 1)
+            if severity_masks[i] or type_masks[i]
+        }
+
+    @cached_property
+    def quote_lines(self) -> List[int]:
+        return [i for i, line in enumerate(self.lines) if '"' in line]
+
+
+def _line_masks(line_lower: str) -> Tuple[int, int]:
+    """Severity and type bitmasks for a single lower-cased line."""
+    severity_mask = type_mask = 0
+    for keyword, (keyword_severity, keyword_type) in KEYWORD_MASKS.items():
+        if keyword in line_lower:
+            severity_mask |= keyword_severity
+            type_mask |= keyword_type
+    return severity_mask, type_mask
+
+
+def _advance_state(severity_mask: int, type_mask: int, current_type: str, current_severity: str) -> Tuple[str, str]:
+    """
+    Apply one line's keywords to the running (type, severity) state.
+
+    Returns:
+        Updated (current_type, current_severity)
+    """
+    if severity_mask:
+        current_severity = SEVERITY_KEYWORDS[_lowest_bit(severity_mask)][0]
+        if current_severity == 'strength':
+            current_type = 'strength'
+
+    issue_type = TYPE_KEYWORDS[_lowest_bit(type_mask)][0] if type_mask else None
+    if issue_type == 'methodology':
+        current_type = 'methodology'
+        if current_severity not in ['critical', 'strength']:
+            current_severity = 'major'  # Methodology issues are typically major
+    elif issue_type == 'grammar':
+        current_type = 'grammar'
+        if current_severity not in ['critical', 'major']:
+            current_severity = 'minor'
+    elif issue_type == 'clarity':
+        current_type = 'clarity'
+    elif issue_type == 'logic':
+        current_type = 'logic'
+        if current_severity == 'minor':
+            current_severity = 'major'  # Logic issues are at least major
+
+    return current_type, current_severity
+
+
+def _start_issue(line: str, current_type: str, current_severity: str) -> Optional[Dict]:
+    """Issue for a line quoting the thesis, without its suggestion yet (None if no quote)."""
+    if '"' not in line:
+        return None
+    snippet_match = QUOTE_PATTERN.search(line)
+    if not snippet_match:
+        return None
+
+    page_hint = None
+    page_match = PAGE_PATTERN.search(line)
+    if page_match:
+        page_hint = int(page_match.group(1))
+
+    return {
+        'type': current_type,
+        'severity': current_severity,
+        'text_snippet': snippet_match.group(1)[:150],  # Limit length
+        'suggestion': '',
+        'page_hint': page_hint
+    }
+
+
+def _finish_issue(issue: Dict, following_lines: List[str]) -> Dict:
+    """Fill in the suggestion from up to SUGGESTION_LINES lines after the quote."""
+    suggestion = ""
+    for line in following_lines[:SUGGESTION_LINES]:
+        if line.strip() and not line.startswith('#'):
+            suggestion += line.strip() + " "
+    issue['suggestion'] = suggestion[:200].strip() if suggestion.strip() else 'Review and improve this section'
+    return issue
+
+
+def _fallback_issues(text: str) -> List[Dict]:
+    """General issues from the first quotes, used when no issue lines were found."""
+    issues = []
+    for quote_match in QUOTE_PATTERN.finditer(text):
+        if len(issues) >= MAX_FALLBACK_QUOTES:
+            break
+        issues.append({
+            'type': 'general',
+            'severity': 'major',
+            'text_snippet': quote_match.group(1)[:150],
+            'suggestion': 'Review and revise this section',
+            'page_hint': None
+        })
+    return issues
+
+
+def parse_issues(doc: CritiqueDocument) -> List[Dict]:
+    """
+    Extract structured issues (see utils.groq_client.parse_critique_for_issues).
+
+    Only lines that change the running severity/type state or carry a quote
+    are visited.
+    """
+    issues = []
+    lines = doc.lines
+
+    current_type = 'general'
+    current_severity = 'major'  # Default to major
+
+    event_lines = sorted(set(doc.keyword_lines) | set(doc.quote_lines))
+
+    for i in event_lines:
+        severity_mask, type_mask = doc.keyword_lines.get(i, (0, 0))
+        current_type, current_severity = _advance_state(severity_mask, type_mask, current_type, current_severity)
+
+        if i + 1 < len(lines):
+            issue = _start_issue(lines[i], current_type, current_severity)
+            if issue is not None:
+                issues.append(_finish_issue(issue, lines[i + 1:i + 1 + SUGGESTION_LINES]))
+
+    # If no issues found through parsing, create general issues from quotes
+    if not issues:
+        issues = _fallback_issues(doc.text)
+
+    return issues
+
+
+def parse_rewrites(doc: CritiqueDocument) -> List[Dict]:
+    """
+    Extract inline rewrite suggestions (see utils.groq_client.parse_rewrite_suggestions).
+
+    The page hint is searched around the first occurrence of the original
+    text; occurrences are memoized and the scan stops at the rewrite limit.
+    """
+    text = doc.text
+    rewrites = []
+    first_occurrence: Dict[str, int] = {}
+
+    for match in REWRITE_PATTERN.finditer(text):
+        if len(rewrites) >= MAX_REWRITES:
+            break
+
+        original, suggested = match.group(1), match.group(2)
+
+        # The match itself is an occurrence, so the search never passes it
+        position = first_occurrence.get(original)
+        if position is None:
+            position = text.find(original, 0, match.end(1))
+            first_occurrence[original] = position
+
+        context = text[max(0, position - 100):min(len(text), position + 100)]
+
+        page_num = None
+        page_match = PAGE_PATTERN.search(context)
+        if page_match:
+            page_num = int(page_match.group(1))
+
+        rewrites.append({
+            'original': original[:100],
+            'suggested': suggested[:100],
+            'explanation': 'Improves clarity and correctness',
+            'page_num': page_num
+        })
+
+    return rewrites
+
+
+def parse_sections(doc: CritiqueDocument) -> List[Dict]:
+    """
+    Extract section-level summaries (see utils.groq_client.parse_section_summaries).
+
+    All section headings are found in one pass; each section's content runs
+    to the next '#'.
+    """
+    text = doc.text
+
+    first_heading: Dict[str, int] = {}
+    for match in SECTION_HEADING_PATTERN.finditer(text):
+        name = SECTION_NAMES[int(match.lastgroup[1:])]
+        if name not in first_heading:
+            first_heading[name] = match.start()
+
+    summaries = []
+    for section in SECTION_NAMES:
+        start = first_heading.get(section)
+        if start is None:
+            continue
+
+        # Equivalent to matching '##\s*<section>[^#]*' at the heading
+        end = text.find('#', start + 2)
+        section_content = text[start:end if end != -1 else len(text)]
+
+        strengths = []
+        for pattern in STRENGTH_PATTERNS:
+            strengths.extend(pattern.findall(section_content))
+
+        issues = []
+        for pattern in ISSUE_PATTERNS:
+            issues.extend(pattern.findall(section_content))
+
+        suggestions = []
+        for pattern in SUGGESTION_PATTERNS:
+            suggestions.extend(pattern.findall(section_content))
+
+        score = 7  # Default
+        score_match = SCORE_PATTERN.search(section_content)
+        if score_match:
+            score = int(score_match.group(1))
+
+        page_num = None
+        page_match = PAGE_PATTERN.search(section_content)
+        if page_match:
+            page_num = int(page_match.group(1))
+
+        if strengths or issues or suggestions:
+            summaries.append({
+                'section': section.title(),
+                'page_num': page_num,
+                'strengths': strengths[:3],
+                'issues': issues[:3],
+                'suggestions': suggestions[:3],
+                'score': min(10, max(1, score))
+            })
+
+    return summaries
+
+
+def parse_critique(critique_text: str) -> Dict[str, List[Dict]]:
+    """
+    Run all three parsers over one tokenization of the critique.
+
+    Args:
+        critique_text: Generated critique text
+
+    Returns:
+        {'issues': [...], 'rewrites': [...], 'section_summaries': [...]}
+    """
+    doc = CritiqueDocument(critique_text)
+    return {
+        'issues': parse_issues(doc),
+        'rewrites': parse_rewrites(doc),
+        'section_summaries': parse_sections(doc)
+    }
+
+
+class IncrementalCritiqueParser:
+    """
+    Parse a critique while it is still streaming.
+
+    Feed chunks as they arrive; each complete line updates the running
+    severity/type state, and an issue is emitted as soon as the lines that
+    form its suggestion have arrived. close() returns the same result as
+    parse_critique() on the full text.
+
+    Example:
+        parser = IncrementalCritiqueParser()
+        for chunk in generate_critique(client, prompt):
+            for issue in parser.feed(chunk):
+                ...
+        parsed = parser.close()
+    """
+
+    def __init__(self):
+        self.issues: List[Dict] = []
+        self._parts: List[str] = []
+        self._buffer = ""
+        self._lines: List[str] = []
+        self._pending: List[Tuple[int, Dict]] = []
+        self._current_type = 'general'
+        self._current_severity = 'major'  # Default to major
+        self._closed = False
+
+    @property
+    def text(self) -> str:
+        """Critique text received so far."""
+        return "".join(self._parts)
+
+    def feed(self, chunk: str) -> List[Dict]:
+        """
+        Consume the next chunk of the stream.
+
+        Args:
+            chunk: Text chunk from generate_critique
+
+        Returns:
+            Issues completed by this chunk (also appended to self.issues)
+        """
+        if self._closed:
+            raise ValueError("Cannot feed a closed IncrementalCritiqueParser")
+        if not chunk:
+            return []
+
+        self._parts.append(chunk)
+        self._buffer += chunk
+        if '\n' not in chunk:
+            return []
+
+        *complete, self._buffer = self._buffer.split('\n')
+        for line in complete:
+            self._add_line(line)
+
+        return self._emit_ready(final=False)
+
+    def _add_line(self, line: str):
+        """Process a complete line (one that is known to be followed by another)."""
+        severity_mask, type_mask = _line_masks(line.lower())
+        self._current_type, self._current_severity = _advance_state(
+            severity_mask, type_mask, self._current_type, self._current_severity
+        )
+
+        issue = _start_issue(line, self._current_type, self._current_severity)
+        if issue is not None:
+            self._pending.append((len(self._lines), issue))
+        self._lines.append(line)
+
+    def _emit_ready(self, final: bool) -> List[Dict]:
+        emitted = []
+        while self._pending:
+            line_index, issue = self._pending[0]
+            following = self._lines[line_index + 1:line_index + 1 + SUGGESTION_LINES]
+            if not final and len(following) < SUGGESTION_LINES:
+                break
+            self._pending.pop(0)
+            emitted.append(_finish_issue(issue, following))
+
+        self.issues.extend(emitted)
+        return emitted
+
+    def close(self) -> Dict[str, List[Dict]]:
+        """
+        Finish the stream.
+
+        Returns:
+            {'issues': [...], 'rewrites': [...], 'section_summaries': [...]}
+        """
+        if not self._closed:
+            self._closed = True
+            # The trailing partial line can complete suggestions but never
+            # starts an issue (nothing follows it)
+            self._lines.append(self._buffer)
+            self._emit_ready(final=True)
+            if not self.issues:
+                self.issues.extend(_fallback_issues(self.text))
+
+        doc = CritiqueDocument(self.text)
+        return {
+            'issues': list(self.issues),
+            'rewrites': parse_rewrites(doc),
+            'section_summaries': parse_sections(doc)
+        }
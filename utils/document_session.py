@@ -0,0 +1,93 @@
+"""
+Per-document state shared by the process, retrieve and annotate steps.
+
+A DocumentSession keeps the parsed PyMuPDF document, the per-page block and
+word geometry captured during extraction, and the TextIndex built from it,
+so annotation never extracts page text a second time. It is registered as
+an IndexManager extra and closed when the entry is evicted.
+"""
+
+import threading
+from typing import Dict, List, Tuple
+
+import fitz  # PyMuPDF
+
+from utils.text_index import TextIndex
+
+
+class DocumentSession:
+    """
+    Parsed document plus extraction artifacts for one uploaded PDF.
+
+    Feed it every page dictionary from iter_pages(..., include_words=True)
+    in page order (ingest_pdf does this when given a session), then hand it
+    to create_annotated_pdf. Call close() when done; IndexManager does this
+    on eviction.
+    """
+
+    def __init__(self, pdf_bytes: bytes):
+        self.pdf_bytes = pdf_bytes
+        self.doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+        self.page_count = self.doc.page_count
+        self.text_index = TextIndex()
+        self._blocks: Dict[int, List[Dict]] = {}
+        self._words: Dict[int, List[Tuple]] = {}
+        self._lock = threading.Lock()
+        self.closed = False
+
+    def add_page(self, page_data: Dict):
+        """
+        Record one extracted page.
+
+        Takes the page's 'words' out of page_data (they live here instead of
+        in the document data) and indexes them. Pages without words are
+        extracted from the held document.
+
+        Args:
+            page_data: Page dictionary from iter_pages
+        """
+        page_num = page_data['page_num'] - 1
+        words = page_data.pop('words', None)
+
+        with self._lock:
+            if words is None:
+                words = self.doc[page_num].get_text("words")
+            self._blocks[page_num] = page_data['blocks']
+            self._words[page_num] = words
+            self.text_index.add_page(page_num, words)
+
+    def blocks(self, page_num: int) -> List[Dict]:
+        """Text blocks ({'bbox', 'text'}) of a 0-indexed page."""
+        return self._blocks.get(page_num, [])
+
+    def words(self, page_num: int) -> List[Tuple]:
+        """PyMuPDF word tuples of a 0-indexed page."""
+        return self._words.get(page_num, [])
+
+    def page_rect(self, page_num: int) -> fitz.Rect:
+        """Page rectangle of a 0-indexed page, read from the held document."""
+        with self._lock:
+            return self.doc[page_num].rect
+
+    def working_copy(self) -> fitz.Document:
+        """
+        Open a document to annotate.
+
+        Annotations must not accumulate on the shared parsed document, so
+        each annotation run gets its own handle. Opening only reads the
+        cross-reference table; all text lookups go through the session.
+        """
+        if self.closed:
+            raise ValueError("DocumentSession is closed")
+        return fitz.open(stream=self.pdf_bytes, filetype="pdf")
+
+    def close(self):
+        """Close the parsed document and drop cached geometry."""
+        with self._lock:
+            if self.closed:
+                return
+            self.closed = True
+            self.doc.close()
+            self._blocks = {}
+            self._words = {}
+            self.text_index = TextIndex()
@@ -0,0 +1,127 @@
+"""
+CPU inference backends for the sentence-transformers embedding model.
+
+The servers have no GPU, so besides full-precision PyTorch the model can
+run as:
+
+- 'torch-int8': PyTorch with int8 dynamic quantization of the Linear layers
+- 'onnx':       ONNX Runtime, exported once from the local model files
+- 'onnx-int8':  ONNX Runtime with an int8 dynamically quantized export
+
+ONNX exports are written to a local directory on first use and reused
+afterwards. ONNX backends need the optional `optimum` and `onnxruntime`
+packages (pip install "sentence-transformers[onnx]").
+
+Quantized backends produce slightly different vectors, so each backend
+gets its own embedding cache namespace (see embedding_model_id).
+"""
+
+import os
+import platform
+from typing import TYPE_CHECKING, Optional, Tuple
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+EMBEDDING_BACKENDS = ("torch", "torch-int8", "onnx", "onnx-int8")
+DEFAULT_EMBEDDING_BACKEND = "torch"
+
+DEFAULT_EXPORT_DIR = os.path.join(
+    os.path.expanduser("~"), ".cache", "thesis_panelist", "models"
+)
+
+ONNX_FILE_NAME = "onnx/model.onnx"
+
+
+def onnx_quantization_config() -> str:
+    """Dynamic quantization preset for this CPU ('arm64' or the portable x86 'avx2')."""
+    return "arm64" if platform.machine().lower() in ("arm64", "aarch64") else "avx2"
+
+
+def embedding_model_id(model_name: str, backend: str = DEFAULT_EMBEDDING_BACKEND) -> str:
+    """
+    Identifier for embedding cache keys.
+
+    The default backend keeps the plain model name, so existing cache
+    entries stay valid.
+    """
+    if backend == DEFAULT_EMBEDDING_BACKEND:
+        return model_name
+    return f"{model_name}#{backend}"
+
+
+def export_onnx_model(
+    model_name: str,
+    export_dir: str = DEFAULT_EXPORT_DIR,
+    quantize: bool = False
+) -> Tuple[str, str]:
+    """
+    Export a model to ONNX (and optionally int8) once, reusing earlier exports.
+
+    The export is built from the locally cached model files (downloaded on
+    first use like the PyTorch model), not from prebuilt ONNX files.
+
+    Args:
+        model_name: sentence-transformers model name or local path
+        export_dir: Directory that holds the exports
+        quantize: Also write an int8 dynamically quantized model
+
+    Returns:
+        (model directory, ONNX file name relative to it)
+    """
+    from sentence_transformers import SentenceTransformer
+
+    target = os.path.join(export_dir, model_name.replace("/", "--") + "-onnx")
+    if not os.path.exists(os.path.join(target, ONNX_FILE_NAME)):
+        model = SentenceTransformer(model_name, device="cpu", backend="onnx", model_kwargs={'export': True})
+        model.save_pretrained(target)
+
+    if not quantize:
+        return target, ONNX_FILE_NAME
+
+    config = onnx_quantization_config()
+    file_name = f"onnx/model_qint8_{config}.onnx"
+    if not os.path.exists(os.path.join(target, file_name)):
+        from sentence_transformers import export_dynamic_quantized_onnx_model
+
+        model = SentenceTransformer(target, device="cpu", backend="onnx", model_kwargs={'file_name': ONNX_FILE_NAME})
+        export_dynamic_quantized_onnx_model(model, config, target)
+    return target, file_name
+
+
+def load_model(
+    model_name: str,
+    backend: str = DEFAULT_EMBEDDING_BACKEND,
+    export_dir: Optional[str] = None
+) -> "SentenceTransformer":
+    """
+    Load the embedding model for CPU inference with the given backend.
+
+    Args:
+        model_name: sentence-transformers model name or local path
+        backend: One of EMBEDDING_BACKENDS
+        export_dir: Where ONNX exports are kept (default: DEFAULT_EXPORT_DIR)
+
+    Returns:
+        SentenceTransformer model (same encode() API for every backend)
+
+    Raises:
+        ValueError: If the backend is unknown
+    """
+    if backend not in EMBEDDING_BACKENDS:
+        raise ValueError(f"Unknown embedding backend '{backend}' (expected one of {', '.join(EMBEDDING_BACKENDS)})")
+
+    from sentence_transformers import SentenceTransformer
+
+    if backend in ("onnx", "onnx-int8"):
+        path, file_name = export_onnx_model(model_name, export_dir or DEFAULT_EXPORT_DIR, quantize=backend == "onnx-int8")
+        return SentenceTransformer(path, device="cpu", backend="onnx", model_kwargs={'file_name': file_name})
+
+    model = SentenceTransformer(model_name, device="cpu")
+    if backend == "torch-int8":
+        import torch
+
+        # Replaces every nn.Linear (the bulk of MiniLM's compute) with an int8 version
+        torch.quantization.quantize_dynamic(model, {torch.nn.Linear}, dtype=torch.qint8, inplace=True)
+    return model
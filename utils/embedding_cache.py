@@ -0,0 +1,190 @@
+"""
+Persistent on-disk cache for chunk embeddings.
+
+Vectors are keyed by a hash of (model name, normalized chunk text), so only
+hashes and float32 vectors are written to disk - never the thesis text itself.
+"""
+
+import hashlib
+import os
+import sqlite3
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+DEFAULT_CACHE_PATH = os.path.join(
+    os.path.expanduser("~"), ".cache", "thesis_panelist", "embeddings.sqlite3"
+)
+DEFAULT_MAX_ENTRIES = 200_000
+
+
+def normalize_chunk_text(text: str) -> str:
+    """Collapse whitespace so re-extracted text hashes the same."""
+    return " ".join(text.split())
+
+
+def chunk_cache_key(model_name: str, text: str) -> str:
+    """
+    Build the content-addressed cache key for a chunk.
+
+    Args:
+        model_name: Embedding model identifier
+        text: Raw chunk text
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = f"{model_name}\x00{normalize_chunk_text(text)}".encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class EmbeddingCache:
+    """
+    SQLite-backed embedding cache with size-bounded LRU eviction.
+
+    Safe to share between Streamlit sessions (one connection guarded by a lock).
+    """
+
+    def __init__(self, path: str = DEFAULT_CACHE_PATH, max_entries: int = DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._clock = 0
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS embeddings (
+                key TEXT PRIMARY KEY,
+                dim INTEGER NOT NULL,
+                vector BLOB NOT NULL,
+                last_used INTEGER NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS idx_embeddings_last_used ON embeddings(last_used)"
+        )
+        self._conn.commit()
+
+        row = self._conn.execute("SELECT MAX(last_used) FROM embeddings").fetchone()
+        self._clock = row[0] or 0
+
+    def _tick(self) -> int:
+        self._clock += 1
+        return self._clock
+
+    def get_many(self, model_name: str, texts: List[str]) -> List[Optional[np.ndarray]]:
+        """
+        Look up cached vectors for a list of texts.
+
+        Args:
+            model_name: Embedding model identifier
+            texts: Chunk texts
+
+        Returns:
+            List aligned with texts; None where the vector is not cached
+        """
+        keys = [chunk_cache_key(model_name, text) for text in texts]
+        found: Dict[str, np.ndarray] = {}
+
+        with self._lock:
+            unique_keys = list(dict.fromkeys(keys))
+            # Stay well under SQLite's bound-parameter limit
+            for start in range(0, len(unique_keys), 500):
+                batch = unique_keys[start:start + 500]
+                placeholders = ",".join("?" * len(batch))
+                rows = self._conn.execute(
+                    f"SELECT key, dim, vector FROM embeddings WHERE key IN ({placeholders})",
+                    batch
+                ).fetchall()
+                for key, dim, blob in rows:
+                    found[key] = np.frombuffer(blob, dtype=np.float32, count=dim)
+
+            if found:
+                stamp = self._tick()
+                self._conn.executemany(
+                    "UPDATE embeddings SET last_used = ? WHERE key = ?",
+                    [(stamp, key) for key in found]
+                )
+                self._conn.commit()
+
+            results = [found.get(key) for key in keys]
+            hit_count = sum(1 for vector in results if vector is not None)
+            self.hits += hit_count
+            self.misses += len(results) - hit_count
+
+        return results
+
+    def put_many(self, model_name: str, texts: List[str], embeddings: np.ndarray):
+        """
+        Store vectors for texts, evicting least recently used entries if needed.
+
+        Args:
+            model_name: Embedding model identifier
+            texts: Chunk texts
+            embeddings: Array of shape (len(texts), dim)
+        """
+        if len(texts) == 0:
+            return
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+
+        with self._lock:
+            stamp = self._tick()
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO embeddings (key, dim, vector, last_used) VALUES (?, ?, ?, ?)",
+                [
+                    (chunk_cache_key(model_name, text), vector.shape[0], vector.tobytes(), stamp)
+                    for text, vector in zip(texts, vectors)
+                ]
+            )
+            self._evict()
+            self._conn.commit()
+
+    def _evict(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        overflow = count - self.max_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM embeddings WHERE key IN "
+                "(SELECT key FROM embeddings ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self) -> Dict:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            {'hits': int, 'misses': int, 'hit_rate': float, 'entries': int}
+        """
+        with self._lock:
+            entries = self._conn.execute("SELECT COUNT(*) FROM embeddings").fetchone()[0]
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'entries': entries
+        }
+
+    def clear(self):
+        """Remove all cached vectors and reset counters."""
+        with self._lock:
+            self._conn.execute("DELETE FROM embeddings")
+            self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+
+    def close(self):
+        """Close the underlying database connection."""
+        with self._lock:
+            self._conn.close()
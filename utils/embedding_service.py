@@ -0,0 +1,363 @@
+"""
+Cross-session micro-batching for the shared embedding model.
+
+Every Streamlit session (and every background job) encodes with the same
+process-wide model. Called independently, their encode calls run in
+parallel threads that fight over the same cores and each pay the per-call
+overhead. EmbeddingService puts one worker thread in front of the model:
+callers queue encode requests and get futures back, and the worker merges
+whatever arrives within a short window into one micro-batch, encodes it in
+length buckets (see utils.encoding_scheduler) and splits the result.
+
+Requests are cut into length-bucketed parts of at most the padded-token
+budget of encoding_scheduler, one forward pass each, so document batches
+keep their full-size buckets. Parts within a much smaller token cap
+(retrieval queries) go to a query lane and are merged with each other;
+larger parts go to a document lane and run alone. Query micro-batches are
+served first, so a query waits for at most one document pass, but only a
+bounded number in a row while document parts wait, so steady query
+traffic cannot starve a document. The service is the only scheduler: callers submit a whole document batch at once and must
+not bucket it themselves. Encode throughput is recorded by the worker,
+around the model calls only (queue waits are reported separately by
+stats()).
+
+The service has the model's encode() signature, so it can be passed
+wherever a SentenceTransformer is expected.
+"""
+
+import threading
+import time
+from collections import deque
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Sequence, Union
+
+import numpy as np
+
+from utils.encoding_scheduler import (
+    DEFAULT_TOKEN_BUDGET, EncodingStats, encode_bucketed, plan_batches, token_lengths
+)
+
+
+# Texts per micro-batch at most
+DEFAULT_MAX_BATCH_SIZE = 256
+
+# Estimated tokens up to which parts are merged into one micro-batch; a
+# part over the cap (a document bucket) runs alone. 512 tokens keeps a
+# merged batch of queries about as fast as a direct encode call
+DEFAULT_MAX_BATCH_TOKENS = 512
+
+# Query micro-batches served in a row while a document part waits
+DEFAULT_MAX_QUERY_STREAK = 4
+
+# How long the worker waits for more requests after the first one arrives
+DEFAULT_MAX_WAIT_MS = 5.0
+
+# Upper bounds of the batch size histogram buckets (texts per micro-batch)
+BATCH_SIZE_BUCKETS = (1, 4, 16, 64, 256)
+
+# Recent queue waits kept for percentiles
+WAIT_SAMPLES = 2000
+
+
+class _Job:
+    """One submit() call: its future and the embeddings assembled so far."""
+
+    __slots__ = ("future", "size", "remaining", "embeddings", "started", "stats")
+
+    def __init__(self, size: int, parts: int, stats: Optional[EncodingStats] = None):
+        self.future = Future()
+        self.size = size
+        self.remaining = parts
+        self.embeddings = None
+        self.started = False
+        self.stats = stats
+
+
+class _Part:
+    """Slice of a job that fits in one micro-batch."""
+
+    __slots__ = ("job", "indices", "texts", "tokens", "submitted")
+
+    def __init__(self, job: _Job, indices: List[int], texts: List[str], tokens: int):
+        self.job = job
+        self.indices = indices
+        self.texts = texts
+        self.tokens = tokens
+        self.submitted = time.perf_counter()
+
+
+def _histogram_label(size: int) -> str:
+    lower = 1
+    for upper in BATCH_SIZE_BUCKETS:
+        if size <= upper:
+            return str(upper) if lower == upper else f"{lower}-{upper}"
+        lower = upper + 1
+    return f">{BATCH_SIZE_BUCKETS[-1]}"
+
+
+def _percentile(values: Sequence[float], fraction: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+class EmbeddingService:
+    """
+    Request queue that merges concurrent encode calls into micro-batches.
+
+    Thread-safe. Attributes other than encode() (tokenizer, max_seq_length,
+    get_sentence_embedding_dimension, ...) are read from the wrapped model.
+
+    Args:
+        model: SentenceTransformer model (any backend)
+        max_batch_size: Texts per micro-batch at most
+        max_batch_tokens: Estimated tokens up to which parts are merged
+            (parts within it use the query lane)
+        token_budget: Padded tokens per part of a request (one forward
+            pass, as in encode_bucketed)
+        max_query_streak: Query micro-batches served in a row while
+            document parts wait
+        max_wait_ms: Latency window for collecting concurrent requests
+        encoding_stats: Optional EncodingStats receiving every micro-batch
+            (e.g. the process-wide totals)
+    """
+
+    def __init__(
+        self,
+        model,
+        max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        token_budget: int = DEFAULT_TOKEN_BUDGET,
+        max_query_streak: int = DEFAULT_MAX_QUERY_STREAK,
+        max_wait_ms: float = DEFAULT_MAX_WAIT_MS,
+        encoding_stats: Optional[EncodingStats] = None
+    ):
+        self.model = model
+        self.encoding_stats = encoding_stats
+        self.max_batch_size = max(1, max_batch_size)
+        self.max_batch_tokens = max(1, max_batch_tokens)
+        self.token_budget = max(1, token_budget)
+        self.max_query_streak = max(1, max_query_streak)
+        self.max_wait = max(0.0, max_wait_ms) / 1000
+
+        # FIFO lanes of queued parts, guarded by _lock
+        self._queries = deque()
+        self._documents = deque()
+        self._query_streak = 0
+        self._closed = False
+        self._lock = threading.Lock()
+        self._ready = threading.Condition(self._lock)
+        self._started = time.perf_counter()
+        self._requests = 0
+        self._parts = 0
+        self._texts = 0
+        self._batches = 0
+        self._busy_seconds = 0.0
+        self._wait_total = 0.0
+        self._waits = deque(maxlen=WAIT_SAMPLES)
+        self._histogram = {_histogram_label(upper): 0 for upper in BATCH_SIZE_BUCKETS}
+        self._histogram[_histogram_label(BATCH_SIZE_BUCKETS[-1] + 1)] = 0
+
+        self._worker = threading.Thread(target=self._run, name="embedding-service", daemon=True)
+        self._worker.start()
+
+    def __getattr__(self, name: str):
+        # Only called for attributes not found on the service itself
+        if name == "model":
+            raise AttributeError(name)
+        return getattr(self.model, name)
+
+    def submit(self, texts: Sequence[str], stats: Optional[EncodingStats] = None) -> Future:
+        """
+        Queue texts for encoding.
+
+        Args:
+            texts: Texts to encode
+            stats: Optional EncodingStats receiving this request's share of
+                each micro-batch it runs in (texts, tokens and encode time
+                in proportion to its tokens). It should not feed the
+                service's encoding_stats, which already count the whole
+                micro-batch.
+
+        Returns:
+            Future resolving to a float32 array of shape (len(texts), dim)
+
+        Raises:
+            RuntimeError: If the service is closed
+        """
+        texts = list(texts)
+        lengths = token_lengths(texts, max_length=getattr(self.model, 'max_seq_length', None))
+        groups = plan_batches(lengths, self.token_budget, self.max_batch_size)
+        job = _Job(len(texts), len(groups), stats)
+        if not texts:
+            job.future.set_result(np.zeros((0, self.model.get_sentence_embedding_dimension()), dtype=np.float32))
+            return job.future
+
+        with self._lock:
+            if self._closed:
+                raise RuntimeError("EmbeddingService is closed")
+            for indices in groups:
+                part = _Part(job, indices, [texts[i] for i in indices], sum(lengths[i] for i in indices))
+                (self._queries if part.tokens <= self.max_batch_tokens else self._documents).append(part)
+            self._ready.notify()
+        return job.future
+
+    def encode(self, sentences: Union[str, Sequence[str]], batch_size: Optional[int] = None,
+               show_progress_bar: Optional[bool] = None, **kwargs) -> np.ndarray:
+        """
+        Blocking encode with the SentenceTransformer.encode signature.
+
+        batch_size and show_progress_bar are ignored (the service sizes its
+        own batches). Calls with other options (e.g. normalize_embeddings)
+        change the output, so they go straight to the model.
+
+        Returns:
+            Embeddings as float32; 1-D for a single string
+        """
+        if kwargs:
+            return self.model.encode(sentences, **kwargs)
+
+        single = isinstance(sentences, str)
+        embeddings = self.submit([sentences] if single else sentences).result()
+        return embeddings[0] if single else embeddings
+
+    def _next_batch(self) -> Optional[List[_Part]]:
+        """Wait for work and take the next micro-batch; None once closed and drained."""
+        with self._ready:
+            while not self._queries and not self._documents:
+                if self._closed:
+                    return None
+                self._ready.wait()
+
+            if self._documents and (not self._queries or self._query_streak >= self.max_query_streak):
+                self._query_streak = 0
+                return [self._documents.popleft()]
+            self._query_streak = self._query_streak + 1 if self._documents else 0
+
+            # Merge query parts arriving within the wait window, up to the batch limits
+            batch = [self._queries.popleft()]
+            size = len(batch[0].texts)
+            tokens = batch[0].tokens
+            deadline = time.perf_counter() + self.max_wait
+            while size < self.max_batch_size and tokens < self.max_batch_tokens:
+                if not self._queries:
+                    remaining = deadline - time.perf_counter()
+                    if remaining <= 0 or self._closed:
+                        break
+                    self._ready.wait(remaining)
+                    continue
+                part = self._queries[0]
+                if size + len(part.texts) > self.max_batch_size or tokens + part.tokens > self.max_batch_tokens:
+                    break  # Next micro-batch
+                batch.append(self._queries.popleft())
+                size += len(part.texts)
+                tokens += part.tokens
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._next_batch()
+            if batch is None:
+                break
+            self._encode_batch(batch)
+
+    def _encode_batch(self, batch: List[_Part]):
+        started = time.perf_counter()
+        runnable = []
+        for part in batch:
+            job = part.job
+            if not job.started:
+                job.started = True
+                if not job.future.set_running_or_notify_cancel():
+                    continue
+            if not job.future.done():
+                runnable.append(part)
+        if not runnable:
+            return
+
+        texts = [text for part in runnable for text in part.texts]
+        lengths = token_lengths(texts, getattr(self.model, 'tokenizer', None),
+                                getattr(self.model, 'max_seq_length', None))
+        batch_stats = EncodingStats(parent=self.encoding_stats)
+        try:
+            embeddings = encode_bucketed(self.model, texts, self.token_budget, self.max_batch_size,
+                                         stats=batch_stats, lengths=lengths)
+        except Exception as e:
+            for part in runnable:
+                if not part.job.future.done():
+                    part.job.future.set_exception(e)
+            return
+        finished = time.perf_counter()
+
+        totals = batch_stats.snapshot()
+        offset = 0
+        completed = 0
+        for part in runnable:
+            job = part.job
+            if job.embeddings is None:
+                job.embeddings = np.empty((job.size, embeddings.shape[1]), dtype=np.float32)
+            job.embeddings[part.indices] = embeddings[offset:offset + len(part.texts)]
+            if job.stats is not None:
+                tokens = sum(lengths[offset:offset + len(part.texts)])
+                share = tokens / totals['tokens'] if totals['tokens'] else len(part.texts) / len(texts)
+                job.stats.record(len(part.texts), tokens, round(totals['padded_tokens'] * share),
+                                 totals['batches'], totals['seconds'] * share)
+            offset += len(part.texts)
+            job.remaining -= 1
+            if job.remaining == 0:
+                job.future.set_result(job.embeddings)
+                completed += 1
+
+        waits = [started - part.submitted for part in runnable]
+        with self._lock:
+            self._requests += completed
+            self._parts += len(runnable)
+            self._texts += len(texts)
+            self._batches += 1
+            self._busy_seconds += finished - started
+            self._wait_total += sum(waits)
+            self._waits.extend(waits)
+            self._histogram[_histogram_label(len(texts))] += 1
+
+    def stats(self) -> Dict:
+        """
+        Service counters since start.
+
+        Returns:
+            {'requests' (completed), 'parts', 'texts', 'batches', 'queued',
+             'mean_batch_size', 'mean_requests_per_batch' (parts per batch),
+             'wait_ms': {'mean', 'p50', 'p95', 'max'} (per part),
+             'texts_per_second' (while encoding), 'busy_fraction',
+             'batch_sizes': {bucket label: micro-batches}}
+        """
+        with self._lock:
+            waits = list(self._waits)
+            elapsed = time.perf_counter() - self._started
+            return {
+                'requests': self._requests,
+                'parts': self._parts,
+                'texts': self._texts,
+                'batches': self._batches,
+                'queued': len(self._queries) + len(self._documents),
+                'mean_batch_size': self._texts / self._batches if self._batches else 0.0,
+                'mean_requests_per_batch': self._parts / self._batches if self._batches else 0.0,
+                'wait_ms': {
+                    'mean': 1000 * self._wait_total / self._parts if self._parts else 0.0,
+                    'p50': 1000 * _percentile(waits, 0.5),
+                    'p95': 1000 * _percentile(waits, 0.95),
+                    'max': 1000 * max(waits, default=0.0)
+                },
+                'texts_per_second': self._texts / self._busy_seconds if self._busy_seconds else 0.0,
+                'busy_fraction': self._busy_seconds / elapsed if elapsed else 0.0,
+                'batch_sizes': dict(self._histogram)
+            }
+
+    def close(self):
+        """Stop the worker after the queued requests; later submits raise RuntimeError."""
+        with self._lock:
+            if self._closed:
+                return
+            self._closed = True
+            self._ready.notify()
+        self._worker.join()
@@ -1,108 +1,450 @@
 ﻿"""
 Embedding generation and vector store management.
+
+sentence-transformers (and torch) take seconds to import, so they are only
+imported when the model is first needed; warm_up_embedding_model() does
+that on a background thread while the first page is served.
+
+Sessions share the model through an EmbeddingService, which merges their
+concurrent encode calls into micro-batches (see utils.embedding_service).
 """
 
+import logging
+import os
 import streamlit as st
-from sentence_transformers import SentenceTransformer
-import chromadb
-from typing import List, Dict
+from typing import TYPE_CHECKING, List, Dict, Iterable, Iterator, Optional, Tuple
+import threading
 import numpy as np
 
+from utils.embedding_cache import EmbeddingCache
+from utils.embedding_backends import DEFAULT_EMBEDDING_BACKEND, embedding_model_id, load_model
+from utils.embedding_service import EmbeddingService, DEFAULT_MAX_BATCH_TOKENS, DEFAULT_MAX_WAIT_MS
+from utils.encoding_scheduler import EncodingStats, encode_bucketed
+from utils.vector_index import create_vector_index, DEFAULT_COLLECTION_NAME
+from utils.index_manager import IndexManager
+from utils.prompts import MODE_QUERIES
+
+if TYPE_CHECKING:
+    from sentence_transformers import SentenceTransformer
+
+
+EMBEDDING_MODEL_NAME = 'sentence-transformers/all-MiniLM-L6-v2'
+
+# CPU inference backend ('torch', 'torch-int8', 'onnx' or 'onnx-int8'), set
+# with the EMBEDDING_BACKEND environment variable or root-level secret
+EMBEDDING_BACKEND = os.environ.get("EMBEDDING_BACKEND", DEFAULT_EMBEDDING_BACKEND)
+
+# Model identifier used in embedding cache keys (one namespace per backend)
+EMBEDDING_MODEL_ID = embedding_model_id(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND)
+
+# Process-wide encode throughput (tokens/s, padding), across all sessions
+ENCODING_STATS = EncodingStats()
+
+logger = logging.getLogger(__name__)
+
+_model = None
+_service = None
+_model_lock = threading.Lock()
+
+
+def _env_number(name: str, default, cast):
+    """
+    Read a numeric setting from the environment, falling back to the default.
+    
+    Args:
+        name: Environment variable (or root-level secret) name
+        default: Value used when the variable is unset or malformed
+        cast: int or float
+    
+    Returns:
+        Parsed value, or default with a logged warning if it does not parse
+    """
+    raw = os.environ.get(name)
+    if raw is None:
+        return default
+    try:
+        return cast(raw)
+    except ValueError:
+        logger.warning("Ignoring %s=%r (expected %s); using %s", name, raw, cast.__name__, default)
+        return default
+
+
+def get_embedding_model() -> "SentenceTransformer":
+    """
+    Return the process-wide embedding model, importing and loading it on first call.
+    
+    Thread-safe: a caller arriving while another thread (e.g. the warm-up)
+    is loading the model waits for that load instead of starting its own.
+    
+    Returns:
+        SentenceTransformer model
+    """
+    global _model
+    with _model_lock:
+        if _model is None:
+            _model = load_model(EMBEDDING_MODEL_NAME, EMBEDDING_BACKEND)
+        return _model
+
+
+def get_embedding_service() -> EmbeddingService:
+    """
+    Return the process-wide EmbeddingService around get_embedding_model().
+    
+    Micro-batching is tuned by the EMBEDDING_BATCH_WAIT_MS and
+    EMBEDDING_MAX_BATCH_TOKENS environment variables (or root-level secrets);
+    fewer tokens per micro-batch lowers query latency under document load.
+    
+    Returns:
+        EmbeddingService (usable wherever a SentenceTransformer is expected)
+    """
+    global _service
+    model = get_embedding_model()
+    with _model_lock:
+        if _service is None:
+            _service = EmbeddingService(
+                model,
+                max_batch_tokens=_env_number("EMBEDDING_MAX_BATCH_TOKENS", DEFAULT_MAX_BATCH_TOKENS, int),
+                max_wait_ms=_env_number("EMBEDDING_BATCH_WAIT_MS", DEFAULT_MAX_WAIT_MS, float),
+                encoding_stats=ENCODING_STATS
+            )
+        return _service
+
+
+def warm_up_embedding_model() -> threading.Thread:
+    """
+    Start loading the embedding model on a daemon thread.
+    
+    Returns:
+        The started thread
+    """
+    thread = threading.Thread(target=get_embedding_model, name="embedding-warmup", daemon=True)
+    thread.start()
+    return thread
+
 
 @st.cache_resource
 def load_embedding_model():
     """
-    Load sentence-transformers model.
+    Load sentence-transformers model behind the shared EmbeddingService.
     Cached to avoid reloading on every run.
     
     Returns:
-        SentenceTransformer model
+        EmbeddingService wrapping the SentenceTransformer model
+    """
+    return get_embedding_service()
+
+
+@st.cache_resource
+def load_embedding_cache():
+    """
+    Open the persistent embedding cache shared by all sessions.
+    
+    Returns:
+        EmbeddingCache instance
+    """
+    return EmbeddingCache()
+
+
+@st.cache_resource
+def load_index_manager():
+    """
+    Create the process-wide registry of per-session vector indexes.
+    
+    Returns:
+        IndexManager instance
     """
-    return SentenceTransformer('sentence-transformers/all-MiniLM-L6-v2')
+    return IndexManager()
 
 
-def generate_embeddings(chunks: List[Dict], model: SentenceTransformer) -> np.ndarray:
+def generate_embeddings(
+    chunks: List[Dict],
+    model: "SentenceTransformer",
+    cache: Optional[EmbeddingCache] = None,
+    model_name: str = EMBEDDING_MODEL_ID,
+    stats: Optional[EncodingStats] = None
+) -> np.ndarray:
     """
     Generate embeddings for text chunks.
     
+    Texts are encoded in length buckets (see utils.encoding_scheduler), so
+    short and long chunks are not padded to the same length. Through an
+    EmbeddingService, the texts go to the service as one request and its
+    worker does the bucketing.
+    
     Args:
         chunks: List of chunk dictionaries with 'text' field
-        model: SentenceTransformer model
+        model: SentenceTransformer model or EmbeddingService
+        cache: Optional embedding cache; only cache misses are encoded
+        model_name: Model identifier used in cache keys
+        stats: EncodingStats to record throughput into (default: ENCODING_STATS
+            for a plain model; a service already records into its own)
     
     Returns:
         Numpy array of embeddings
     """
     texts = [chunk['text'] for chunk in chunks]
-    embeddings = model.encode(texts, show_progress_bar=True)
-    return embeddings
+    
+    if cache is None:
+        return _encode_texts(model, texts, stats)
+    
+    cached = cache.get_many(model_name, texts)
+    miss_indices = [i for i, vector in enumerate(cached) if vector is None]
+    
+    if miss_indices:
+        miss_texts = [texts[i] for i in miss_indices]
+        fresh = _encode_texts(model, miss_texts, stats)
+        cache.put_many(model_name, miss_texts, fresh)
+        for i, vector in zip(miss_indices, fresh):
+            cached[i] = vector
+    
+    if not cached:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+    
+    return np.vstack(cached).astype(np.float32)
 
 
-def create_vector_store(chunks_with_metadata: List[Dict], embeddings: np.ndarray):
+def _encode_texts(model, texts: List[str], stats: Optional[EncodingStats]) -> np.ndarray:
+    """Encode document texts in length buckets, scheduled exactly once."""
+    if isinstance(model, EmbeddingService):
+        # The worker buckets the request and times only the model calls
+        return model.submit(texts, stats=stats).result()
+    return encode_bucketed(model, texts, stats=ENCODING_STATS if stats is None else stats)
+
+
+def iter_embedding_batches(
+    chunks: Iterable[Dict],
+    model: "SentenceTransformer",
+    batch_size: int = 64,
+    cache: Optional[EmbeddingCache] = None,
+    model_name: str = EMBEDDING_MODEL_ID,
+    stats: Optional[EncodingStats] = None
+) -> Iterator[Tuple[List[Dict], np.ndarray]]:
     """
-    Create in-memory ChromaDB collection.
+    Embed a chunk stream in fixed-size batches.
+    
+    Encoding starts as soon as the first batch of chunks is available,
+    so a streaming extractor and the encoder overlap.
+    
+    Args:
+        chunks: Iterable of chunk dictionaries (e.g. iter_chunks)
+        model: SentenceTransformer model
+        batch_size: Chunks per encode call
+        cache: Optional embedding cache
+        model_name: Model identifier used in cache keys
+        stats: Optional EncodingStats (see generate_embeddings)
+    
+    Yields:
+        Tuples of (batch_chunks, batch_embeddings)
+    """
+    batch = []
+    for chunk in chunks:
+        batch.append(chunk)
+        if len(batch) >= batch_size:
+            yield batch, generate_embeddings(batch, model, cache=cache, model_name=model_name, stats=stats)
+            batch = []
+    
+    if batch:
+        yield batch, generate_embeddings(batch, model, cache=cache, model_name=model_name, stats=stats)
+
+
+def init_vector_store(
+    backend: str = "auto",
+    expected_size: Optional[int] = None,
+    name: str = DEFAULT_COLLECTION_NAME
+):
+    """
+    Create an empty vector index.
+    
+    Args:
+        backend: 'numpy', 'chroma' or 'auto' (picked by expected corpus size)
+        expected_size: Expected number of chunks, used when backend='auto'
+        name: Collection name (see utils.index_manager.collection_name)
+    
+    Returns:
+        Vector index (see utils.vector_index)
+    """
+    return create_vector_index(backend=backend, expected_size=expected_size, name=name)
+
+
+def add_to_vector_store(index, chunks_with_metadata: List[Dict], embeddings: np.ndarray):
+    """
+    Insert a batch of chunks into an existing index.
+    
+    Args:
+        index: Vector index from init_vector_store
+        chunks_with_metadata: List of chunk dicts with metadata
+        embeddings: Numpy array of embeddings
+    """
+    index.add(chunks_with_metadata, embeddings)
+
+
+def create_vector_store(chunks_with_metadata: List[Dict], embeddings: np.ndarray, backend: str = "auto"):
+    """
+    Create a vector index populated with chunks.
     
     Args:
         chunks_with_metadata: List of chunk dicts with metadata
         embeddings: Numpy array of embeddings
+        backend: 'numpy', 'chroma' or 'auto'
     
     Returns:
-        ChromaDB collection object
+        Vector index (see utils.vector_index)
     """
-    # Create in-memory ChromaDB client (updated for ChromaDB 0.5+)
-    client = chromadb.Client()
+    index = init_vector_store(backend=backend, expected_size=len(chunks_with_metadata))
+    add_to_vector_store(index, chunks_with_metadata, embeddings)
+    return index
+
+
+class QueryEmbeddingCache:
+    """
+    Memoized query embeddings, e.g. the static review-mode queries.
     
-    # Create or get collection
-    collection_name = "thesis_chunks"
+    Thread-safe; shared across sessions via load_query_embedding_cache.
+    """
     
-    # Delete if exists (for clean state)
-    try:
-        client.delete_collection(collection_name)
-    except:
-        pass
-    
-    collection = client.create_collection(
-        name=collection_name,
-        metadata={"hnsw:space": "cosine"}
-    )
-    
-    # Prepare data for insertion
-    ids = [f"chunk_{chunk['chunk_id']}" for chunk in chunks_with_metadata]
-    documents = [chunk['text'] for chunk in chunks_with_metadata]
-    metadatas = [
-        {
-            'page_num': chunk['page_num'],
-            'chunk_id': chunk['chunk_id'],
-            'start_char': chunk.get('start_char', 0),
-            'end_char': chunk.get('end_char', 0)
-        }
-        for chunk in chunks_with_metadata
-    ]
-    
-    # Add to collection
-    collection.add(
-        ids=ids,
-        embeddings=embeddings.tolist(),
-        documents=documents,
-        metadatas=metadatas
-    )
-    
-    return collection
+    def __init__(self):
+        self._vectors: Dict[str, np.ndarray] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+    
+    def precompute(self, queries: Iterable[str], model: "SentenceTransformer"):
+        """Encode and store queries in one model.encode call."""
+        encode_queries(list(queries), model, query_cache=self)
+    
+    def get(self, query: str) -> Optional[np.ndarray]:
+        with self._lock:
+            vector = self._vectors.get(query)
+            if vector is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+            return vector
+    
+    def put(self, query: str, vector: np.ndarray):
+        with self._lock:
+            self._vectors[query] = vector
+    
+    def __len__(self) -> int:
+        return len(self._vectors)
+
+
+@st.cache_resource
+def load_query_embedding_cache():
+    """
+    Build the query embedding cache with all review-mode queries precomputed.
+    
+    Returns:
+        QueryEmbeddingCache instance
+    """
+    query_cache = QueryEmbeddingCache()
+    query_cache.precompute(MODE_QUERIES.values(), load_embedding_model())
+    return query_cache
+
+
+def encode_queries(
+    queries: List[str],
+    model: "SentenceTransformer",
+    query_cache: Optional[QueryEmbeddingCache] = None
+) -> np.ndarray:
+    """
+    Encode queries, reusing cached vectors and batching all misses.
+    
+    Args:
+        queries: Query strings
+        model: SentenceTransformer model
+        query_cache: Optional QueryEmbeddingCache
+    
+    Returns:
+        Array of shape (len(queries), dim)
+    """
+    if query_cache is None:
+        return np.asarray(model.encode(queries), dtype=np.float32)
+    
+    vectors = [query_cache.get(query) for query in queries]
+    missing = list(dict.fromkeys(q for q, vector in zip(queries, vectors) if vector is None))
+    
+    if missing:
+        fresh = np.asarray(model.encode(missing), dtype=np.float32)
+        encoded = dict(zip(missing, fresh))
+        for query, vector in encoded.items():
+            query_cache.put(query, vector)
+        vectors = [encoded[q] if vector is None else vector for q, vector in zip(queries, vectors)]
+    
+    return np.vstack(vectors) if vectors else np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+
+def retrieve_relevant_chunks_batch(
+    queries: List[str],
+    index,
+    model: "SentenceTransformer",
+    top_k: int = 5,
+    query_cache: Optional[QueryEmbeddingCache] = None
+) -> List[List[Dict]]:
+    """
+    Retrieve relevant chunks for several queries in one pass.
+    
+    All uncached queries are encoded in a single model.encode call and
+    searched against the index in one matrix operation.
+    
+    Args:
+        queries: Search queries
+        index: Vector index from create_vector_store / init_vector_store
+        model: SentenceTransformer model for query embedding
+        top_k: Number of chunks to retrieve per query
+        query_cache: Optional QueryEmbeddingCache
+    
+    Returns:
+        One list of relevant chunks per query (see retrieve_relevant_chunks)
+    """
+    if not queries:
+        return []
+    
+    query_embeddings = encode_queries(queries, model, query_cache=query_cache)
+    return index.search(query_embeddings, top_k=top_k)
+
+
+def retrieve_for_modes(
+    modes: List[str],
+    index,
+    model: "SentenceTransformer",
+    top_k: int = 5,
+    query_cache: Optional[QueryEmbeddingCache] = None
+) -> Dict[str, List[Dict]]:
+    """
+    Retrieve context for several review modes in a single retrieval pass.
+    
+    Args:
+        modes: Review mode names (keys of MODE_QUERIES)
+        index: Vector index
+        model: SentenceTransformer model
+        top_k: Number of chunks per mode
+        query_cache: Optional QueryEmbeddingCache
+    
+    Returns:
+        Dictionary mapping mode name to its relevant chunks
+    """
+    queries = [MODE_QUERIES.get(mode, MODE_QUERIES["Full Panelist Review"]) for mode in modes]
+    results = retrieve_relevant_chunks_batch(queries, index, model, top_k=top_k, query_cache=query_cache)
+    return dict(zip(modes, results))
 
 
 def retrieve_relevant_chunks(
     query: str,
-    collection,
-    model: SentenceTransformer,
-    top_k: int = 5
+    index,
+    model: "SentenceTransformer",
+    top_k: int = 5,
+    query_cache: Optional[QueryEmbeddingCache] = None
 ) -> List[Dict]:
     """
     Retrieve most relevant chunks for a query.
     
     Args:
         query: Search query
-        collection: ChromaDB collection
+        index: Vector index from create_vector_store / init_vector_store
         model: SentenceTransformer model for query embedding
         top_k: Number of chunks to retrieve
+        query_cache: Optional QueryEmbeddingCache (e.g. for mode queries)
     
     Returns:
         List of relevant chunks with metadata:
@@ -115,25 +457,4 @@ def retrieve_relevant_chunks(
             }
         ]
     """
-    # Generate query embedding
-    query_embedding = model.encode([query])[0]
-    
-    # Query collection
-    results = collection.query(
-        query_embeddings=[query_embedding.tolist()],
-        n_results=top_k
-    )
-    
-    # Format results
-    relevant_chunks = []
-    
-    if results['documents'] and len(results['documents']) > 0:
-        for i in range(len(results['documents'][0])):
-            relevant_chunks.append({
-                'text': results['documents'][0][i],
-                'page_num': results['metadatas'][0][i]['page_num'],
-                'distance': results['distances'][0][i] if 'distances' in results else 0.0,
-                'chunk_id': results['metadatas'][0][i]['chunk_id']
-            })
-    
-    return relevant_chunks
+    return retrieve_relevant_chunks_batch([query], index, model, top_k=top_k, query_cache=query_cache)[0]
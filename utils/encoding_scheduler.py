@@ -0,0 +1,178 @@
+"""
+Length-bucketed dynamic batching for embedding model encode calls.
+
+A batch is padded to its longest text, so mixing short heading or caption
+chunks with long paragraphs (or untruncated reference lists) wastes most of
+a forward pass on padding. The scheduler measures every text in model
+tokens, sorts longest first, and cuts batches by a padded-token budget:
+long texts go in small batches, short ones in large batches. Each batch is
+one model.encode call, and results are returned in the original order.
+"""
+
+import threading
+import time
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+
+# Padded tokens (batch size x longest text) per forward pass
+DEFAULT_TOKEN_BUDGET = 8192
+
+# Upper bound on texts per batch, however short they are
+DEFAULT_MAX_BATCH_SIZE = 256
+
+# Tokens per whitespace-separated word when no tokenizer is available
+WORD_TOKEN_RATIO = 1.3
+
+
+class EncodingStats:
+    """
+    Thread-safe counters for encode throughput.
+
+    tokens counts real (unpadded) tokens; padded_tokens counts what the
+    model actually processed.
+
+    Args:
+        parent: Optional EncodingStats that receives every record as well
+            (e.g. per-document stats feeding the process-wide totals)
+    """
+
+    def __init__(self, parent: Optional["EncodingStats"] = None):
+        self.parent = parent
+        self._lock = threading.Lock()
+        self.texts = 0
+        self.tokens = 0
+        self.padded_tokens = 0
+        self.batches = 0
+        self.seconds = 0.0
+
+    def record(self, texts: int, tokens: int, padded_tokens: int, batches: int, seconds: float):
+        with self._lock:
+            self.texts += texts
+            self.tokens += tokens
+            self.padded_tokens += padded_tokens
+            self.batches += batches
+            self.seconds += seconds
+        if self.parent is not None:
+            self.parent.record(texts, tokens, padded_tokens, batches, seconds)
+
+    def snapshot(self) -> Dict:
+        """
+        Current totals.
+
+        Returns:
+            {'texts', 'tokens', 'padded_tokens', 'batches', 'seconds',
+             'tokens_per_second', 'padding_ratio'} where padding_ratio is
+            padded / real tokens (1.0 means no padding)
+        """
+        with self._lock:
+            return {
+                'texts': self.texts,
+                'tokens': self.tokens,
+                'padded_tokens': self.padded_tokens,
+                'batches': self.batches,
+                'seconds': self.seconds,
+                'tokens_per_second': self.tokens / self.seconds if self.seconds else 0.0,
+                'padding_ratio': self.padded_tokens / self.tokens if self.tokens else 1.0
+            }
+
+
+def token_lengths(texts: Sequence[str], tokenizer=None, max_length: Optional[int] = None) -> List[int]:
+    """
+    Length of each text in model tokens, special tokens included.
+
+    Args:
+        texts: Texts to measure
+        tokenizer: Hugging Face tokenizer (e.g. model.tokenizer); without one,
+            lengths are estimated from word counts
+        max_length: Truncation length (e.g. model.max_seq_length)
+
+    Returns:
+        One length per text
+    """
+    if tokenizer is not None:
+        encoded = tokenizer(list(texts), add_special_tokens=True, truncation=max_length is not None,
+                            max_length=max_length)
+        lengths = [len(ids) for ids in encoded['input_ids']]
+    else:
+        lengths = [int(len(text.split()) * WORD_TOKEN_RATIO) + 2 for text in texts]
+        if max_length is not None:
+            lengths = [min(length, max_length) for length in lengths]
+    return lengths
+
+
+def plan_batches(
+    lengths: Sequence[int],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE
+) -> List[List[int]]:
+    """
+    Group text indices into batches that fit the padded-token budget.
+
+    Texts are taken longest first, so each batch is padded to its first
+    text's length and batch size is budget // that length.
+
+    Returns:
+        Batches of indices into lengths
+    """
+    order = sorted(range(len(lengths)), key=lambda i: -lengths[i])
+    batches = []
+    position = 0
+    while position < len(order):
+        longest = max(1, lengths[order[position]])
+        size = max(1, min(max_batch_size, token_budget // longest))
+        batches.append(order[position:position + size])
+        position += size
+    return batches
+
+
+def padded_tokens(lengths: Sequence[int], batches: List[List[int]]) -> int:
+    """Tokens processed when every batch is padded to its longest text."""
+    return sum(max(lengths[i] for i in batch) * len(batch) for batch in batches if batch)
+
+
+def encode_bucketed(
+    model,
+    texts: Sequence[str],
+    token_budget: int = DEFAULT_TOKEN_BUDGET,
+    max_batch_size: int = DEFAULT_MAX_BATCH_SIZE,
+    stats: Optional[EncodingStats] = None,
+    lengths: Optional[Sequence[int]] = None
+) -> np.ndarray:
+    """
+    Encode texts in length buckets and return embeddings in input order.
+
+    Args:
+        model: SentenceTransformer model (any backend)
+        texts: Texts to encode
+        token_budget: Padded tokens per batch
+        max_batch_size: Upper bound on texts per batch
+        stats: Optional EncodingStats to record into
+        lengths: Token lengths of texts, if the caller already measured them
+
+    Returns:
+        float32 array of shape (len(texts), dim)
+    """
+    if not texts:
+        return np.zeros((0, model.get_sentence_embedding_dimension()), dtype=np.float32)
+
+    if lengths is None:
+        lengths = token_lengths(texts, getattr(model, 'tokenizer', None), getattr(model, 'max_seq_length', None))
+    batches = plan_batches(lengths, token_budget, max_batch_size)
+
+    start = time.perf_counter()
+    embeddings = None
+    for batch in batches:
+        vectors = np.asarray(
+            model.encode([texts[i] for i in batch], batch_size=len(batch), show_progress_bar=False),
+            dtype=np.float32
+        )
+        if embeddings is None:
+            embeddings = np.empty((len(texts), vectors.shape[1]), dtype=np.float32)
+        embeddings[batch] = vectors
+
+    if stats is not None:
+        stats.record(len(texts), sum(lengths), padded_tokens(lengths, batches), len(batches),
+                     time.perf_counter() - start)
+    return embeddings
@@ -0,0 +1,248 @@
+"""
+Per-session vector index registry for a multi-user Streamlit server.
+
+Every session/document pair gets its own namespaced index, so concurrent
+uploads never share (or delete) each other's collections. Entries are
+reference counted, evicted after an idle TTL, and kept under a total
+memory budget. The budget only ever evicts unreferenced entries; an index
+that would not fit next to the ones in use is rejected instead.
+"""
+
+import hashlib
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+from utils.vector_index import create_vector_index
+
+
+DEFAULT_TTL_SECONDS = 30 * 60
+# Streamlit has no session-end hook, so referenced entries are also evicted
+# once they have been idle this long (the browser tab was most likely closed)
+DEFAULT_ABANDONED_TTL_SECONDS = 6 * 60 * 60
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
+
+
+class IndexBudgetExceeded(Exception):
+    """Raised when a new index does not fit the memory budget next to the indexes in use."""
+
+
+def document_hash(pdf_bytes: bytes) -> str:
+    """
+    Content hash identifying an uploaded document.
+
+    Args:
+        pdf_bytes: PDF file as bytes
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    return hashlib.sha256(pdf_bytes).hexdigest()
+
+
+def collection_name(session_id: str, doc_hash: str) -> str:
+    """
+    Namespaced collection name for a session/document pair.
+
+    Stays within Chroma's 3-63 character [a-zA-Z0-9_-] naming rules.
+    """
+    return f"thesis_{session_id[:16]}_{doc_hash[:16]}"
+
+
+class IndexManager:
+    """
+    Thread-safe registry of vector indexes keyed by (session_id, doc_hash).
+
+    Besides the index, an entry can hold extra per-document objects (chunks,
+    extracted data, ...). Extras with a close() method are closed on eviction.
+    """
+
+    def __init__(
+        self,
+        ttl_seconds: float = DEFAULT_TTL_SECONDS,
+        abandoned_ttl_seconds: float = DEFAULT_ABANDONED_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        self.ttl_seconds = ttl_seconds
+        self.abandoned_ttl_seconds = abandoned_ttl_seconds
+        self.max_bytes = max_bytes
+        self._entries: Dict[Tuple[str, str], Dict] = {}
+        self._lock = threading.Lock()
+        self.evictions = 0
+
+    def create_index(self, session_id: str, doc_hash: str, backend: str = "auto", expected_size: Optional[int] = None):
+        """
+        Create a fresh, namespaced (not yet registered) index.
+
+        Args:
+            session_id: Streamlit session identifier
+            doc_hash: Document hash from document_hash()
+            backend: Index backend ('auto', 'numpy' or 'chroma')
+            expected_size: Expected number of chunks
+
+        Returns:
+            Vector index
+        """
+        return create_vector_index(
+            backend=backend,
+            expected_size=expected_size,
+            name=collection_name(session_id, doc_hash)
+        )
+
+    def register(self, session_id: str, doc_hash: str, index, extras: Optional[Dict] = None):
+        """
+        Add an index for a session/document pair holding one reference.
+
+        Replaces (and closes) any existing entry for the same key, then
+        enforces the memory budget by evicting unreferenced entries.
+
+        Raises:
+            IndexBudgetExceeded: If the index does not fit even after every
+                unreferenced entry is evicted; nothing is registered or
+                evicted, and closing the index is left to the caller
+        """
+        key = (session_id, doc_hash)
+        now = time.monotonic()
+        nbytes = index.nbytes()
+
+        with self._lock:
+            evicted_keys = self._keys_to_evict(protect=key, incoming=nbytes)
+            if evicted_keys is None:
+                in_use = sum(entry['nbytes'] for other, entry in self._entries.items()
+                             if other != key and entry['refcount'] > 0)
+                raise IndexBudgetExceeded(
+                    f"The server's index memory is in use by other documents "
+                    f"({(in_use + nbytes) / (1024 * 1024):.0f}MB > {self.max_bytes / (1024 * 1024):.0f}MB); "
+                    f"try again when other reviews have finished."
+                )
+
+            previous = self._entries.pop(key, None)
+            evicted = [previous] if previous else []
+            evicted += [self._entries.pop(other) for other in evicted_keys]
+            self._entries[key] = {
+                'index': index,
+                'extras': extras or {},
+                'refcount': 1,
+                'last_used': now,
+                'nbytes': nbytes
+            }
+
+        self._close_entries(evicted)
+
+    def acquire(self, session_id: str, doc_hash: str) -> Optional[Dict]:
+        """
+        Take a reference to an existing entry.
+
+        Returns:
+            {'index': ..., 'extras': {...}} or None if not registered
+        """
+        with self._lock:
+            entry = self._entries.get((session_id, doc_hash))
+            if entry is None:
+                return None
+            entry['refcount'] += 1
+            entry['last_used'] = time.monotonic()
+            return {'index': entry['index'], 'extras': entry['extras']}
+
+    def get(self, session_id: str, doc_hash: str) -> Optional[Dict]:
+        """
+        Look up an entry without changing its reference count.
+
+        Refreshes the idle timer. Returns None if the entry was evicted.
+        """
+        with self._lock:
+            entry = self._entries.get((session_id, doc_hash))
+            if entry is None:
+                return None
+            entry['last_used'] = time.monotonic()
+            return {'index': entry['index'], 'extras': entry['extras']}
+
+    def release(self, session_id: str, doc_hash: str):
+        """Drop one reference; the entry stays cached until its TTL expires."""
+        with self._lock:
+            entry = self._entries.get((session_id, doc_hash))
+            if entry is not None:
+                entry['refcount'] = max(0, entry['refcount'] - 1)
+                entry['last_used'] = time.monotonic()
+
+    def evict_idle(self, now: Optional[float] = None) -> List[Tuple[str, str]]:
+        """
+        Evict unreferenced entries idle longer than the TTL, and referenced
+        entries idle longer than the abandoned-session TTL.
+
+        Returns:
+            Keys of evicted entries
+        """
+        now = time.monotonic() if now is None else now
+        evicted = []
+
+        with self._lock:
+            for key, entry in list(self._entries.items()):
+                idle = now - entry['last_used']
+                limit = self.ttl_seconds if entry['refcount'] == 0 else self.abandoned_ttl_seconds
+                if idle > limit:
+                    evicted.append((key, self._entries.pop(key)))
+
+        self._close_entries([entry for key, entry in evicted])
+        return [key for key, entry in evicted]
+
+    def _keys_to_evict(self, protect: Tuple[str, str], incoming: int) -> Optional[List[Tuple[str, str]]]:
+        """
+        Least recently used unreferenced entries to evict so `incoming` bytes
+        fit in place of `protect`. Lock must be held.
+
+        Entries with references are never evicted: closing them would empty
+        the index under another session's running review.
+
+        Returns:
+            Keys to evict, or None if the budget cannot be met
+        """
+        total = incoming + sum(entry['nbytes'] for key, entry in self._entries.items() if key != protect)
+        evicted = []
+
+        candidates = sorted(
+            (key for key, entry in self._entries.items() if key != protect and entry['refcount'] == 0),
+            key=lambda key: self._entries[key]['last_used']
+        )
+        for key in candidates:
+            if total <= self.max_bytes:
+                break
+            total -= self._entries[key]['nbytes']
+            evicted.append(key)
+
+        return evicted if total <= self.max_bytes else None
+
+    def _close_entries(self, entries: List[Dict]):
+        for entry in entries:
+            self.evictions += 1
+            resources = [entry['index']] + list(entry['extras'].values())
+            for resource in resources:
+                close = getattr(resource, 'close', None)
+                if callable(close):
+                    try:
+                        close()
+                    except Exception:
+                        pass
+
+    def total_bytes(self) -> int:
+        """Approximate resident size of all registered indexes."""
+        with self._lock:
+            return sum(entry['nbytes'] for entry in self._entries.values())
+
+    def stats(self) -> Dict:
+        """
+        Report registry usage.
+
+        Returns:
+            {'entries': int, 'sessions': int, 'referenced': int,
+             'total_bytes': int, 'max_bytes': int, 'evictions': int}
+        """
+        with self._lock:
+            return {
+                'entries': len(self._entries),
+                'sessions': len({session_id for session_id, doc_hash in self._entries}),
+                'referenced': sum(1 for entry in self._entries.values() if entry['refcount'] > 0),
+                'total_bytes': sum(entry['nbytes'] for entry in self._entries.values()),
+                'max_bytes': self.max_bytes,
+                'evictions': self.evictions
+            }
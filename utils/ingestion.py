@@ -0,0 +1,260 @@
+"""
+Memory-bounded ingestion pipeline for large documents.
+
+Pages are streamed from the extractor, chunked, encoded in streamed
+batches and inserted into the vector store batch by batch, so the
+embedding work holds only one batch at a time. Memory still grows with
+the document: page text and metadata, the chunks, the index vectors and
+(when a DocumentSession is passed) per-page words and the text index are
+all kept. Instead of page limits, a run is therefore bounded by resource
+budgets (resident memory and wall time).
+"""
+
+import os
+import subprocess
+import sys
+import time
+from typing import Callable, Dict, Optional
+
+import fitz  # PyMuPDF
+
+from utils.pdf_processor import iter_pages, iter_chunks, build_document_data
+from utils.embeddings import (
+    iter_embedding_batches, init_vector_store, add_to_vector_store, EMBEDDING_MODEL_ID, ENCODING_STATS
+)
+from utils.embedding_service import EmbeddingService
+from utils.encoding_scheduler import EncodingStats
+from utils.vector_index import DEFAULT_COLLECTION_NAME
+from utils.document_session import DocumentSession
+
+
+# Default budgets for large-document mode
+DEFAULT_MAX_RSS_MB = 2048
+DEFAULT_MAX_SECONDS = 900
+# Chunks per streamed encode/insert batch; large enough for length bucketing
+# to separate short and long chunks, small enough to keep memory flat
+DEFAULT_BATCH_SIZE = 256
+
+# Rough chunks-per-page figure used to size the index before chunking
+CHUNKS_PER_PAGE_ESTIMATE = 8
+
+# Progress callback signature: (stage, done, total) where stage is one of
+# 'extract', 'embed' or 'index' and total is None when not known up front;
+# notices (e.g. an unavailable memory budget) come as a message= keyword
+ProgressCallback = Callable[..., None]
+
+MEMORY_BUDGET_UNAVAILABLE = "⚠️ Memory use cannot be measured on this platform; only the time budget applies."
+
+
+
+class IngestionBudgetExceeded(Exception):
+    """Raised when an ingestion run exceeds its memory or time budget."""
+
+
+def _windows_rss_bytes() -> int:
+    """Working set of this process from GetProcessMemoryInfo (Windows only)."""
+    import ctypes
+    from ctypes import wintypes
+
+    class ProcessMemoryCounters(ctypes.Structure):
+        _fields_ = [
+            ("cb", wintypes.DWORD),
+            ("PageFaultCount", wintypes.DWORD),
+            ("PeakWorkingSetSize", ctypes.c_size_t),
+            ("WorkingSetSize", ctypes.c_size_t),
+            ("QuotaPeakPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+            ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+            ("PagefileUsage", ctypes.c_size_t),
+            ("PeakPagefileUsage", ctypes.c_size_t)
+        ]
+
+    counters = ProcessMemoryCounters()
+    counters.cb = ctypes.sizeof(counters)
+    kernel32 = ctypes.windll.kernel32
+    kernel32.GetCurrentProcess.restype = wintypes.HANDLE
+    if not ctypes.windll.psapi.GetProcessMemoryInfo(kernel32.GetCurrentProcess(), ctypes.byref(counters), counters.cb):
+        raise OSError("GetProcessMemoryInfo failed")
+    return counters.WorkingSetSize
+
+
+def current_rss_mb() -> Optional[float]:
+    """
+    Current resident set size of this process in MB.
+
+    Read from /proc on Linux, otherwise from psutil when installed, the
+    Win32 API on Windows or ps on other POSIX systems (macOS).
+
+    Returns:
+        Current RSS, or None if it cannot be read on this platform
+    """
+    try:
+        with open("/proc/self/statm") as statm:
+            resident_pages = int(statm.read().split()[1])
+        return resident_pages * os.sysconf("SC_PAGE_SIZE") / (1024 * 1024)
+    except (OSError, ValueError, IndexError, AttributeError):
+        pass
+
+    try:
+        import psutil
+        return psutil.Process().memory_info().rss / (1024 * 1024)
+    except ImportError:
+        pass
+
+    try:
+        if sys.platform == "win32":
+            return _windows_rss_bytes() / (1024 * 1024)
+        # ps reports the current RSS in KB on Linux, macOS and the BSDs
+        output = subprocess.run(
+            ["ps", "-o", "rss=", "-p", str(os.getpid())], capture_output=True, text=True, timeout=5, check=True
+        ).stdout
+        return int(output.strip()) / 1024
+    except (OSError, ValueError, AttributeError, subprocess.SubprocessError):
+        return None
+
+
+def _check_budget(start_time: float, max_rss_mb: Optional[float], max_seconds: Optional[float]):
+    """Raise IngestionBudgetExceeded if either budget is spent."""
+    if max_seconds is not None:
+        elapsed = time.perf_counter() - start_time
+        if elapsed > max_seconds:
+            raise IngestionBudgetExceeded(
+                f"Processing exceeded the time budget ({elapsed:.0f}s > {max_seconds:g}s)."
+            )
+
+    if max_rss_mb is not None:
+        rss = current_rss_mb()
+        if rss is not None and rss > max_rss_mb:
+            raise IngestionBudgetExceeded(
+                f"Processing exceeded the memory budget ({rss:.0f}MB > {max_rss_mb:g}MB)."
+            )
+
+
+def ingest_pdf(
+    pdf_bytes: bytes,
+    model,
+    cache=None,
+    index=None,
+    backend: str = "auto",
+    index_name: str = DEFAULT_COLLECTION_NAME,
+    batch_size: int = DEFAULT_BATCH_SIZE,
+    workers: Optional[int] = None,
+    max_rss_mb: Optional[float] = None,
+    max_seconds: Optional[float] = None,
+    progress_callback: Optional[ProgressCallback] = None,
+    model_name: str = EMBEDDING_MODEL_ID,
+    document: Optional[DocumentSession] = None
+) -> Dict:
+    """
+    Extract, chunk, embed and index a PDF in a single streaming pass.
+
+    Args:
+        pdf_bytes: PDF file as bytes
+        model: SentenceTransformer model
+        cache: Optional EmbeddingCache
+        index: Vector index to insert into; a new one is created if None
+        backend: Index backend for a new index ('auto', 'numpy' or 'chroma')
+        index_name: Collection name for a new index (namespace it per session)
+        batch_size: Chunks per encode/insert batch
+        workers: Extraction worker processes (see iter_pages)
+        max_rss_mb: Resident memory budget in MB, or None for no limit
+        max_seconds: Wall-time budget in seconds, or None for no limit
+        progress_callback: Optional callable receiving (stage, done, total)
+            and, for notices, a message keyword
+        model_name: Model identifier used in cache keys
+        document: Optional DocumentSession that receives each page's block
+            and word geometry (extracted in the same pass)
+
+    Returns:
+        {
+            'pdf_data': dict (as extract_text_with_metadata),
+            'chunks': [dict],
+            'index': vector index,
+            'stats': {
+                'elapsed_seconds': float,
+                'peak_rss_mb': float or None (not measurable here),
+                'batches': int,
+                'encoding': dict (EncodingStats.snapshot(), incl. tokens_per_second)
+            }
+        }
+
+    Raises:
+        IngestionBudgetExceeded: If a budget is exceeded mid-run
+    """
+    start_time = time.perf_counter()
+    peak_rss = current_rss_mb()
+
+    def report(stage: str, done: int, total: Optional[int], message: Optional[str] = None):
+        if progress_callback:
+            if message is None:
+                progress_callback(stage, done, total)
+            else:
+                progress_callback(stage, done, total, message=message)
+
+    if max_rss_mb is not None and peak_rss is None:
+        report('extract', 0, None, MEMORY_BUDGET_UNAVAILABLE)
+
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    total_pages = doc.page_count
+    doc.close()
+
+    if index is None:
+        index = init_vector_store(
+            backend=backend,
+            expected_size=total_pages * CHUNKS_PER_PAGE_ESTIMATE,
+            name=index_name
+        )
+
+    pages = []
+
+    def page_stream():
+        for page_data in iter_pages(pdf_bytes, workers=workers, include_words=document is not None):
+            if document is not None:
+                document.add_page(page_data)
+            pages.append(page_data)
+            report('extract', len(pages), total_pages)
+            yield page_data
+
+    chunks = []
+    batches = 0
+    # The shared EmbeddingService feeds ENCODING_STATS from its worker
+    encoding_stats = EncodingStats(parent=None if isinstance(model, EmbeddingService) else ENCODING_STATS)
+    batch_stream = iter_embedding_batches(
+        iter_chunks(page_stream()),
+        model,
+        batch_size=batch_size,
+        cache=cache,
+        model_name=model_name,
+        stats=encoding_stats
+    )
+
+    for batch_chunks, batch_embeddings in batch_stream:
+        chunks.extend(batch_chunks)
+        report('embed', len(chunks), None)
+
+        add_to_vector_store(index, batch_chunks, batch_embeddings)
+        batches += 1
+        report('index', len(chunks), None)
+
+        rss = current_rss_mb()
+        if rss is not None:
+            peak_rss = max(peak_rss or 0.0, rss)
+        _check_budget(start_time, max_rss_mb, max_seconds)
+
+    pdf_data = build_document_data(pages)
+    report('extract', total_pages, total_pages)
+    report('embed', len(chunks), len(chunks))
+    report('index', len(chunks), len(chunks))
+
+    return {
+        'pdf_data': pdf_data,
+        'chunks': chunks,
+        'index': index,
+        'stats': {
+            'elapsed_seconds': time.perf_counter() - start_time,
+            'peak_rss_mb': peak_rss,
+            'batches': batches,
+            'encoding': encoding_stats.snapshot()
+        }
+    }
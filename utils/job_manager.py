@@ -0,0 +1,278 @@
+"""
+Background jobs for long-running pipeline stages.
+
+Streamlit reruns the whole script on every interaction, so work done inside
+the script blocks the session and can be cut short by a rerun. A JobManager
+runs extraction, embedding, indexing, LLM and annotation work on a shared
+worker pool instead. Each job has an ID, a status, stage progress, an
+optional partial result (e.g. streamed critique text) and a cancellation
+flag. Jobs outlive reruns; the UI keeps job IDs in session state and polls.
+"""
+
+import itertools
+import threading
+import time
+import traceback
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, List, Optional
+
+
+DEFAULT_JOB_WORKERS = 4
+
+# Finished jobs are kept this long for sessions to collect their results
+DEFAULT_RESULT_TTL_SECONDS = 30 * 60
+
+# Job statuses
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+FINISHED_STATUSES = (DONE, FAILED, CANCELLED)
+
+
+class JobCancelled(Exception):
+    """Raised inside a job when cancellation was requested."""
+
+
+class JobContext:
+    """
+    Handle passed to a running job for reporting progress.
+
+    report() and check_cancelled() are the job's cancellation points: both
+    raise JobCancelled once cancel() was called for the job.
+    """
+
+    def __init__(self, job: Dict, lock: threading.Lock):
+        self._job = job
+        self._lock = lock
+        self._cancel = job['_cancel_event']
+
+    @property
+    def cancelled(self) -> bool:
+        return self._cancel.is_set()
+
+    def check_cancelled(self):
+        """Raise JobCancelled if the job was cancelled."""
+        if self._cancel.is_set():
+            raise JobCancelled(f"Job {self._job['id']} was cancelled")
+
+    def report(self, stage: str, done: int = 0, total: Optional[int] = None, message: Optional[str] = None):
+        """
+        Record progress.
+
+        Args:
+            stage: Current stage name (e.g. 'extract', 'embed', 'generate')
+            done: Units completed in this stage
+            total: Units in this stage, or None if unknown
+            message: Optional human-readable status line
+        """
+        with self._lock:
+            progress = self._job['progress'].setdefault(stage, {})
+            progress['done'] = done
+            progress['total'] = total
+            self._job['stage'] = stage
+            if message is not None:
+                self._job['message'] = message
+        self.check_cancelled()
+
+    def set_partial(self, key: str, value: Any):
+        """Publish an intermediate result (read by pollers via partial)."""
+        with self._lock:
+            self._job['partial'][key] = value
+
+
+class JobManager:
+    """
+    Process-wide registry and worker pool for background jobs.
+
+    Args:
+        max_workers: Jobs run concurrently; further jobs wait in a queue
+        result_ttl_seconds: How long finished jobs are kept before pruning
+    """
+
+    def __init__(self, max_workers: int = DEFAULT_JOB_WORKERS, result_ttl_seconds: float = DEFAULT_RESULT_TTL_SECONDS):
+        self.max_workers = max_workers
+        self.result_ttl_seconds = result_ttl_seconds
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="job")
+        self._jobs: Dict[str, Dict] = {}
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+
+    def submit(self, owner: str, kind: str, func: Callable, *args, **kwargs) -> str:
+        """
+        Queue a job.
+
+        Args:
+            owner: Owning session ID (for listing and cleanup)
+            kind: Job kind, e.g. 'process' or 'review'
+            func: Callable invoked as func(context, *args, **kwargs); its
+                return value becomes the job result
+            *args, **kwargs: Passed to func
+
+        Returns:
+            Job ID
+        """
+        self.prune()
+        job_id = f"{kind}-{next(self._ids)}"
+        job = {
+            'id': job_id,
+            'owner': owner,
+            'kind': kind,
+            'status': QUEUED,
+            'stage': None,
+            'message': None,
+            'progress': {},
+            'partial': {},
+            'result': None,
+            'error': None,
+            'error_type': None,
+            'traceback': None,
+            'created': time.time(),
+            'started': None,
+            'finished': None,
+            '_cancel_event': threading.Event(),
+            '_future': None
+        }
+        with self._lock:
+            self._jobs[job_id] = job
+            job['_future'] = self._executor.submit(self._run, job, func, args, kwargs)
+        return job_id
+
+    def _run(self, job: Dict, func: Callable, args, kwargs):
+        with self._lock:
+            if job['_cancel_event'].is_set():
+                self._finish(job, CANCELLED)
+                return
+            job['status'] = RUNNING
+            job['started'] = time.time()
+
+        context = JobContext(job, self._lock)
+        try:
+            result = func(context, *args, **kwargs)
+        except JobCancelled:
+            with self._lock:
+                self._finish(job, CANCELLED)
+        except Exception as e:
+            with self._lock:
+                job['error'] = str(e) or type(e).__name__
+                job['error_type'] = type(e).__name__
+                job['traceback'] = traceback.format_exc()
+                self._finish(job, FAILED)
+        else:
+            with self._lock:
+                job['result'] = result
+                self._finish(job, CANCELLED if job['_cancel_event'].is_set() else DONE)
+
+    def _finish(self, job: Dict, status: str):
+        """Mark a job finished. Lock must be held."""
+        job['status'] = status
+        job['finished'] = time.time()
+
+    def get(self, job_id: Optional[str]) -> Optional[Dict]:
+        """
+        Snapshot of a job.
+
+        Returns:
+            {'id', 'owner', 'kind', 'status', 'stage', 'message', 'progress'
+            ({stage: {'done', 'total'}}), 'partial', 'result', 'error',
+            'error_type', 'traceback', 'created', 'started', 'finished',
+            'queue_position'} or None if
+            unknown (or pruned)
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = {key: value for key, value in job.items() if not key.startswith('_')}
+            snapshot['progress'] = {stage: dict(values) for stage, values in job['progress'].items()}
+            snapshot['partial'] = dict(job['partial'])
+            snapshot['queue_position'] = self._queue_position(job)
+            return snapshot
+
+    def _queue_position(self, job: Dict) -> int:
+        """Jobs queued ahead of this one (0 once running). Lock must be held."""
+        if job['status'] != QUEUED:
+            return 0
+        return sum(
+            1 for other in self._jobs.values()
+            if other['status'] == QUEUED and other['created'] < job['created']
+        )
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation.
+
+        A queued job is dropped; a running job stops at its next
+        cancellation point.
+
+        Returns:
+            True if the job existed and had not finished
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job['status'] in FINISHED_STATUSES:
+                return False
+            job['_cancel_event'].set()
+            if job['status'] == QUEUED and job['_future'].cancel():
+                self._finish(job, CANCELLED)
+            return True
+
+    def jobs(self, owner: str, kind: Optional[str] = None) -> List[Dict]:
+        """Snapshots of an owner's jobs (optionally one kind), oldest first."""
+        with self._lock:
+            job_ids = [
+                job['id'] for job in sorted(self._jobs.values(), key=lambda job: job['created'])
+                if job['owner'] == owner and (kind is None or job['kind'] == kind)
+            ]
+        return [snapshot for snapshot in map(self.get, job_ids) if snapshot is not None]
+
+    def forget(self, job_id: str):
+        """Drop a finished job's record (its result has been collected)."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] in FINISHED_STATUSES:
+                del self._jobs[job_id]
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """
+        Drop finished jobs older than the result TTL.
+
+        Returns:
+            Number of jobs dropped
+        """
+        now = time.time() if now is None else now
+        with self._lock:
+            expired = [
+                job_id for job_id, job in self._jobs.items()
+                if job['status'] in FINISHED_STATUSES and now - job['finished'] > self.result_ttl_seconds
+            ]
+            for job_id in expired:
+                del self._jobs[job_id]
+        return len(expired)
+
+    def stats(self) -> Dict:
+        """
+        Pool utilisation.
+
+        Returns:
+            {'workers': int, 'queued': int, 'running': int, 'finished': int}
+        """
+        with self._lock:
+            statuses = [job['status'] for job in self._jobs.values()]
+        return {
+            'workers': self.max_workers,
+            'queued': statuses.count(QUEUED),
+            'running': statuses.count(RUNNING),
+            'finished': sum(statuses.count(status) for status in FINISHED_STATUSES)
+        }
+
+    def shutdown(self, cancel_pending: bool = True):
+        """Cancel outstanding jobs (optionally) and stop the pool."""
+        if cancel_pending:
+            with self._lock:
+                job_ids = [job_id for job_id, job in self._jobs.items() if job['status'] not in FINISHED_STATUSES]
+            for job_id in job_ids:
+                self.cancel(job_id)
+        self._executor.shutdown(wait=False, cancel_futures=cancel_pending)
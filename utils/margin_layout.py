@@ -0,0 +1,155 @@
+"""
+Right-margin layout for annotation boxes.
+
+Comment and rewrite boxes are collected per page first, then packed into
+the margin column in one pass: boxes are sorted by the y position of the
+text they refer to and swept downward (never above the previous box) and
+then upward (never below the page bottom), skipping reserved bands such as
+the legend and section summaries. Sorting dominates, so layout is
+O(n log n) per page. Boxes that still do not fit are returned as overflow
+for an appended comments page.
+"""
+
+from collections import defaultdict
+from typing import Any, Callable, Dict, List, Tuple
+
+
+# Vertical space kept between neighbouring boxes
+DEFAULT_GAP = 4.0
+
+# Distance of the margin column from the top and bottom page edges
+DEFAULT_PAGE_MARGIN = 10.0
+
+
+def place_column(
+    items: List[Tuple[float, float]],
+    reserved: List[Tuple[float, float]],
+    top: float,
+    bottom: float,
+    gap: float = DEFAULT_GAP
+) -> Tuple[Dict[int, float], List[int]]:
+    """
+    Pack boxes into one vertical column without overlap.
+
+    Args:
+        items: (anchor_y, height) per box, where anchor_y is the preferred top
+        reserved: (y0, y1) bands no box may overlap
+        top: Highest allowed box top
+        bottom: Lowest allowed box bottom
+        gap: Space kept between boxes and around reserved bands
+
+    Returns:
+        ({item index: placed top y}, [indices of boxes that did not fit]).
+        Placed boxes keep the order of their anchors.
+    """
+    order = sorted(range(len(items)), key=lambda i: items[i][0])
+    positions: Dict[int, float] = {}
+
+    # Merge overlapping reserved bands so both sweeps can walk them in order
+    bands: List[List[float]] = []
+    for y0, y1 in sorted(reserved):
+        if bands and y0 <= bands[-1][1]:
+            bands[-1][1] = max(bands[-1][1], y1)
+        else:
+            bands.append([y0, y1])
+
+    # Downward sweep: each box at its anchor, or just below the previous box
+    cursor = top
+    band = 0
+    for i in order:
+        anchor, height = items[i]
+        y = max(anchor, cursor)
+        while band < len(bands) and bands[band][1] + gap <= y:
+            band += 1
+        probe = band
+        while probe < len(bands) and bands[probe][0] < y + height + gap:
+            y = max(y, bands[probe][1] + gap)
+            probe += 1
+        positions[i] = y
+        cursor = y + height + gap
+
+    # Upward sweep: pull boxes back above the page bottom, in reverse order
+    limit = bottom
+    band = len(bands) - 1
+    for rank in range(len(order) - 1, -1, -1):
+        i = order[rank]
+        height = items[i][1]
+        y = min(positions[i], limit - height)
+        while band >= 0 and bands[band][1] + gap > y:
+            if bands[band][0] - gap < y + height:
+                y = bands[band][0] - gap - height
+            band -= 1
+        if y < top:
+            # The column above is full: this and all earlier boxes overflow
+            overflow = order[:rank + 1]
+            for j in overflow:
+                del positions[j]
+            return positions, overflow
+        positions[i] = y
+        limit = y - gap
+
+    return positions, []
+
+
+class MarginLayout:
+    """
+    Collects margin boxes for a whole document and places them per page.
+
+    Each box carries an arbitrary payload (for the annotator, what to draw
+    and what to write on the comments page if it overflows).
+    """
+
+    def __init__(self, gap: float = DEFAULT_GAP, page_margin: float = DEFAULT_PAGE_MARGIN):
+        self.gap = gap
+        self.page_margin = page_margin
+        self._items: Dict[int, List[Tuple[float, float, Any]]] = defaultdict(list)
+        self._reserved: Dict[int, List[Tuple[float, float]]] = defaultdict(list)
+
+    def add(self, page_num: int, anchor_y: float, height: float, payload: Any):
+        """
+        Queue a box for a 0-indexed page.
+
+        Args:
+            page_num: 0-indexed page number
+            anchor_y: Preferred top (usually the top of the referenced text)
+            height: Box height
+            payload: Returned with the box's placement
+        """
+        self._items[page_num].append((anchor_y, height, payload))
+
+    def reserve(self, page_num: int, y0: float, y1: float):
+        """Keep the band y0..y1 of a 0-indexed page free of margin boxes."""
+        self._reserved[page_num].append((y0, y1))
+
+    def __len__(self) -> int:
+        return sum(len(items) for items in self._items.values())
+
+    def solve(
+        self,
+        page_height: Callable[[int], float]
+    ) -> Tuple[List[Tuple[int, float, Any]], List[Tuple[int, Any]]]:
+        """
+        Place every queued box.
+
+        Args:
+            page_height: Returns the height of a 0-indexed page
+
+        Returns:
+            (placed, overflow): placed is [(page_num, top_y, payload)] and
+            overflow is [(page_num, payload)], both in page then anchor order
+        """
+        placed = []
+        overflow = []
+        for page_num in sorted(self._items):
+            items = self._items[page_num]
+            positions, spilled = place_column(
+                [(anchor, height) for anchor, height, _ in items],
+                self._reserved.get(page_num, []),
+                self.page_margin,
+                page_height(page_num) - self.page_margin,
+                self.gap
+            )
+            for i in sorted(positions, key=positions.get):
+                placed.append((page_num, positions[i], items[i][2]))
+            overflow.extend((page_num, items[i][2]) for i in spilled)
+        return placed, overflow
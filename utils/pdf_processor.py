@@ -3,34 +3,58 @@ PDF processing utilities for text extraction and chunking.
 """
 
 import fitz  # PyMuPDF
+import os
 import re
-from typing import Dict, List, Tuple
+from bisect import bisect_left
+from concurrent.futures import ProcessPoolExecutor
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 
 
-def validate_pdf(pdf_bytes: bytes) -> Tuple[bool, str]:
+# Default limits for the standard (non large-document) upload path
+DEFAULT_MAX_SIZE_MB = 10
+DEFAULT_MAX_PAGES = 50
+
+# Documents with at least this many pages are extracted with a process pool
+# when iter_pages is called with workers=None
+PARALLEL_PAGE_THRESHOLD = 40
+MAX_EXTRACTION_WORKERS = 4
+PAGES_PER_TASK = 16
+
+# Sentence-ending punctuation; group 1 is the whitespace gap that follows it
+SENTENCE_BOUNDARY = re.compile(r'[.!?](\s+)')
+
+
+def validate_pdf(
+    pdf_bytes: bytes,
+    max_size_mb: Optional[float] = DEFAULT_MAX_SIZE_MB,
+    max_pages: Optional[int] = DEFAULT_MAX_PAGES
+) -> Tuple[bool, str]:
     """
     Check if PDF is valid and within limits.
     
     Args:
         pdf_bytes: PDF file as bytes
+        max_size_mb: Maximum file size in MB, or None for no limit
+        max_pages: Maximum page count, or None for no limit (large-document
+            mode bounds resources with ingestion budgets instead)
     
     Returns:
         Tuple of (is_valid: bool, error_message: str)
     """
     try:
-        # Check file size (10MB limit)
+        # Check file size
         size_mb = len(pdf_bytes) / (1024 * 1024)
-        if size_mb > 10:
-            return False, f"File too large ({size_mb:.1f}MB). Maximum 10MB allowed."
+        if max_size_mb is not None and size_mb > max_size_mb:
+            return False, f"File too large ({size_mb:.1f}MB). Maximum {max_size_mb:g}MB allowed."
         
         # Try to open PDF
         doc = fitz.open(stream=pdf_bytes, filetype="pdf")
         
         # Check page count
         page_count = doc.page_count
-        if page_count > 50:
+        if max_pages is not None and page_count > max_pages:
             doc.close()
-            return False, f"Too many pages ({page_count}). Recommended maximum is 50 pages for optimal performance."
+            return False, f"Too many pages ({page_count}). Recommended maximum is {max_pages} pages for optimal performance. Enable large document mode for longer theses."
         
         if page_count == 0:
             doc.close()
@@ -43,12 +67,167 @@ def validate_pdf(pdf_bytes: bytes) -> Tuple[bool, str]:
         return False, f"Invalid or corrupted PDF file: {str(e)}"
 
 
-def extract_text_with_metadata(pdf_bytes: bytes) -> Dict:
+def _extract_page_data(page: fitz.Page, page_num: int, include_words: bool = False) -> Dict:
+    """
+    Extract text blocks for a single page.
+    
+    Args:
+        page: PyMuPDF page object
+        page_num: 0-indexed page number
+        include_words: Also return word boxes, from the same text parse
+    
+    Returns:
+        Page dictionary with 'page_num' (1-indexed), 'text' and 'blocks',
+        plus 'words' ((x0, y0, x1, y1, word, block_no, line_no, word_no)
+        tuples) if requested
+    """
+    # Parse the page once; blocks and words are both read from this text page
+    textpage = page.get_textpage()
+    
+    # Extract text blocks with coordinates
+    blocks = []
+    text_blocks = page.get_text("blocks", textpage=textpage)  # Returns list of (x0, y0, x1, y1, text, block_no, block_type)
+    
+    page_text_parts = []
+    for block in text_blocks:
+        if len(block) >= 5:  # Valid text block
+            bbox = block[:4]
+            text = block[4]
+            
+            # Clean text
+            text = text.strip()
+            if text:
+                blocks.append({
+                    'bbox': bbox,
+                    'text': text
+                })
+                page_text_parts.append(text)
+    
+    # Combine page text
+    page_text = "\n".join(page_text_parts)
+    
+    page_data = {
+        'page_num': page_num + 1,  # 1-indexed
+        'text': page_text,
+        'blocks': blocks
+    }
+    if include_words:
+        page_data['words'] = page.get_text("words", textpage=textpage)
+    
+    return page_data
+
+
+# Each extraction worker's own handle on the PDF, opened once by
+# _init_extraction_worker so tasks only carry page ranges
+_worker_document = None
+
+
+def _init_extraction_worker(pdf_bytes: bytes):
+    """Open the worker's document handle (ProcessPoolExecutor initializer)."""
+    global _worker_document
+    _worker_document = fitz.open(stream=pdf_bytes, filetype="pdf")
+
+
+def _extract_page_range(start: int, end: int, include_words: bool = False) -> List[Dict]:
+    """
+    Extract pages [start, end) with the worker's document handle.
+    
+    Runs inside worker processes, so it must stay a module-level function.
+    """
+    return [
+        _extract_page_data(_worker_document[page_num], page_num, include_words)
+        for page_num in range(start, end)
+    ]
+
+
+def iter_pages(
+    pdf_bytes: bytes,
+    workers: Optional[int] = 1,
+    pages_per_task: int = PAGES_PER_TASK,
+    include_words: bool = False
+) -> Iterator[Dict]:
+    """
+    Stream page dictionaries in page order as they are extracted.
+    
+    Args:
+        pdf_bytes: PDF file as bytes
+        workers: Number of worker processes. 1 extracts serially in-process,
+            None picks a count from the page count and available CPUs
+        pages_per_task: Pages handed to a worker per task in process-pool mode
+        include_words: Add each page's word boxes under 'words'
+    
+    Yields:
+        Page dictionaries identical to the entries of
+        extract_text_with_metadata()['pages'] (plus 'words' if requested)
+    """
+    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
+    page_count = doc.page_count
+    
+    if workers is None:
+        if page_count < PARALLEL_PAGE_THRESHOLD:
+            workers = 1
+        else:
+            workers = min(MAX_EXTRACTION_WORKERS, os.cpu_count() or 1)
+    
+    if workers <= 1 or page_count <= pages_per_task:
+        try:
+            for page_num in range(page_count):
+                yield _extract_page_data(doc[page_num], page_num, include_words)
+        finally:
+            doc.close()
+        return
+    
+    doc.close()
+    
+    ranges = [
+        (start, min(start + pages_per_task, page_count))
+        for start in range(0, page_count, pages_per_task)
+    ]
+    
+    # The PDF is sent to each worker once, not with every range
+    with ProcessPoolExecutor(max_workers=workers, initializer=_init_extraction_worker,
+                             initargs=(pdf_bytes,)) as executor:
+        futures = [
+            executor.submit(_extract_page_range, start, end, include_words)
+            for start, end in ranges
+        ]
+        try:
+            # Yield in page order; later ranges keep extracting meanwhile
+            for future in futures:
+                for page_data in future.result():
+                    yield page_data
+        finally:
+            for future in futures:
+                future.cancel()
+
+
+def build_document_data(pages_data: List[Dict]) -> Dict:
+    """
+    Assemble the document dictionary from extracted pages.
+    
+    Args:
+        pages_data: Page dictionaries in page order
+    
+    Returns:
+        Same structure as extract_text_with_metadata
+    """
+    combined_text = "\n\n".join(page_data['text'] for page_data in pages_data)
+    
+    return {
+        'full_text': combined_text,
+        'pages': pages_data,
+        'total_pages': len(pages_data),
+        'total_chars': len(combined_text)
+    }
+
+
+def extract_text_with_metadata(pdf_bytes: bytes, workers: Optional[int] = 1) -> Dict:
     """
     Extract text from PDF with page numbers and coordinates.
     
     Args:
         pdf_bytes: PDF file as bytes
+        workers: Worker processes for extraction (see iter_pages)
     
     Returns:
         {
@@ -64,67 +243,28 @@ def extract_text_with_metadata(pdf_bytes: bytes) -> Dict:
             'total_chars': int
         }
     """
-    doc = fitz.open(stream=pdf_bytes, filetype="pdf")
-    
-    pages_data = []
-    full_text = []
-    
-    for page_num in range(doc.page_count):
-        page = doc[page_num]
-        
-        # Extract text blocks with coordinates
-        blocks = []
-        text_blocks = page.get_text("blocks")  # Returns list of (x0, y0, x1, y1, text, block_no, block_type)
-        
-        page_text_parts = []
-        for block in text_blocks:
-            if len(block) >= 5:  # Valid text block
-                bbox = block[:4]
-                text = block[4]
-                
-                # Clean text
-                text = text.strip()
-                if text:
-                    blocks.append({
-                        'bbox': bbox,
-                        'text': text
-                    })
-                    page_text_parts.append(text)
-        
-        # Combine page text
-        page_text = "\n".join(page_text_parts)
-        
-        pages_data.append({
-            'page_num': page_num + 1,  # 1-indexed
-            'text': page_text,
-            'blocks': blocks
-        })
-        
-        full_text.append(page_text)
-    
-    doc.close()
-    
-    combined_text = "\n\n".join(full_text)
-    
-    return {
-        'full_text': combined_text,
-        'pages': pages_data,
-        'total_pages': len(pages_data),
-        'total_chars': len(combined_text)
-    }
+    return build_document_data(list(iter_pages(pdf_bytes, workers=workers)))
 
 
-def chunk_text(pages_data: List[Dict], chunk_size: int = 500, overlap: int = 100) -> List[Dict]:
+def chunk_text(
+    pages_data: Iterable[Dict],
+    chunk_size: int = 500,
+    overlap: int = 100,
+    tokenizer=None
+) -> List[Dict]:
     """
     Split text into overlapping chunks with metadata.
     
     Args:
-        pages_data: List of page dictionaries from extract_text_with_metadata
-        chunk_size: Target chunk size in characters
-        overlap: Overlap size in characters
+        pages_data: Page dictionaries from extract_text_with_metadata or iter_pages
+        chunk_size: Target chunk size in characters (tokens if tokenizer is given)
+        overlap: Overlap size in characters (tokens if tokenizer is given)
+        tokenizer: Optional Hugging Face fast tokenizer (e.g. model.tokenizer)
+            to size chunks in embedding-model tokens instead of characters
     
     Returns:
-        List of chunk dictionaries with metadata:
+        List of chunk dictionaries with metadata, where
+        page_text[start_char:end_char] == text:
         [
             {
                 'text': str,
@@ -135,7 +275,70 @@ def chunk_text(pages_data: List[Dict], chunk_size: int = 500, overlap: int = 100
             }
         ]
     """
-    chunks = []
+    return list(iter_chunks(pages_data, chunk_size=chunk_size, overlap=overlap, tokenizer=tokenizer))
+
+
+def _sentence_spans(text: str) -> List[Tuple[int, int]]:
+    """
+    Locate sentences as (start, end) index spans without copying text.
+    
+    Spans exclude the whitespace separating sentences.
+    """
+    gaps = [boundary.span(1) for boundary in SENTENCE_BOUNDARY.finditer(text)]
+    
+    begin = 0
+    end = len(text)
+    while begin < end and text[begin].isspace():
+        begin += 1
+    while end > begin and text[end - 1].isspace():
+        end -= 1
+    
+    starts = [begin] + [gap_end for gap_start, gap_end in gaps]
+    ends = [gap_start for gap_start, gap_end in gaps] + [end]
+    
+    return [(start, stop) for start, stop in zip(starts, ends) if stop > start]
+
+
+def _token_starts(text: str, tokenizer) -> List[int]:
+    """Character offset of every token in text, in order."""
+    encoding = tokenizer(text, add_special_tokens=False, return_offsets_mapping=True)
+    return [token_start for token_start, token_end in encoding['offset_mapping'] if token_end > token_start]
+
+
+def _snap_to_word_start(text: str, position: int, limit: int) -> int:
+    """Move position forward to the start of the next word, not past limit."""
+    scan = position
+    if position > 0 and not text[position - 1].isspace():
+        while scan < limit and not text[scan].isspace():
+            scan += 1
+    while scan < limit and text[scan].isspace():
+        scan += 1
+    
+    # No word boundary in range: keep the raw (mid-word) position
+    return scan if scan < limit else position
+
+
+def iter_chunks(
+    pages_data: Iterable[Dict],
+    chunk_size: int = 500,
+    overlap: int = 100,
+    tokenizer=None
+) -> Iterator[Dict]:
+    """
+    Stream chunks page by page, so chunking can start before extraction ends.
+    
+    Each page is chunked in a single pass over its sentence spans. Chunks are
+    slices of the page text, so start_char/end_char are exact offsets.
+    
+    Args:
+        pages_data: Iterable of page dictionaries (e.g. iter_pages)
+        chunk_size: Target chunk size in characters (tokens if tokenizer is given)
+        overlap: Overlap size in characters (tokens if tokenizer is given)
+        tokenizer: Optional Hugging Face fast tokenizer for token-based sizing
+    
+    Yields:
+        Chunk dictionaries in the format returned by chunk_text
+    """
     chunk_id = 0
     
     for page_data in pages_data:
@@ -147,45 +350,58 @@ def chunk_text(pages_data: List[Dict], chunk_size: int = 500, overlap: int = 100
             continue
         
         # Split into sentences to avoid breaking mid-sentence
-        sentences = re.split(r'(?<=[.!?])\s+', page_text)
+        spans = _sentence_spans(page_text)
+        
+        if tokenizer is None:
+            def size(start: int, end: int) -> int:
+                return end - start
+            
+            def overlap_start(chunk_start: int, chunk_end: int) -> int:
+                return max(chunk_start, chunk_end - overlap)
+        else:
+            token_starts = _token_starts(page_text, tokenizer)
+            
+            def size(start: int, end: int) -> int:
+                return bisect_left(token_starts, end) - bisect_left(token_starts, start)
+            
+            def overlap_start(chunk_start: int, chunk_end: int) -> int:
+                first_token = max(
+                    bisect_left(token_starts, chunk_start),
+                    bisect_left(token_starts, chunk_end) - overlap
+                )
+                return token_starts[first_token] if first_token < len(token_starts) else chunk_end
         
-        current_chunk = ""
-        start_char = 0
+        chunk_start, chunk_end = spans[0]
         
-        for sentence in sentences:
+        for sentence_start, sentence_end in spans[1:]:
             # If adding this sentence exceeds chunk_size, save current chunk
-            if len(current_chunk) + len(sentence) > chunk_size and current_chunk:
-                chunks.append({
-                    'text': current_chunk.strip(),
+            if size(chunk_start, sentence_end) > chunk_size:
+                yield {
+                    'text': page_text[chunk_start:chunk_end],
                     'chunk_id': chunk_id,
                     'page_num': page_num,
-                    'start_char': start_char,
-                    'end_char': start_char + len(current_chunk)
-                })
-                
+                    'start_char': chunk_start,
+                    'end_char': chunk_end
+                }
                 chunk_id += 1
                 
-                # Start new chunk with overlap
-                # Take last 'overlap' characters from current chunk
-                if len(current_chunk) > overlap:
-                    overlap_text = current_chunk[-overlap:]
-                    current_chunk = overlap_text + " " + sentence
-                    start_char = start_char + len(current_chunk) - len(overlap_text) - len(sentence) - 1
+                # Start new chunk with the tail of the previous one as overlap
+                if overlap > 0 and size(chunk_start, chunk_end) > overlap:
+                    tail_start = overlap_start(chunk_start, chunk_end)
+                    chunk_start = _snap_to_word_start(page_text, tail_start, chunk_end)
+                    if chunk_start >= chunk_end:
+                        chunk_start = sentence_start
                 else:
-                    current_chunk = sentence
-                    start_char = start_char + len(current_chunk) - len(sentence)
-            else:
-                current_chunk += " " + sentence if current_chunk else sentence
+                    chunk_start = sentence_start
+            
+            chunk_end = sentence_end
         
         # Add remaining text as final chunk for this page
-        if current_chunk.strip():
-            chunks.append({
-                'text': current_chunk.strip(),
-                'chunk_id': chunk_id,
-                'page_num': page_num,
-                'start_char': start_char,
-                'end_char': start_char + len(current_chunk)
-            })
-            chunk_id += 1
-    
-    return chunks
+        yield {
+            'text': page_text[chunk_start:chunk_end],
+            'chunk_id': chunk_id,
+            'page_num': page_num,
+            'start_char': chunk_start,
+            'end_char': chunk_end
+        }
+        chunk_id += 1
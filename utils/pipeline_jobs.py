@@ -0,0 +1,341 @@
+"""
+Pipeline stages packaged as background jobs.
+
+Each function runs on a JobManager worker thread and takes a JobContext as
+its first argument. They never touch Streamlit: resources (model, caches,
+index manager, Groq client) are resolved by the caller and passed in, and
+everything the UI needs is returned in the job result or published as a
+partial result while the job runs.
+"""
+
+from typing import Callable, Dict, List, Optional
+
+from utils.annotator import create_annotated_pdf
+from utils.critique_parser import IncrementalCritiqueParser, parse_critique
+from utils.document_session import DocumentSession
+from utils.embeddings import retrieve_for_modes, retrieve_relevant_chunks
+from utils.groq_client import generate_critique
+from utils.index_manager import IndexBudgetExceeded, IndexManager, collection_name
+from utils.ingestion import ingest_pdf
+from utils.job_manager import JobCancelled, JobContext
+from utils.prompts import MODE_PROMPTS, MODE_QUERIES, build_prompt
+from utils.review_orchestrator import run_all_modes
+from utils.stream_renderer import StreamRenderer
+
+
+def ingest_job(
+    context: JobContext,
+    pdf_bytes: bytes,
+    model,
+    cache,
+    manager: IndexManager,
+    session_id: str,
+    doc_hash: str,
+    max_rss_mb: Optional[float] = None,
+    max_seconds: Optional[float] = None
+) -> Dict:
+    """
+    Extract, embed and index a PDF, then register it with the index manager.
+
+    Progress is reported per ingestion stage ('extract', 'embed', 'index');
+    each report is a cancellation point.
+
+    Returns:
+        {'doc_hash': str, 'pdf_data': dict, 'chunks': [dict],
+         'cache_hits': int, 'cache_misses': int}
+    """
+    stats_before = cache.stats()
+
+    # Holds the parsed PDF and page geometry for annotation; owned by the
+    # index manager entry once registered
+    document = DocumentSession(pdf_bytes)
+    try:
+        result = ingest_pdf(
+            pdf_bytes,
+            model,
+            cache=cache,
+            max_rss_mb=max_rss_mb,
+            max_seconds=max_seconds,
+            progress_callback=context.report,
+            index_name=collection_name(session_id, doc_hash),
+            document=document
+        )
+        context.check_cancelled()
+    except BaseException:
+        document.close()
+        raise
+
+    try:
+        manager.register(
+            session_id,
+            doc_hash,
+            result['index'],
+            extras={'pdf_data': result['pdf_data'], 'chunks': result['chunks'], 'document': document}
+        )
+    except IndexBudgetExceeded:
+        result['index'].close()
+        document.close()
+        raise
+    stats_after = cache.stats()
+
+    return {
+        'doc_hash': doc_hash,
+        'pdf_data': result['pdf_data'],
+        'chunks': result['chunks'],
+        'cache_hits': stats_after['hits'] - stats_before['hits'],
+        'cache_misses': stats_after['misses'] - stats_before['misses']
+    }
+
+
+def annotate_stage(
+    context: JobContext,
+    pdf_bytes: Optional[bytes],
+    parsed: Dict,
+    document: Optional[DocumentSession] = None
+) -> Dict:
+    """
+    Build the annotated PDF for a parsed critique.
+
+    Returns:
+        {'annotated_pdf': bytes or None, 'warning': str or None}
+    """
+    if not pdf_bytes or not (parsed['issues'] or parsed['rewrites'] or parsed['section_summaries']):
+        return {'annotated_pdf': None, 'warning': None}
+
+    context.report('annotate', 0, 1, "✏️ Creating professional annotated PDF...")
+    try:
+        annotated_pdf = create_annotated_pdf(
+            pdf_bytes,
+            parsed['issues'],
+            section_summaries=parsed['section_summaries'] or None,
+            rewrites=parsed['rewrites'] or None,
+            include_legend=True,
+            document=document
+        )
+    except Exception as e:
+        return {'annotated_pdf': None, 'warning': f"Could not create annotations: {str(e)}"}
+    context.report('annotate', 1, 1)
+    return {'annotated_pdf': annotated_pdf, 'warning': None}
+
+
+def review_job(
+    context: JobContext,
+    client,
+    vector_index,
+    model,
+    mode: str,
+    custom_query: Optional[str] = None,
+    query_cache=None,
+    limiter=None,
+    response_cache=None,
+    reuse_cached: bool = True,
+    pdf_bytes: Optional[bytes] = None,
+    document: Optional[DocumentSession] = None
+) -> Dict:
+    """
+    Retrieve context, stream one critique and annotate the PDF.
+
+    While generating, the partial result holds 'critique' (text so far,
+    republished on a StreamRenderer cadence rather than per token), 'issues'
+    and 'critical' (issue counts so far). Every streamed chunk is a
+    cancellation point; a cancelled stream is not cached.
+
+    Returns:
+        {'critique': str, 'parsed': dict, 'retrieved': int, 'cache_hit': bool,
+         'render_stats': dict (StreamRenderer.stats()),
+         'annotated_pdf': bytes or None, 'warning': str or None}
+    """
+    # Determine query for retrieval
+    if custom_query and custom_query.strip():
+        retrieval_query = custom_query
+        prompt_mode = "custom"
+    else:
+        # Use mode-specific query
+        retrieval_query = MODE_QUERIES.get(mode, MODE_QUERIES["Full Panelist Review"])
+        prompt_mode = MODE_PROMPTS.get(mode, "full_review")
+
+    context.report('retrieve', 0, 1, "🔍 Retrieving relevant sections...")
+    relevant_chunks = retrieve_relevant_chunks(
+        retrieval_query, vector_index, model, top_k=5,
+        # Only the static mode queries are memoized, not free-form questions
+        query_cache=None if prompt_mode == "custom" else query_cache
+    )
+    if not relevant_chunks:
+        raise ValueError("Could not retrieve relevant sections. Please try again.")
+    context.report('retrieve', 1, 1)
+
+    prompt = build_prompt(prompt_mode, relevant_chunks, custom_query if custom_query else None)
+
+    hits_before = response_cache.stats()['hits'] if response_cache else 0
+    context.report('generate', 0, None, "🤖 Generating critique...")
+
+    def publish(text: str):
+        context.set_partial('critique', text)
+        context.report('generate', len(text), None)
+
+    renderer = StreamRenderer(publish)
+    # Issues are extracted while the critique is still streaming
+    parser = IncrementalCritiqueParser()
+    try:
+        stream = generate_critique(
+            client, prompt, stream=True, limiter=limiter,
+            cache=response_cache, bypass_cache=not reuse_cached
+        )
+        for chunk in stream:
+            renderer.write(chunk)
+            if parser.feed(chunk):
+                context.set_partial('issues', len(parser.issues))
+                context.set_partial(
+                    'critical', sum(1 for issue in parser.issues if issue['severity'] == 'critical')
+                )
+            context.check_cancelled()
+        full_critique = renderer.close()
+    except JobCancelled:
+        raise
+    except Exception as e:
+        raise RuntimeError(f"Error generating critique: {str(e)}") from e
+
+    cache_hit = bool(response_cache) and response_cache.stats()['hits'] > hits_before
+    parsed = parser.close()
+
+    result = {
+        'critique': full_critique,
+        'parsed': parsed,
+        'retrieved': len(relevant_chunks),
+        'cache_hit': cache_hit,
+        'render_stats': renderer.stats()
+    }
+    result.update(annotate_stage(context, pdf_bytes, parsed, document))
+    return result
+
+
+def review_all_job(
+    context: JobContext,
+    client,
+    vector_index,
+    model,
+    query_cache=None,
+    limiter=None,
+    response_cache=None,
+    reuse_cached: bool = True,
+    pdf_bytes: Optional[bytes] = None,
+    document: Optional[DocumentSession] = None
+) -> Dict:
+    """
+    Run every review mode concurrently, then annotate the combined critique.
+
+    While generating, the partial result 'modes' maps each mode to its text
+    so far, republished on one StreamRenderer cadence per mode rather than
+    per token. Every streamed chunk is a cancellation point. With
+    reuse_cached=False every mode requests a fresh sample,
+    which then replaces the cached response (as in review_job).
+
+    Returns:
+        {'critique': str, 'parsed': dict, 'succeeded': int, 'attempted': int,
+         'errors': {mode: str}, 'annotated_pdf': bytes or None,
+         'warning': str or None}
+    """
+    modes = list(MODE_QUERIES)
+
+    # One retrieval pass for all modes
+    context.report('retrieve', 0, 1, "🔍 Retrieving relevant sections for all modes...")
+    mode_chunks = retrieve_for_modes(modes, vector_index, model, top_k=5, query_cache=query_cache)
+    prompts = {
+        mode: build_prompt(MODE_PROMPTS[mode], chunks)
+        for mode, chunks in mode_chunks.items()
+        if chunks
+    }
+    if not prompts:
+        raise ValueError("Could not retrieve relevant sections. Please try again.")
+    context.report('retrieve', 1, 1)
+
+    streamed: Dict[str, str] = {}
+    finished: List[str] = []
+    context.report('generate', 0, len(prompts), f"🤖 Generating {len(prompts)} critiques in parallel...")
+
+    def publisher(mode: str):
+        def publish(text: str):
+            streamed[mode] = text
+            context.set_partial('modes', dict(streamed))
+        return publish
+
+    renderers = {mode: StreamRenderer(publisher(mode)) for mode in prompts}
+
+    def on_chunk(mode: str, new_text: str, done: bool):
+        renderers[mode].write(new_text)
+        if done:
+            renderers[mode].close()
+            finished.append(mode)
+            context.report('generate', len(finished), len(prompts))
+        # Raises JobCancelled, which ends this mode's stream
+        context.check_cancelled()
+
+    results = run_all_modes(
+        client, prompts, on_chunk=on_chunk, limiter=limiter, cache=response_cache,
+        should_stop=lambda: context.cancelled, bypass_cache=not reuse_cached
+    )
+    context.check_cancelled()
+
+    sections = []
+    errors = {}
+    for mode, result in results.items():
+        if isinstance(result, Exception):
+            errors[mode] = str(result)
+        else:
+            sections.append(f"# {mode}\n\n{result}")
+
+    if not sections:
+        raise RuntimeError("Error generating critiques: " + "; ".join(errors.values()))
+
+    full_critique = "\n\n".join(sections)
+    parsed = parse_critique(full_critique)
+
+    result = {
+        'critique': full_critique,
+        'parsed': parsed,
+        'succeeded': len(sections),
+        'attempted': len(prompts),
+        'errors': errors
+    }
+    result.update(annotate_stage(context, pdf_bytes, parsed, document))
+    return result
+
+
+def session_review_job(
+    context: JobContext,
+    manager: IndexManager,
+    session_id: str,
+    doc_hash: str,
+    job: Callable,
+    client,
+    model,
+    *args,
+    **kwargs
+) -> Dict:
+    """
+    Run review_job or review_all_job on a session's registered index.
+
+    The job holds its own reference to the index manager entry while it
+    runs, so neither TTL nor budget eviction can close the vector index or
+    DocumentSession under it, even if the session releases the entry (e.g.
+    by processing another PDF) in the meantime.
+
+    Args:
+        manager: IndexManager holding the session's entry
+        session_id, doc_hash: Key of the entry
+        job: review_job or review_all_job; called as job(context, client,
+            index, model, *args, document=..., **kwargs)
+
+    Returns:
+        The job's result
+
+    Raises:
+        ValueError: If the entry was evicted before the job started
+    """
+    entry = manager.acquire(session_id, doc_hash)
+    if entry is None:
+        raise ValueError("Your processed document expired. Please process the PDF again.")
+    try:
+        return job(context, client, entry['index'], model, *args, document=entry['extras'].get('document'), **kwargs)
+    finally:
+        manager.release(session_id, doc_hash)
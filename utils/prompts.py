@@ -266,6 +266,27 @@ Provide specific recommendations for improving alignment:
 """
 
 
+# Retrieval query used for each review mode
+MODE_QUERIES = {
+    "Full Panelist Review": "research methodology problem statement objectives findings conclusions",
+    "Methodology Check": "research design methodology sampling data collection analysis validity",
+    "Writing Quality": "grammar writing style clarity structure flow citations",
+    "Citation & References": "citations references bibliography in-text citations reference list",
+    "Consistency Check": "terminology tense format spelling acronyms consistency",
+    "Research Alignment": "research questions objectives methodology variables analysis conclusions alignment"
+}
+
+# Map mode names to prompt mode identifiers
+MODE_PROMPTS = {
+    "Full Panelist Review": "full_review",
+    "Methodology Check": "methodology",
+    "Writing Quality": "writing_quality",
+    "Citation & References": "citation_check",
+    "Consistency Check": "consistency_check",
+    "Research Alignment": "alignment_check"
+}
+
+
 def build_prompt(mode, retrieved_chunks, user_query=None):
     """
     Build final prompt based on mode and context.
@@ -0,0 +1,322 @@
+"""
+Rate limiting and retry/backoff for Groq API requests.
+"""
+
+import asyncio
+import hashlib
+import random
+import re
+import threading
+import time
+from collections import deque
+from typing import Callable, Dict, Optional, TypeVar
+
+
+# Groq free tier limits for llama-3.3-70b-versatile
+DEFAULT_REQUESTS_PER_MINUTE = 30
+DEFAULT_TOKENS_PER_MINUTE = 12_000
+
+DEFAULT_MAX_RETRIES = 4
+DEFAULT_BASE_DELAY = 1.0
+DEFAULT_MAX_DELAY = 30.0
+
+# Admissions stay in the limiter's window this much longer (as a share of
+# the window), so latency between admitting a request and the server
+# receiving it cannot squeeze two windows' worth into one server window
+WINDOW_MARGIN = 0.05
+
+# HTTP status codes worth retrying
+RETRYABLE_STATUS_CODES = {408, 409, 429, 500, 502, 503, 504}
+
+T = TypeVar("T")
+
+
+class SlidingWindow:
+    """
+    Thread-safe sliding-window log of admitted costs.
+
+    A cost is admitted only if the total admitted in the last
+    `window_seconds` stays within `limit`, so no rolling window ever
+    exceeds the limit (a token bucket admits its burst on top of its
+    refill).
+    """
+
+    def __init__(self, limit: float, window_seconds: float = 60.0):
+        self.limit = limit
+        self.window_seconds = window_seconds
+        self._log = deque()
+        self._total = 0.0
+        self._lock = threading.Lock()
+
+    def _expire(self, now: float):
+        while self._log and self._log[0][0] <= now - self.window_seconds:
+            self._total -= self._log.popleft()[1]
+
+    def wait_time(self, cost: float = 1.0) -> float:
+        """Seconds until `cost` fits in the window (0.0 if it fits now). Does not take it."""
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            excess = self._total + min(cost, self.limit) - self.limit
+            if excess <= 0:
+                return 0.0
+            # Wait until enough of the oldest entries have left the window
+            freed = 0.0
+            for stamp, entry_cost in self._log:
+                freed += entry_cost
+                if freed >= excess:
+                    return stamp + self.window_seconds - now
+            return self.window_seconds
+
+    def take(self, cost: float = 1.0):
+        """Record an admitted cost (callers check wait_time first)."""
+        if cost <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._expire(now)
+            cost = min(cost, self.limit)
+            self._log.append((now, cost))
+            self._total += cost
+
+
+class RateLimiter:
+    """
+    Shared, thread-safe requests-per-minute and tokens-per-minute limiter.
+
+    A request proceeds only when both sliding windows can cover it, so no
+    rolling minute holds more than the requests and tokens per minute. A
+    429 with a retry-after hint pauses every caller until the hint has
+    elapsed. Exposes queue depth and wait-time metrics.
+
+    Args:
+        requests_per_minute: Requests per rolling minute
+        tokens_per_minute: Estimated tokens per rolling minute
+        window_seconds: Window length; the limits are scaled to it (a
+            shorter window lets benchmarks observe the limit quickly)
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: float = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: float = DEFAULT_TOKENS_PER_MINUTE,
+        window_seconds: float = 60.0
+    ):
+        scale = window_seconds / 60.0
+        held = window_seconds * (1 + WINDOW_MARGIN)
+        self.requests = SlidingWindow(max(1.0, requests_per_minute * scale), held)
+        self.tokens = SlidingWindow(max(1.0, tokens_per_minute * scale), held)
+        self._lock = threading.Lock()
+        self._blocked_until = 0.0
+        self._waiting = 0
+        self._metrics = {
+            'requests': 0,
+            'tokens': 0,
+            'waits': 0,
+            'total_wait_seconds': 0.0,
+            'max_wait_seconds': 0.0,
+            'retries': 0,
+            'rate_limited': 0
+        }
+
+    def _try_acquire(self, tokens: int) -> float:
+        """Take one request and `tokens` tokens if both are available; else return the wait."""
+        with self._lock:
+            wait = max(
+                self._blocked_until - time.monotonic(),
+                self.requests.wait_time(1),
+                self.tokens.wait_time(tokens)
+            )
+            if wait <= 0:
+                self.requests.take(1)
+                self.tokens.take(tokens)
+                self._metrics['requests'] += 1
+                self._metrics['tokens'] += tokens
+            return wait
+
+    def _record_wait(self, waited: float):
+        with self._lock:
+            if waited > 0:
+                self._metrics['waits'] += 1
+                self._metrics['total_wait_seconds'] += waited
+                self._metrics['max_wait_seconds'] = max(self._metrics['max_wait_seconds'], waited)
+
+    def acquire(self, tokens: int = 0):
+        """
+        Block until a request costing `tokens` tokens may be sent.
+
+        Args:
+            tokens: Estimated tokens (prompt plus max completion) for the request
+        """
+        start = time.monotonic()
+        wait = self._try_acquire(tokens)
+        if wait > 0:
+            with self._lock:
+                self._waiting += 1
+            try:
+                while wait > 0:
+                    time.sleep(wait)
+                    wait = self._try_acquire(tokens)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+        self._record_wait(time.monotonic() - start)
+
+    async def acquire_async(self, tokens: int = 0):
+        """Asyncio variant of acquire."""
+        start = time.monotonic()
+        wait = self._try_acquire(tokens)
+        if wait > 0:
+            with self._lock:
+                self._waiting += 1
+            try:
+                while wait > 0:
+                    await asyncio.sleep(wait)
+                    wait = self._try_acquire(tokens)
+            finally:
+                with self._lock:
+                    self._waiting -= 1
+        self._record_wait(time.monotonic() - start)
+
+    def block_for(self, seconds: float):
+        """Pause all callers for `seconds` (e.g. after a 429 retry-after hint)."""
+        with self._lock:
+            self._blocked_until = max(self._blocked_until, time.monotonic() + seconds)
+            self._metrics['rate_limited'] += 1
+
+    def record_retry(self):
+        with self._lock:
+            self._metrics['retries'] += 1
+
+    def metrics(self) -> Dict:
+        """
+        Report limiter activity.
+
+        Returns:
+            {'queue_depth', 'requests', 'tokens', 'waits', 'total_wait_seconds',
+             'max_wait_seconds', 'avg_wait_seconds', 'retries', 'rate_limited'}
+        """
+        with self._lock:
+            metrics = dict(self._metrics)
+            metrics['queue_depth'] = self._waiting
+        metrics['avg_wait_seconds'] = (
+            metrics['total_wait_seconds'] / metrics['waits'] if metrics['waits'] else 0.0
+        )
+        return metrics
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (about four characters per token for English)."""
+    return max(1, len(text) // 4)
+
+
+def _parse_duration(value: str) -> Optional[float]:
+    """Parse '7', '7.5', '7.66s', '2m59.56s' or '250ms' into seconds."""
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    match = re.fullmatch(r'(?:(\d+(?:\.\d+)?)h)?(?:(\d+(?:\.\d+)?)m(?!s))?(?:(\d+(?:\.\d+)?)s)?(?:(\d+(?:\.\d+)?)ms)?', value)
+    if not match or not any(match.groups()):
+        return None
+    hours, minutes, seconds, millis = (float(group) if group else 0.0 for group in match.groups())
+    return hours * 3600 + minutes * 60 + seconds + millis / 1000
+
+
+def parse_retry_after(error: Exception) -> Optional[float]:
+    """
+    Extract a retry delay in seconds from a rate-limit error.
+
+    Looks at the retry-after / x-ratelimit-reset-* response headers, then at
+    Groq's "Please try again in 7.66s" message text.
+    """
+    response = getattr(error, 'response', None)
+    headers = getattr(response, 'headers', None) or {}
+    for header in ('retry-after', 'x-ratelimit-reset-requests', 'x-ratelimit-reset-tokens'):
+        value = headers.get(header)
+        if value:
+            seconds = _parse_duration(str(value))
+            if seconds is not None:
+                return seconds
+
+    match = re.search(r'try again in\s+([\dhms.]+)', str(error), re.IGNORECASE)
+    if match:
+        return _parse_duration(match.group(1).rstrip('.'))
+
+    return None
+
+
+def error_status_code(error: Exception) -> Optional[int]:
+    """HTTP status code of an API error, if it carries one."""
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status
+
+
+def is_retryable(error: Exception) -> bool:
+    """True for rate limits, server errors, timeouts and connection failures."""
+    status = error_status_code(error)
+    if status is not None:
+        return status in RETRYABLE_STATUS_CODES
+    return type(error).__name__ in ('APIConnectionError', 'APITimeoutError', 'ConnectionError', 'TimeoutError')
+
+
+def call_with_retry(
+    func: Callable[[], T],
+    limiter: Optional[RateLimiter] = None,
+    max_retries: int = DEFAULT_MAX_RETRIES,
+    base_delay: float = DEFAULT_BASE_DELAY,
+    max_delay: float = DEFAULT_MAX_DELAY,
+    sleep: Callable[[float], None] = time.sleep
+) -> T:
+    """
+    Call func, retrying retryable failures with jittered exponential backoff.
+
+    A retry-after hint from a 429 takes precedence over the backoff delay
+    and also pauses the shared limiter.
+
+    Raises:
+        The last exception once retries are exhausted, or any non-retryable one
+    """
+    attempt = 0
+    while True:
+        try:
+            return func()
+        except Exception as e:
+            if attempt >= max_retries or not is_retryable(e):
+                raise
+
+            # Full jitter: uniform in [0, min(max_delay, base * 2^attempt)]
+            delay = random.uniform(0, min(max_delay, base_delay * (2 ** attempt)))
+            retry_after = parse_retry_after(e) if error_status_code(e) == 429 else None
+            if retry_after is not None:
+                delay = min(max_delay, retry_after) + random.uniform(0, base_delay)
+                if limiter is not None:
+                    limiter.block_for(delay)
+
+            if limiter is not None:
+                limiter.record_retry()
+
+            attempt += 1
+            sleep(delay)
+
+
+_limiters: Dict[str, RateLimiter] = {}
+_limiters_lock = threading.Lock()
+
+
+def get_rate_limiter(api_key: str) -> RateLimiter:
+    """
+    Return the process-wide limiter for an API key.
+
+    Groq limits are per key, so all sessions and concurrent requests using
+    the same key share one limiter.
+    """
+    key_id = hashlib.sha256(api_key.encode("utf-8")).hexdigest()
+    with _limiters_lock:
+        if key_id not in _limiters:
+            _limiters[key_id] = RateLimiter()
+        return _limiters[key_id]
@@ -0,0 +1,211 @@
+"""
+Cache for Groq critique responses.
+
+Responses are keyed by a hash of the model, system message, prompt and
+sampling parameters. An in-memory LRU tier is always used; an optional
+SQLite tier keeps responses across restarts. Unlike the embedding cache the
+disk tier stores generated critique text (which quotes the thesis), so it is
+off unless a path is given.
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional
+
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_MAX_DISK_ENTRIES = 5_000
+
+
+def response_cache_key(model: str, system_message: str, prompt: str, params: Dict) -> str:
+    """
+    Build the cache key for a chat completion request.
+
+    Args:
+        model: Groq model name
+        system_message: System prompt
+        prompt: User prompt
+        params: Sampling parameters (temperature, max_tokens, ...)
+
+    Returns:
+        Hex SHA-256 digest
+    """
+    payload = json.dumps(
+        {'model': model, 'system': system_message, 'prompt': prompt, 'params': params},
+        sort_keys=True,
+        ensure_ascii=False
+    ).encode("utf-8")
+    return hashlib.sha256(payload).hexdigest()
+
+
+class ResponseCache:
+    """
+    Two-tier (memory LRU, optional SQLite) response cache.
+
+    Args:
+        max_entries: Responses kept in memory
+        path: SQLite file for the disk tier, or None for memory only
+        max_disk_entries: Responses kept on disk
+        cache_nondeterministic: Also cache requests sampled with
+            temperature > 0. When False only temperature 0 requests are cached.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+        path: Optional[str] = None,
+        max_disk_entries: int = DEFAULT_MAX_DISK_ENTRIES,
+        cache_nondeterministic: bool = True
+    ):
+        self.max_entries = max_entries
+        self.max_disk_entries = max_disk_entries
+        self.cache_nondeterministic = cache_nondeterministic
+        self.hits = 0
+        self.misses = 0
+        self.saved_tokens = 0
+        self._memory: "OrderedDict[str, Dict]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._conn = None
+        self._clock = 0
+
+        if path is not None:
+            if path != ":memory:":
+                os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS responses (
+                    key TEXT PRIMARY KEY,
+                    text TEXT NOT NULL,
+                    tokens INTEGER NOT NULL,
+                    last_used INTEGER NOT NULL
+                )
+                """
+            )
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_responses_last_used ON responses(last_used)"
+            )
+            self._conn.commit()
+
+            row = self._conn.execute("SELECT MAX(last_used) FROM responses").fetchone()
+            self._clock = row[0] or 0
+
+    def is_cacheable(self, temperature: float) -> bool:
+        """Whether requests sampled at this temperature may be served from the cache."""
+        return self.cache_nondeterministic or temperature == 0
+
+    def get(self, key: str) -> Optional[Dict]:
+        """
+        Look up a cached response.
+
+        Returns:
+            {'text': str, 'tokens': int} or None on a miss
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory.move_to_end(key)
+            elif self._conn is not None:
+                row = self._conn.execute(
+                    "SELECT text, tokens FROM responses WHERE key = ?", (key,)
+                ).fetchone()
+                if row is not None:
+                    entry = {'text': row[0], 'tokens': row[1]}
+                    self._clock += 1
+                    self._conn.execute(
+                        "UPDATE responses SET last_used = ? WHERE key = ?", (self._clock, key)
+                    )
+                    self._conn.commit()
+                    self._remember(key, entry)
+
+            if entry is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self.saved_tokens += entry['tokens']
+            return dict(entry)
+
+    def put(self, key: str, text: str, tokens: int):
+        """
+        Store a completed response.
+
+        Args:
+            key: Key from response_cache_key()
+            text: Full response text
+            tokens: Tokens the request consumed (prompt plus completion)
+        """
+        entry = {'text': text, 'tokens': int(tokens)}
+
+        with self._lock:
+            self._remember(key, entry)
+            if self._conn is not None:
+                self._clock += 1
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO responses (key, text, tokens, last_used) VALUES (?, ?, ?, ?)",
+                    (key, text, entry['tokens'], self._clock)
+                )
+                self._evict_disk()
+                self._conn.commit()
+
+    def _remember(self, key: str, entry: Dict):
+        """Insert into the memory tier, evicting the least recently used. Lock must be held."""
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _evict_disk(self):
+        count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            self._conn.execute(
+                "DELETE FROM responses WHERE key IN "
+                "(SELECT key FROM responses ORDER BY last_used ASC LIMIT ?)",
+                (overflow,)
+            )
+
+    def stats(self) -> Dict:
+        """
+        Report cache effectiveness.
+
+        Returns:
+            {'hits': int, 'misses': int, 'hit_rate': float, 'saved_tokens': int,
+             'entries': int, 'disk_entries': int}
+        """
+        with self._lock:
+            disk_entries = 0
+            if self._conn is not None:
+                disk_entries = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            entries = len(self._memory)
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / total if total else 0.0,
+            'saved_tokens': self.saved_tokens,
+            'entries': entries,
+            'disk_entries': disk_entries
+        }
+
+    def clear(self):
+        """Remove all cached responses and reset counters."""
+        with self._lock:
+            self._memory.clear()
+            if self._conn is not None:
+                self._conn.execute("DELETE FROM responses")
+                self._conn.commit()
+            self.hits = 0
+            self.misses = 0
+            self.saved_tokens = 0
+
+    def close(self):
+        """Close the disk tier, if any."""
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
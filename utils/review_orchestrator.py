@@ -0,0 +1,198 @@
+"""
+Run several review modes concurrently against the Groq API.
+
+Each mode's streamed critique is produced on a worker thread and handed to
+the event loop, so progress callbacks always run on the caller's thread
+(which is what Streamlit placeholders require). Total wall time is close to
+the slowest mode instead of the sum of all modes.
+
+When a mode's consumer stops early (a callback raised, or the run was
+cancelled), its worker thread stops reading and closes the Groq stream, so
+no further tokens are spent on it; modes that have not started yet are
+skipped.
+"""
+
+import asyncio
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+from utils.groq_client import generate_critique
+from utils.rate_limiter import RateLimiter
+from utils.response_cache import ResponseCache
+
+if TYPE_CHECKING:
+    from groq import Groq
+
+
+DEFAULT_MAX_CONCURRENCY = 3
+
+# Callback signature: (mode, new_text, done); new_text is only the latest
+# chunk (empty on the final done call), so callers decide when to join
+ChunkCallback = Callable[[str, str, bool], None]
+
+# Polled before each mode starts and for every streamed chunk
+StopCallback = Callable[[], bool]
+
+
+class ModeCancelled(Exception):
+    """Result for a mode that was skipped or stopped because the run was cancelled."""
+
+
+async def _stream_mode(
+    mode: str,
+    client: "Groq",
+    prompt: str,
+    semaphore: asyncio.Semaphore,
+    limiter: Optional[RateLimiter],
+    on_chunk: Optional[ChunkCallback],
+    model: Optional[str],
+    cache: Optional[ResponseCache],
+    should_stop: Optional[StopCallback] = None,
+    bypass_cache: bool = False
+) -> str:
+    """Stream one mode's critique, forwarding each chunk to on_chunk as it arrives."""
+    def stopped() -> bool:
+        return should_stop is not None and should_stop()
+
+    if stopped():
+        raise ModeCancelled(f"{mode} was cancelled before it started")
+
+    async with semaphore:
+        # The run may have been cancelled while this mode waited for a slot
+        if stopped():
+            raise ModeCancelled(f"{mode} was cancelled before it started")
+
+        loop = asyncio.get_running_loop()
+        queue: asyncio.Queue = asyncio.Queue()
+        done = object()
+        stop = threading.Event()
+
+        def put(item):
+            if stop.is_set():
+                return
+            try:
+                loop.call_soon_threadsafe(queue.put_nowait, item)
+            except RuntimeError:
+                stop.set()  # The event loop is closed; nobody is listening
+
+        def produce():
+            stream = None
+            try:
+                kwargs = {'model': model} if model else {}
+                # Waiting on the limiter (and any retry backoff) happens on this worker thread
+                stream = generate_critique(
+                    client, prompt, stream=True, limiter=limiter, cache=cache, bypass_cache=bypass_cache, **kwargs
+                )
+                for chunk in stream:
+                    if stop.is_set() or stopped():
+                        put(ModeCancelled(f"{mode} was cancelled"))
+                        return
+                    put(chunk)
+                put(done)
+            except Exception as e:
+                put(e)
+            finally:
+                # Ends the HTTP stream when stopped early
+                if stream is not None:
+                    stream.close()
+
+        threading.Thread(target=produce, name=f"groq-stream-{mode}", daemon=True).start()
+
+        parts = []
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                if isinstance(item, Exception):
+                    raise item
+                parts.append(item)
+                if on_chunk:
+                    on_chunk(mode, item, False)
+        finally:
+            # Normal completion, a failing callback or task cancellation:
+            # either way the producer must stop reading
+            stop.set()
+
+        if on_chunk:
+            on_chunk(mode, "", True)
+        return "".join(parts)
+
+
+async def run_modes_async(
+    client: "Groq",
+    prompts: Dict[str, str],
+    on_chunk: Optional[ChunkCallback] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    limiter: Optional[RateLimiter] = None,
+    model: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+    should_stop: Optional[StopCallback] = None,
+    bypass_cache: bool = False
+) -> Dict[str, object]:
+    """
+    Generate critiques for several modes concurrently.
+
+    Args:
+        client: Groq client
+        prompts: Mapping of mode name to built prompt
+        on_chunk: Optional callback receiving (mode, new_text, done)
+        max_concurrency: Maximum simultaneous Groq requests
+        limiter: Optional shared RateLimiter
+        model: Optional Groq model override
+        cache: Optional shared ResponseCache
+        should_stop: Optional callable returning True once the run is
+            cancelled; unstarted modes are skipped and running streams closed
+        bypass_cache: Request fresh samples instead of cached responses
+            (the fresh responses still replace the cached ones)
+
+    Returns:
+        Mapping of mode name to critique text, or to the Exception raised
+        for that mode (one failing mode does not cancel the others;
+        cancelled modes map to ModeCancelled)
+    """
+    semaphore = asyncio.Semaphore(max_concurrency)
+    modes = list(prompts)
+
+    results = await asyncio.gather(
+        *[
+            _stream_mode(
+                mode, client, prompts[mode], semaphore, limiter, on_chunk, model, cache, should_stop, bypass_cache
+            )
+            for mode in modes
+        ],
+        return_exceptions=True
+    )
+
+    return dict(zip(modes, results))
+
+
+def run_all_modes(
+    client: "Groq",
+    prompts: Dict[str, str],
+    on_chunk: Optional[ChunkCallback] = None,
+    max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+    limiter: Optional[RateLimiter] = None,
+    model: Optional[str] = None,
+    cache: Optional[ResponseCache] = None,
+    should_stop: Optional[StopCallback] = None,
+    bypass_cache: bool = False
+) -> Dict[str, object]:
+    """
+    Blocking wrapper around run_modes_async for synchronous callers.
+
+    on_chunk is invoked on the calling thread.
+    """
+    return asyncio.run(
+        run_modes_async(
+            client,
+            prompts,
+            on_chunk=on_chunk,
+            max_concurrency=max_concurrency,
+            limiter=limiter,
+            model=model,
+            cache=cache,
+            should_stop=should_stop,
+            bypass_cache=bypass_cache
+        )
+    )
@@ -0,0 +1,224 @@
+"""
+Document-wide word index for locating critique snippets in a PDF.
+
+Built once per document from PyMuPDF word boxes, it replaces per-issue
+page.search_for scans: every lookup is a probe into a word n-gram inverted
+index. Matching is case-, punctuation- and whitespace-insensitive, and a
+vote over n-gram hits tolerates snippets the model paraphrased slightly.
+"""
+
+import unicodedata
+from collections import defaultdict
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import fitz  # PyMuPDF
+
+
+# Words per n-gram key (shorter snippets fall back to single words)
+NGRAM_SIZE = 3
+
+# Fraction of a snippet's n-grams that must agree on one location
+DEFAULT_MIN_SCORE = 0.5
+
+# Word offset drift tolerated between agreeing n-gram hits (insertions/deletions)
+ALIGNMENT_SLACK = 2
+
+# Characters folded to ASCII before comparison (curly quotes, dashes)
+_CHAR_FOLDS = str.maketrans({
+    '‘': "'", '’': "'", '“': '"', '”': '"',
+    '–': '-', '—': '-', '­': ''
+})
+
+# Every non-alphanumeric ASCII character
+_ASCII_PUNCTUATION = "".join(chr(code) for code in range(128) if not chr(code).isalnum())
+
+
+def normalize_word(word: str) -> str:
+    """
+    Normalize a word for matching: NFKC (expands ligatures), fold quotes and
+    dashes, lower-case, and strip surrounding punctuation.
+    """
+    if word.isascii():
+        # Fast path: ASCII words only need case folding and punctuation stripping
+        return word.lower().strip(_ASCII_PUNCTUATION)
+
+    word = unicodedata.normalize("NFKC", word).translate(_CHAR_FOLDS).lower()
+    start, end = 0, len(word)
+    while start < end and not word[start].isalnum():
+        start += 1
+    while end > start and not word[end - 1].isalnum():
+        end -= 1
+    return word[start:end]
+
+
+def normalize_words(text: str) -> List[str]:
+    """Split text on whitespace and normalize, dropping punctuation-only tokens."""
+    return [token for token in (normalize_word(word) for word in text.split()) if token]
+
+
+class TextIndex:
+    """
+    Word n-gram inverted index over a whole document.
+
+    Words are stored in reading order across pages; each keeps its page and
+    bounding box so a match maps straight back to highlight rectangles.
+    """
+
+    def __init__(self):
+        self._tokens: List[str] = []
+        self._pages: List[int] = []
+        self._boxes: List[Tuple[float, float, float, float]] = []
+        self._lines: List[Tuple[int, int]] = []
+        self._ngrams: Dict[Tuple[str, ...], List[int]] = defaultdict(list)
+        self._unigrams: Dict[str, List[int]] = defaultdict(list)
+
+    @classmethod
+    def from_document(cls, doc: fitz.Document) -> "TextIndex":
+        """
+        Build the index with one word extraction per page.
+
+        Args:
+            doc: Open PyMuPDF document (index it before adding annotations,
+                so margin comments are never matched)
+
+        Returns:
+            TextIndex
+        """
+        index = cls()
+        for page_num in range(doc.page_count):
+            index.add_page(page_num, doc[page_num].get_text("words"))
+        return index
+
+    def add_page(self, page_num: int, words: Iterable[Tuple]):
+        """
+        Append one page's words.
+
+        Args:
+            page_num: 0-indexed page number
+            words: PyMuPDF "words" tuples (x0, y0, x1, y1, word, block, line, word_no)
+        """
+        for word in words:
+            token = normalize_word(word[4])
+            if not token:
+                continue
+            position = len(self._tokens)
+            self._tokens.append(token)
+            self._pages.append(page_num)
+            self._boxes.append(tuple(word[:4]))
+            self._lines.append((word[5], word[6]))
+            self._unigrams[token].append(position)
+            if position >= NGRAM_SIZE - 1:
+                start = position - NGRAM_SIZE + 1
+                # n-grams never straddle a page break
+                if self._pages[start] == page_num:
+                    self._ngrams[tuple(self._tokens[start:position + 1])].append(start)
+
+    def __len__(self) -> int:
+        return len(self._tokens)
+
+    def find(
+        self,
+        text: str,
+        pages: Optional[Iterable[int]] = None,
+        fuzzy: bool = True,
+        min_score: float = DEFAULT_MIN_SCORE
+    ) -> Optional[Dict]:
+        """
+        Locate text in the document.
+
+        Args:
+            text: Snippet to find
+            pages: Optional 0-indexed pages to restrict the search to
+            fuzzy: Accept partial n-gram agreement (paraphrased snippets)
+            min_score: Minimum fraction of agreeing n-grams for a fuzzy match
+
+        Returns:
+            {'page_num': int (0-indexed), 'rects': [fitz.Rect] (one per text
+            line), 'score': float (1.0 for an exact match)} for the best
+            match (earliest on ties), or None
+        """
+        tokens = normalize_words(text)
+        if not tokens:
+            return None
+
+        allowed = set(pages) if pages is not None else None
+
+        if len(tokens) <= NGRAM_SIZE:
+            return self._find_short(tokens, allowed)
+
+        # Snippets are length-capped, so the final word may be cut off: it is
+        # left out of the n-grams and only matched as a prefix afterwards
+        body, tail = tokens[:-1], tokens[-1]
+        keys = [tuple(body[i:i + NGRAM_SIZE]) for i in range(len(body) - NGRAM_SIZE + 1)]
+
+        # Each n-gram hit votes for the document position where the snippet would start
+        votes: Dict[int, Dict[int, int]] = defaultdict(dict)
+        for offset, key in enumerate(keys):
+            for position in self._ngrams.get(key, ()):
+                if allowed is not None and self._pages[position] not in allowed:
+                    continue
+                votes[position - offset][offset] = position
+
+        # Exact: every n-gram agrees on the same start
+        for start in sorted(votes):
+            if len(votes[start]) == len(keys):
+                return self._match(start, self._extend_tail(start + len(body) - 1, tail), 1.0)
+
+        if not fuzzy or not votes:
+            return None
+
+        # Fuzzy: allow a little drift between agreeing hits (inserted or dropped words)
+        best = None
+        for start in sorted(votes):
+            hits: Dict[int, int] = {}
+            for shift in range(-ALIGNMENT_SLACK, ALIGNMENT_SLACK + 1):
+                for offset, position in votes.get(start + shift, {}).items():
+                    hits.setdefault(offset, position)
+            score = len(hits) / len(keys)
+            if best is None or score > best[0]:
+                best = (score, hits)
+
+        score, hits = best
+        if score < min_score:
+            return None
+
+        first = min(hits.values())
+        last = max(hits.values()) + NGRAM_SIZE - 1
+        return self._match(first, self._extend_tail(last, tail), score)
+
+    def _extend_tail(self, last: int, tail: str) -> int:
+        """Include the word after position last if it starts with the (possibly cut) tail."""
+        following = last + 1
+        if following < len(self._tokens) and self._tokens[following].startswith(tail):
+            return following
+        return last
+
+    def _find_short(self, tokens: List[str], allowed: Optional[set]) -> Optional[Dict]:
+        """Exact lookup for snippets of at most one n-gram (last word as a prefix)."""
+        for position in self._unigrams.get(tokens[0], ()):
+            if allowed is not None and self._pages[position] not in allowed:
+                continue
+            end = position + len(tokens)
+            if end > len(self._tokens) or self._pages[end - 1] != self._pages[position]:
+                continue
+            if self._tokens[position:end - 1] == tokens[:-1] and self._tokens[end - 1].startswith(tokens[-1]):
+                return self._match(position, end - 1, 1.0)
+        return None
+
+    def _match(self, first: int, last: int, score: float) -> Dict:
+        """Build a match for word positions first..last, clipped to the first word's page."""
+        page_num = self._pages[first]
+        rects: List[fitz.Rect] = []
+        current_line = None
+
+        for position in range(first, last + 1):
+            if self._pages[position] != page_num:
+                break
+            box = fitz.Rect(self._boxes[position])
+            if self._lines[position] == current_line:
+                rects[-1] |= box
+            else:
+                rects.append(box)
+                current_line = self._lines[position]
+
+        return {'page_num': page_num, 'rects': rects, 'score': score}
@@ -0,0 +1,271 @@
+"""
+Vector index backends for chunk retrieval.
+
+A thesis produces a few hundred to a few thousand chunks, which an exact
+NumPy search handles in well under a millisecond. ChromaDB (HNSW) remains
+available as an optional backend for very large corpora.
+"""
+
+import threading
+from typing import Dict, List, Optional
+
+import numpy as np
+
+
+# Corpora at or above this many vectors use HNSW when backend="auto"
+HNSW_MIN_VECTORS = 50_000
+
+BACKENDS = ("auto", "numpy", "chroma")
+
+DEFAULT_COLLECTION_NAME = "thesis_chunks"
+
+# HNSW graph links roughly double the raw vector footprint
+HNSW_OVERHEAD_FACTOR = 2.0
+
+_chroma_client = None
+_chroma_lock = threading.Lock()
+
+
+class NumpyIndex:
+    """
+    Exact cosine-similarity index over a normalized float32 matrix.
+
+    A query is one matrix multiply plus argpartition for the top-k.
+    """
+
+    backend = "numpy"
+
+    def __init__(self, dim: Optional[int] = None, capacity: int = 256):
+        self._matrix = np.zeros((capacity, dim), dtype=np.float32) if dim else None
+        self._size = 0
+        self._chunks: List[Dict] = []
+        self._text_bytes = 0
+
+    def add(self, chunks: List[Dict], embeddings: np.ndarray):
+        """
+        Append chunks and their embeddings.
+
+        Args:
+            chunks: Chunk dictionaries ('text', 'page_num', 'chunk_id', ...)
+            embeddings: Array of shape (len(chunks), dim)
+        """
+        if not chunks:
+            return
+
+        vectors = np.asarray(embeddings, dtype=np.float32)
+        norms = np.linalg.norm(vectors, axis=1, keepdims=True)
+        vectors = vectors / np.maximum(norms, 1e-12)
+
+        if self._matrix is None:
+            self._matrix = np.zeros((max(256, len(vectors)), vectors.shape[1]), dtype=np.float32)
+
+        # Grow geometrically so incremental inserts stay amortized O(n)
+        needed = self._size + len(vectors)
+        if needed > self._matrix.shape[0]:
+            capacity = max(needed, self._matrix.shape[0] * 2)
+            grown = np.zeros((capacity, self._matrix.shape[1]), dtype=np.float32)
+            grown[:self._size] = self._matrix[:self._size]
+            self._matrix = grown
+
+        self._matrix[self._size:needed] = vectors
+        self._size = needed
+        self._chunks.extend(chunks)
+        self._text_bytes += sum(len(chunk['text']) for chunk in chunks)
+
+    def search(self, query_embeddings: np.ndarray, top_k: int = 5) -> List[List[Dict]]:
+        """
+        Find the nearest chunks for each query.
+
+        Args:
+            query_embeddings: Array of shape (n_queries, dim)
+            top_k: Number of results per query
+
+        Returns:
+            One result list per query, best match first. Each result is
+            {'text', 'page_num', 'distance', 'chunk_id'} with cosine distance
+        """
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        if self._size == 0:
+            return [[] for _ in range(len(queries))]
+
+        queries = queries / np.maximum(np.linalg.norm(queries, axis=1, keepdims=True), 1e-12)
+        scores = queries @ self._matrix[:self._size].T
+
+        k = min(top_k, self._size)
+        if k < self._size:
+            candidates = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+        else:
+            candidates = np.broadcast_to(np.arange(self._size), (len(queries), self._size))
+
+        results = []
+        for row, row_candidates in enumerate(candidates):
+            order = row_candidates[np.argsort(-scores[row, row_candidates], kind="stable")]
+            results.append([
+                {
+                    'text': self._chunks[i]['text'],
+                    'page_num': self._chunks[i]['page_num'],
+                    'distance': float(1.0 - scores[row, i]),
+                    'chunk_id': self._chunks[i]['chunk_id']
+                }
+                for i in order
+            ])
+
+        return results
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        return self._size
+
+    def nbytes(self) -> int:
+        """Approximate resident size: vector matrix plus chunk text."""
+        matrix_bytes = self._matrix.nbytes if self._matrix is not None else 0
+        return matrix_bytes + self._text_bytes
+
+    def close(self):
+        """Release the vector matrix and chunk references."""
+        self._matrix = None
+        self._size = 0
+        self._chunks = []
+        self._text_bytes = 0
+
+
+class ChromaIndex:
+    """
+    In-memory ChromaDB (HNSW) collection behind the same interface.
+    """
+
+    backend = "chroma"
+
+    def __init__(self, collection_name: str = DEFAULT_COLLECTION_NAME):
+        client = _get_chroma_client()
+        self.collection_name = collection_name
+        self._dim = 0
+        self._text_bytes = 0
+
+        # Namespaced names are fresh; only the shared default needs a clean slate
+        if collection_name == DEFAULT_COLLECTION_NAME:
+            try:
+                client.delete_collection(collection_name)
+            except Exception:
+                pass
+
+        self.collection = client.get_or_create_collection(
+            name=collection_name,
+            metadata={"hnsw:space": "cosine"}
+        )
+
+    def add(self, chunks: List[Dict], embeddings: np.ndarray):
+        """Append chunks and their embeddings."""
+        if not chunks:
+            return
+
+        self._dim = np.asarray(embeddings).shape[1]
+        self._text_bytes += sum(len(chunk['text']) for chunk in chunks)
+
+        self.collection.add(
+            ids=[f"chunk_{chunk['chunk_id']}" for chunk in chunks],
+            embeddings=np.asarray(embeddings, dtype=np.float32).tolist(),
+            documents=[chunk['text'] for chunk in chunks],
+            metadatas=[
+                {
+                    'page_num': chunk['page_num'],
+                    'chunk_id': chunk['chunk_id'],
+                    'start_char': chunk.get('start_char', 0),
+                    'end_char': chunk.get('end_char', 0)
+                }
+                for chunk in chunks
+            ]
+        )
+
+    def search(self, query_embeddings: np.ndarray, top_k: int = 5) -> List[List[Dict]]:
+        """Find the nearest chunks for each query (see NumpyIndex.search)."""
+        queries = np.atleast_2d(np.asarray(query_embeddings, dtype=np.float32))
+        n_results = min(top_k, self.count())
+        if n_results == 0:
+            return [[] for _ in range(len(queries))]
+
+        results = self.collection.query(
+            query_embeddings=queries.tolist(),
+            n_results=n_results
+        )
+
+        formatted = []
+        for row in range(len(queries)):
+            documents = results['documents'][row] if results['documents'] else []
+            formatted.append([
+                {
+                    'text': documents[i],
+                    'page_num': results['metadatas'][row][i]['page_num'],
+                    'distance': results['distances'][row][i] if results.get('distances') else 0.0,
+                    'chunk_id': results['metadatas'][row][i]['chunk_id']
+                }
+                for i in range(len(documents))
+            ])
+
+        return formatted
+
+    def count(self) -> int:
+        """Number of indexed chunks."""
+        return self.collection.count()
+
+    def nbytes(self) -> int:
+        """Approximate resident size (vectors plus HNSW links and documents)."""
+        return int(self.count() * self._dim * 4 * HNSW_OVERHEAD_FACTOR) + self._text_bytes
+
+    def close(self):
+        """Drop the collection from the shared client."""
+        try:
+            _get_chroma_client().delete_collection(self.collection_name)
+        except Exception:
+            pass
+
+
+def _get_chroma_client():
+    """Return the process-wide in-memory Chroma client, creating it on first use."""
+    global _chroma_client
+
+    with _chroma_lock:
+        if _chroma_client is None:
+            # Imported lazily: chromadb is only needed for this backend
+            import chromadb
+
+            # Create in-memory ChromaDB client (updated for ChromaDB 0.5+)
+            _chroma_client = chromadb.Client()
+
+    return _chroma_client
+
+
+def create_vector_index(
+    backend: str = "auto",
+    expected_size: Optional[int] = None,
+    name: str = DEFAULT_COLLECTION_NAME
+):
+    """
+    Create an empty vector index.
+
+    Args:
+        backend: 'numpy', 'chroma', or 'auto' (HNSW only for corpora of at
+            least HNSW_MIN_VECTORS, and only if chromadb is installed)
+        expected_size: Expected number of vectors, used by 'auto'
+        name: Collection name for the Chroma backend; use a per-session
+            name (see utils.index_manager) when several sessions share a process
+
+    Returns:
+        NumpyIndex or ChromaIndex
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown vector index backend '{backend}'. Choose from {', '.join(BACKENDS)}.")
+
+    if backend == "numpy":
+        return NumpyIndex()
+
+    if backend == "chroma":
+        return ChromaIndex(name)
+
+    if expected_size is not None and expected_size >= HNSW_MIN_VECTORS:
+        try:
+            return ChromaIndex(name)
+        except ImportError:
+            pass
+
+    return NumpyIndex()